@@ -0,0 +1,88 @@
+"""
+Cold import time benchmark for epyqtwidgets.
+
+Each target is imported in a fresh interpreter, after PyQt5 itself, which every target needs
+anyway.  The fastest of several runs is compared against the target's budget, and the target
+must not have imported any of its forbidden modules.  Exits with status 1 if any check fails.
+
+    python benchmarks/import_time.py [--repeat N] [--scale S]
+"""
+import argparse
+import json
+import os
+import pathlib
+import subprocess
+import sys
+
+SRC = pathlib.Path(__file__).resolve().parent.parent / "src"
+HEAVY = ("numpy", "matplotlib")
+
+# target: (budget in seconds, modules the target must not import)
+TARGETS = {
+    "epyqtwidgets": (.01, HEAVY),
+    "epyqtwidgets.humble_combobox": (.01, HEAVY),
+    "epyqtwidgets.diagnostics": (.01, HEAVY),
+    "epyqtwidgets.indicator": (.01, HEAVY),
+    "epyqtwidgets.instrument": (.01, HEAVY),
+    "epyqtwidgets.ip4validator": (.01, HEAVY),
+    "epyqtwidgets.latest_executor": (.01, HEAVY),
+    "epyqtwidgets.rate_limit": (.01, HEAVY),
+    "epyqtwidgets.slider": (.01, HEAVY),
+    "epyqtwidgets.image": (.25, ("matplotlib",)),
+    "epyqtwidgets.indicator_bank": (.25, ("matplotlib",)),
+    "epyqtwidgets.mpl": (.25, ("matplotlib",)),
+}
+
+CHILD = """
+import json, sys, time
+import PyQt5.QtCore, PyQt5.QtGui, PyQt5.QtWidgets
+start = time.perf_counter()
+import {target}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"time": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def measure(target, repeat):
+    path = os.pathsep.join(filter(None, (str(SRC), os.environ.get("PYTHONPATH"))))
+    env = dict(os.environ, PYTHONPATH=path)
+    best = None
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD.format(target=target)],
+            check=True, capture_output=True, text=True, env=env
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        if best is None or result["time"] < best["time"]:
+            best = result
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per target, keeping the fastest.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget.")
+    args = parser.parse_args()
+
+    failed = False
+    for target, (budget, forbidden) in TARGETS.items():
+        result = measure(target, args.repeat)
+        budget *= args.scale
+        loaded = [
+            name for name in forbidden
+            if any(module == name or module.startswith(name + ".") for module in result["modules"])
+        ]
+        ok = result["time"] <= budget and not loaded
+        failed |= not ok
+        print(
+            f"{'ok  ' if ok else 'FAIL'} {target:32} {result['time'] * 1000:8.1f} ms"
+            f"  (budget {budget * 1000:.0f} ms)"
+            + (f"  imported {', '.join(loaded)}" if loaded else "")
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
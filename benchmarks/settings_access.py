@@ -0,0 +1,57 @@
+"""
+Micro-benchmarks of the Settings access paths that sit in hot loops.
+
+    python benchmarks/settings_access.py [--number N]
+
+Prints the best time per operation, in nanoseconds, of several repeats.
+"""
+import argparse
+import pathlib
+import sys
+import timeit
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "src"))
+
+from epyqtsettings.settings import Settings  # noqa: E402
+
+
+def make_settings():
+    settings = Settings(**{f"key_{i}": float(i) for i in range(100)})
+    settings.establish_defaults(nested={"inner": {"value": 1.0}, "other": 2})
+    settings.upconvert_dicts()
+    return settings
+
+
+CASES = {
+    "get attribute": "settings.key_50",
+    "get item": "settings['key_50']",
+    "get method": "settings.keys",
+    "get nested": "settings.nested.inner.value",
+    "set attribute": "settings.key_50 = 1.0",
+    "set item": "settings['key_50'] = 1.0",
+    "set nested": "settings.nested.inner.value = 1.0",
+    "get_subset": "settings.get_subset(subset)",
+    "update": "settings.update(updates)",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--number", type=int, default=100000, help="Operations per repeat.")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeats, keeping the fastest.")
+    args = parser.parse_args()
+
+    namespace = {
+        "settings": make_settings(),
+        "subset": [f"key_{i}" for i in range(0, 100, 10)],
+        "updates": {f"key_{i}": 1.0 for i in range(0, 100, 10)},
+    }
+    for name, statement in CASES.items():
+        best = min(timeit.repeat(statement, number=args.number, repeat=args.repeat, globals=namespace))
+        print(f"{name:16} {best / args.number * 1e9:10.1f} ns")
+
+
+if __name__ == "__main__":
+    main()
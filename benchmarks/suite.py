@@ -0,0 +1,367 @@
+"""
+Headless benchmark suite for epyqtwidgets and epyqtsettings.
+
+Runs every benchmark in one process, under the offscreen Qt platform unless QT_QPA_PLATFORM is already set, and
+writes the results as JSON.  Given a baseline from an earlier run, every metric is compared against it, and the
+suite exits with status 1 if any got worse by more than the threshold.
+
+    python benchmarks/suite.py [--quick] [--only GROUP ...] [--output FILE] [--baseline FILE] [--threshold T]
+    python benchmarks/suite.py --compare BASELINE RESULTS [--threshold T]
+
+Groups:
+    image       frame rate of ImageWidget and MplImshowWidget set_data, at several image sizes
+    panel       construction time and memory of panels of settings widgets, and of SettingsEditor
+    settings    Settings save and load round trips, pickled and journaled, at several sizes
+    validator   IP4Validator and QDoubleValidator throughput
+    slider      DelayedSlider event delivery
+    access      Settings access paths, from settings_access.py
+    imports     cold import times, from import_time.py
+
+The JSON holds a "meta" object describing the machine and library versions, and a "results" object mapping each
+metric name to its value and unit.  Whether lower or higher is better follows from the unit.
+"""
+import argparse
+import json
+import os
+import pathlib
+import platform
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+BENCHMARKS = pathlib.Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARKS.parent / "src"))
+sys.path.insert(0, str(BENCHMARKS))
+
+import numpy as np  # noqa: E402
+import PyQt5.QtCore as qtc  # noqa: E402
+import PyQt5.QtGui as qtg  # noqa: E402
+import PyQt5.QtWidgets as qtw  # noqa: E402
+
+HIGHER_IS_BETTER = {"fps", "ops/s"}
+DEFAULT_THRESHOLD = .25
+
+
+_APPLICATION = []
+
+
+def _app():
+    if not _APPLICATION:
+        _APPLICATION.append(qtw.QApplication.instance() or qtw.QApplication(sys.argv[:1]))
+    return _APPLICATION[0]
+
+
+def _process_events(seconds=0.0):
+    app = _app()
+    end = time.perf_counter() + seconds
+    app.processEvents()
+    while time.perf_counter() < end:
+        app.processEvents()
+        time.sleep(.001)
+
+
+def _rss():
+    # Resident memory of this process in bytes, which unlike tracemalloc includes memory allocated by Qt.
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def _frame_rate(show_frame, frames, seconds):
+    # Frames per second of show_frame(i), after a warm up frame, over frames frames or seconds, whichever is first.
+    show_frame(0)
+    start = time.perf_counter()
+    count = 0
+    while count < frames and time.perf_counter() - start < seconds:
+        show_frame(count + 1)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def bench_image(quick):
+    from epyqtwidgets.image import ImageWidget
+    from epyqtwidgets.mpl import MplImshowWidget
+
+    sizes = (256, 1024) if quick else (256, 1024, 2048)
+    seconds = .5 if quick else 2.0
+    rng = np.random.default_rng(0)
+    for size in sizes:
+        # A few distinct frames, so that nothing can be skipped as unchanged.
+        frames = [rng.random((size, size), dtype=np.float32) for _ in range(4)]
+        extent = (0, size, 0, size)
+
+        widget = ImageWidget()
+        widget.resize(800, 800)
+        widget.show()
+
+        def show_frame(i):
+            widget.set_data(frames[i % len(frames)], extent)
+            widget.repaint()
+
+        yield f"image.ImageWidget.{size}", _frame_rate(show_frame, 500, seconds), "fps"
+        widget.close()
+        widget.deleteLater()
+
+        for blit in (False, True):
+            widget = MplImshowWidget(frames[0], blit=blit)
+            widget.resize(800, 800)
+            widget.show()
+            _process_events()
+            rate = _frame_rate(lambda i: widget.set_data(frames[i % len(frames)], extent), 200, seconds)
+            yield f"image.MplImshowWidget{'.blit' if blit else ''}.{size}", rate, "fps"
+            widget.close()
+            widget.deleteLater()
+        _process_events()
+
+
+def _panel(settings, count):
+    from epyqtsettings.settings_widgets import SettingsEntryBox
+
+    panel = qtw.QWidget()
+    layout = qtw.QVBoxLayout()
+    panel.setLayout(layout)
+    validator = qtg.QDoubleValidator()
+    for i in range(count):
+        layout.addWidget(SettingsEntryBox(settings, f"key_{i}", float, validator))
+    scroll = qtw.QScrollArea()
+    scroll.setWidget(panel)
+    return scroll
+
+
+def _editor(settings, count):
+    from epyqtsettings.settings_editor import SettingsEditor
+
+    return SettingsEditor(settings)
+
+
+def bench_panel(quick):
+    from epyqtsettings.settings import Settings
+
+    counts = (100, 1000) if quick else (100, 1000, 5000)
+    for kind, build in (("widgets", _panel), ("editor", _editor)):
+        for count in counts:
+            settings = Settings(**{f"key_{i}": float(i) for i in range(count)})
+            _process_events()
+            rss = _rss()
+            tracemalloc.start()
+            start = time.perf_counter()
+            widget = build(settings, count)
+            widget.resize(400, 800)
+            widget.show()
+            _process_events()
+            elapsed = time.perf_counter() - start
+            python_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            yield f"panel.{kind}.{count}.build", elapsed * 1000, "ms"
+            # Separate measures, since the growth of RSS already includes the Python heap: everything, Qt included,
+            # that the panel keeps resident, and the most the Python heap held while building it.
+            if rss:
+                yield f"panel.{kind}.{count}.memory.rss", (_rss() - rss) / 2**20, "MB"
+            yield f"panel.{kind}.{count}.memory.python_peak", python_peak / 2**20, "MB"
+            widget.close()
+            widget.deleteLater()
+            _process_events()
+
+
+def bench_settings(quick):
+    from epyqtsettings.settings import Settings
+
+    cases = {
+        "scalars.100": {f"key_{i}": float(i) for i in range(100)},
+        "scalars.10000": {f"key_{i}": float(i) for i in range(10000)},
+        "array.8MB": {"array": np.zeros(1 << 20), "value": 1.0},
+    }
+    if not quick:
+        cases["array.128MB"] = {"array": np.zeros(1 << 24), "value": 1.0}
+    repeat = 3 if quick else 10
+    with tempfile.TemporaryDirectory() as directory:
+        for name, values in cases.items():
+            for suffix in (".pkl", ".json"):
+                settings = Settings(**values)
+                # Each save goes to a new file, so that it is written in full, even where a save to the same file
+                # would only write what changed.
+                filenames = iter(os.path.join(directory, f"{name}.{i}{suffix}") for i in range(repeat + 1))
+                save = min(timeit.repeat(lambda: settings.save(next(filenames)), number=1, repeat=repeat))
+                filename = next(filenames)
+                settings.save(filename)
+                loaded = Settings()
+                load = min(timeit.repeat(lambda: loaded.load(filename), number=1, repeat=repeat))
+                yield f"settings.{suffix[1:]}.{name}.save", save * 1000, "ms"
+                yield f"settings.{suffix[1:]}.{name}.load", load * 1000, "ms"
+                if suffix == ".json":
+                    # A single change, the common case for a journal, which appends instead of rewriting.
+                    def edit_and_save():
+                        settings["value"] = settings.dict.get("value", 0.0) + 1.0
+                        settings.save(filename)
+
+                    edit = min(timeit.repeat(edit_and_save, number=1, repeat=repeat))
+                    yield f"settings.json.{name}.edit_save", edit * 1000, "ms"
+
+
+def bench_validator(quick):
+    from epyqtwidgets.ip4validator import IP4Validator
+
+    number = 20000 if quick else 200000
+    addresses = ["192.168.1.1", "10.0.0.", "localhost", "local", "256.1.1.1", "1.2.3.4.5", "abc", ""]
+    validator = IP4Validator()
+    start = time.perf_counter()
+    for i in range(number):
+        validator.validate(addresses[i % len(addresses)], 0)
+    yield "validator.IP4Validator", number / (time.perf_counter() - start), "ops/s"
+
+    numbers = ["1.5", "-2e3", "1e", "abc", "", "123456.789"]
+    validator = qtg.QDoubleValidator(-1e6, 1e6, 7)
+    start = time.perf_counter()
+    for i in range(number):
+        validator.validate(numbers[i % len(numbers)], 0)
+    yield "validator.QDoubleValidator", number / (time.perf_counter() - start), "ops/s"
+
+
+def bench_slider(quick):
+    from epyqtwidgets.slider import DelayedSlider
+
+    steps = 200 if quick else 1000
+    slider = DelayedSlider(time_delay=.02)
+    slider.setMaximum(steps)
+    emitted = []
+    slider.valueChanged.connect(lambda value: emitted.append((time.perf_counter(), value)))
+
+    # The cost of a change to the GUI thread, which should not depend on how slow the slots are.
+    start = time.perf_counter()
+    for value in range(1, steps + 1):
+        slider.setValue(value)
+    yield "slider.set_value", (time.perf_counter() - start) / steps * 1e6, "us"
+
+    # How long after the last change its value is delivered.
+    _process_events(.1)
+    emitted.clear()
+    slider.setValue(0)
+    changed = time.perf_counter()
+    while not emitted and time.perf_counter() - changed < 1:
+        _process_events(.0005)
+    yield "slider.delivery_latency", (emitted[-1][0] - changed) * 1000 if emitted else 1000.0, "ms"
+
+
+def bench_access(quick):
+    import settings_access
+
+    number = 20000 if quick else 100000
+    namespace = {
+        "settings": settings_access.make_settings(),
+        "subset": [f"key_{i}" for i in range(0, 100, 10)],
+        "updates": {f"key_{i}": 1.0 for i in range(0, 100, 10)},
+    }
+    for name, statement in settings_access.CASES.items():
+        best = min(timeit.repeat(statement, number=number, repeat=5, globals=namespace))
+        yield f"access.{name.replace(' ', '_')}", best / number * 1e9, "ns"
+
+
+def bench_imports(quick):
+    import import_time
+
+    for target in import_time.TARGETS:
+        yield f"imports.{target}", import_time.measure(target, 2 if quick else 5)["time"] * 1000, "ms"
+
+
+GROUPS = {
+    "image": bench_image,
+    "panel": bench_panel,
+    "settings": bench_settings,
+    "validator": bench_validator,
+    "slider": bench_slider,
+    "access": bench_access,
+    "imports": bench_imports,
+}
+
+
+def meta():
+    import matplotlib
+
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "qt": qtc.QT_VERSION_STR,
+        "pyqt": qtc.PYQT_VERSION_STR,
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+        "qpa_platform": os.environ.get("QT_QPA_PLATFORM"),
+    }
+
+
+def run(groups, quick):
+    _app()
+    results = {}
+    for group in groups:
+        for name, value, unit in GROUPS[group](quick):
+            results[name] = {"value": value, "unit": unit}
+            print(f"{name:48} {value:12.3f} {unit}", flush=True)
+    return {"meta": meta(), "results": results}
+
+
+def compare(baseline, current, threshold):
+    """
+    Print each metric against its baseline, and return the names of those that got worse by more than threshold, as
+    a fraction of the baseline.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None or old["unit"] != result["unit"] or not old["value"]:
+            continue
+        ratio = result["value"] / old["value"]
+        if result["unit"] in HIGHER_IS_BETTER:
+            worse = ratio < 1 / (1 + threshold)
+        else:
+            worse = ratio > 1 + threshold
+        if worse:
+            regressions.append(name)
+        print(
+            f"{'FAIL' if worse else 'ok  '} {name:48} {old['value']:12.3f} -> {result['value']:12.3f} {result['unit']}"
+            f"  ({(ratio - 1) * 100:+.0f}%)"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="Fewer sizes and shorter runs.")
+    parser.add_argument("--only", nargs="+", choices=sorted(GROUPS), help="Run only these groups.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare the results against this JSON file.")
+    parser.add_argument(
+        "--compare", nargs=2, metavar=("BASELINE", "RESULTS"), help="Compare two JSON files without running."
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help=f"The fraction by which a metric may get worse before it counts as a regression.  Defaults to "
+        f"{DEFAULT_THRESHOLD}."
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        baseline, current = (json.loads(pathlib.Path(path).read_text()) for path in args.compare)
+    else:
+        current = run(args.only or list(GROUPS), args.quick)
+        if args.output:
+            pathlib.Path(args.output).write_text(json.dumps(current, indent=2))
+        if not args.baseline:
+            return 0
+        baseline = json.loads(pathlib.Path(args.baseline).read_text())
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
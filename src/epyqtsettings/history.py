@@ -0,0 +1,325 @@
+"""
+Undo, redo and named snapshots for Settings.
+
+Every version of the settings is kept as a tree of persistent maps, where recording a change copies only the path from
+the root to the changed setting, and everything else is shared with the previous version.  The values of changed
+settings are copied when they are recorded, so arrays and other mutable values are shared between every version
+where they didn't change, and can't be modified in place behind the history's back.  Memory therefore grows with the
+size of the edits, not with the number of versions or snapshots.
+"""
+import collections
+import copy
+import sys
+
+from epyqtsettings.settings import Settings
+
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+# The number of keys a bucket may hold before it is split into a node of its own.
+_BUCKET_SIZE = 8
+_MAX_SHIFT = 60
+_HASH_MASK = (1 << 64) - 1
+_MISSING = object()
+_IMMUTABLE_TYPES = (type(None), bool, int, float, complex, str, bytes, frozenset, range)
+
+
+class _PersistentMap:
+    """
+    An immutable map, stored as a hash trie of tuples, so that assoc returns a new map that shares all but a few small
+    tuples and dicts with the old one.
+    """
+    __slots__ = ("_root", "_length")
+
+    def __init__(self, root=None, length=0):
+        self._root = root
+        self._length = length
+
+    def __len__(self):
+        return self._length
+
+    def get(self, key, default=None):
+        node, hash_, shift = self._root, hash(key) & _HASH_MASK, 0
+        while node is not None:
+            entry = node[(hash_ >> shift) & _MASK]
+            if type(entry) is not tuple:
+                return default if entry is None else entry.get(key, default)
+            node, shift = entry, shift + _BITS
+        return default
+
+    def assoc(self, key, value):
+        if self.get(key, _MISSING) is value:
+            return self
+        added = self.get(key, _MISSING) is _MISSING
+        root = _assoc(self._root, key, value, hash(key) & _HASH_MASK, 0)
+        return _PersistentMap(root, self._length + added)
+
+    def items(self):
+        return _items(self._root)
+
+    def changed_items(self, other):
+        """
+        Yield the items of this map whose values are not the very same objects in other, skipping any structure the
+        two maps share.
+        """
+        for key, value in _changed_items(self._root, other._root if other is not None else None):
+            if other is None or other.get(key, _MISSING) is not value:
+                yield key, value
+
+
+def _assoc(node, key, value, hash_, shift):
+    node = list(node) if node is not None else [None] * _WIDTH
+    index = (hash_ >> shift) & _MASK
+    entry = node[index]
+    if type(entry) is tuple:
+        node[index] = _assoc(entry, key, value, hash_, shift + _BITS)
+    else:
+        bucket = dict(entry) if entry is not None else {}
+        bucket[key] = value
+        if len(bucket) > _BUCKET_SIZE and shift < _MAX_SHIFT:
+            child = None
+            for each_key, each_value in bucket.items():
+                child = _assoc(child, each_key, each_value, hash(each_key) & _HASH_MASK, shift + _BITS)
+            node[index] = child
+        else:
+            node[index] = bucket
+    return tuple(node)
+
+
+def _items(node):
+    if node is None:
+        return
+    for entry in node:
+        if type(entry) is tuple:
+            yield from _items(entry)
+        elif entry is not None:
+            yield from entry.items()
+
+
+def _changed_items(node, other):
+    if node is other:
+        return
+    if node is None or other is None:
+        yield from _items(node)
+        return
+    for entry, other_entry in zip(node, other):
+        if entry is other_entry:
+            continue
+        if type(entry) is tuple and type(other_entry) is tuple:
+            yield from _changed_items(entry, other_entry)
+        elif type(entry) is tuple:
+            yield from _items(entry)
+        elif entry is not None:
+            yield from entry.items()
+
+
+class SettingsHistory:
+    """
+    Records the changes made to a Settings object, for undo and redo, and keeps named snapshots of it.
+
+    A version is recorded each time the Settings notifies its subscribers, so a burst of changes, like a bulk update
+    or anything done inside Settings.batch, is undone in one step.  Values modified in place must be reported with
+    mark_changed, as usual.  Undo and redo only change the settings that differ between versions, through
+    Settings.apply_changes, so they notify subscribers and trigger autosave like any other change.  Settings that were
+    added after a version are left alone when returning to it.
+
+    Creating the history copies every value of the settings once.  After that, memory grows only with the values that
+    are changed.
+
+    Parameters
+    ----------
+    settings : Settings
+        The settings to record.
+    max_size : int, optional
+        The number of versions to keep for undo and redo.  The oldest are forgotten first.  Named snapshots are kept
+        regardless.  Defaults to 100.
+
+    Public Properties
+    -----------------
+    can_undo : bool
+    can_redo : bool
+    snapshots : list of str
+        The names of the named snapshots.
+
+    Public Methods
+    --------------
+    undo() :
+        Return to the previous version.  Returns False if there wasn't one.
+    redo() :
+        Return to the version that was last undone.  Returns False if there wasn't one.
+    snapshot(name) :
+        Save the current version under name.
+    restore(name) :
+        Return to the version saved under name.  This is recorded as a new version, so it can be undone, unless the
+        settings already matched it.
+    delete_snapshot(name) :
+        Forget a named snapshot.
+    clear() :
+        Forget every version except the current one.
+    close() :
+        Stop recording.
+    """
+    def __init__(self, settings, max_size=100):
+        self.settings = settings
+        self._versions = collections.deque([_freeze(settings)], maxlen=max_size)
+        self._index = 0
+        self._snapshots = {}
+        self._applying = False
+        # Changes are reported with paths from the top level Settings.
+        _, path = settings._root()
+        self._prefix = f"{path}." if path else ""
+        self._token = settings.subscribe(self._record)
+
+    @property
+    def can_undo(self):
+        self.settings.flush_notifications()
+        return self._index > 0
+
+    @property
+    def can_redo(self):
+        self.settings.flush_notifications()
+        return self._index < len(self._versions) - 1
+
+    @property
+    def snapshots(self):
+        return list(self._snapshots)
+
+    def _record(self, paths):
+        if self._applying:
+            return
+        current = version = self._versions[self._index]
+        paths = {path[len(self._prefix):] for path in paths}
+        for path in sorted(paths):
+            # Settings replaced as a whole are recorded as a whole, which covers any changes below them.
+            if any(prefix in paths for prefix in _prefixes(path)):
+                continue
+            value = _lookup(self.settings, path)
+            if value is not _MISSING:
+                version = _assoc_path(version, path.split("."), _freeze(value))
+        if version is not current:
+            self._push(version)
+
+    def _push(self, version):
+        while len(self._versions) > self._index + 1:
+            self._versions.pop()
+        self._versions.append(version)
+        self._index = len(self._versions) - 1
+
+    def _apply(self, version):
+        # Returns True if any setting changed.  Pending changes belong to the version being left, so they are recorded
+        # first.
+        self.settings.flush_notifications()
+        current = self._versions[self._index]
+        changes = _diff(version, current)
+        self._applying = True
+        try:
+            if changes:
+                self.settings.apply_changes(changes)
+            self.settings.flush_notifications()
+        finally:
+            self._applying = False
+        return bool(changes)
+
+    def undo(self):
+        if not self.can_undo:
+            return False
+        self._apply(self._versions[self._index - 1])
+        self._index -= 1
+        return True
+
+    def redo(self):
+        if not self.can_redo:
+            return False
+        self._apply(self._versions[self._index + 1])
+        self._index += 1
+        return True
+
+    def snapshot(self, name):
+        self.settings.flush_notifications()
+        self._snapshots[name] = self._versions[self._index]
+
+    def restore(self, name):
+        version = self._snapshots[name]
+        if self._apply(version):
+            self._push(version)
+
+    def delete_snapshot(self, name):
+        del self._snapshots[name]
+
+    def clear(self):
+        self.settings.flush_notifications()
+        current = self._versions[self._index]
+        self._versions.clear()
+        self._versions.append(current)
+        self._index = 0
+
+    def close(self):
+        self.settings.unsubscribe(self._token)
+
+
+def _prefixes(path):
+    parts = path.split(".")
+    return (".".join(parts[:i]) for i in range(1, len(parts)))
+
+
+def _lookup(settings, path):
+    value = settings
+    for key in path.split("."):
+        try:
+            value = value[key]
+        except (KeyError, TypeError):
+            return _MISSING
+    return value
+
+
+def _assoc_path(version, keys, value):
+    key, *rest = keys
+    if rest:
+        child = version.get(key)
+        if type(child) is not _PersistentMap:
+            child = _PersistentMap()
+        value = _assoc_path(child, rest, value)
+    return version.assoc(key, value)
+
+
+def _freeze(value):
+    # A private copy of a value, for the history to keep.
+    if isinstance(value, (Settings, dict)):
+        version = _PersistentMap()
+        for key, item in value.dict.items() if isinstance(value, Settings) else value.items():
+            version = version.assoc(key, _freeze(item))
+        return version
+    if isinstance(value, _IMMUTABLE_TYPES):
+        return value
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and isinstance(value, numpy.ndarray):
+        value = value.copy()
+        value.flags.writeable = False
+        return value
+    return copy.deepcopy(value)
+
+
+def _thaw(value):
+    # A copy of a recorded value, to hand back to the settings.
+    if type(value) is _PersistentMap:
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, _IMMUTABLE_TYPES):
+        return value
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and isinstance(value, numpy.ndarray):
+        return value.copy()
+    return copy.deepcopy(value)
+
+
+def _diff(version, current):
+    # The settings that differ between two versions, as nested dicts of the values in version.
+    changes = {}
+    for key, value in version.changed_items(current):
+        old = current.get(key, _MISSING)
+        if type(value) is _PersistentMap and type(old) is _PersistentMap:
+            nested = _diff(value, old)
+            if nested:
+                changes[key] = nested
+        else:
+            changes[key] = _thaw(value)
+    return changes
@@ -0,0 +1,255 @@
+"""
+A safe, append only storage format for Settings, used for settings files whose names end in .json.
+
+The settings are stored as a JSON snapshot.  Every save after that appends only the settings that changed to a journal
+next to the snapshot, one JSON record per line, so the cost of a save is proportional to the change rather than to
+the size of the settings.  Once the journal grows past compact_bytes, it is folded into a new snapshot.  Loading reads
+the snapshot and replays the journal on top of it, and never unpickles anything, so settings files from shared
+locations are safe to load.
+
+Besides the JSON types, values may be tuples, sets, bytes, complex numbers, and numpy arrays and scalars.  Path-like
+values, like pathlib.Path, are saved as, and so loaded as, strings.
+"""
+import base64
+import json
+import os
+import secrets
+import sys
+import threading
+
+from epyqtsettings.settings import Settings, _ArrayRef, _atomic_write
+
+JOURNAL_SUFFIX = ".journal"
+COMPACT_BYTES = 1 << 20
+
+
+class Journal:
+    """
+    Keeps track of the snapshot and journal of a Settings, and of the settings that changed since they were last
+    saved.  Created when a Settings loads or saves a .json file.
+
+    Public Properties
+    -----------------
+    compact_bytes : int
+        The size the journal may grow to before it is folded into a new snapshot.
+    journal_bytes : int
+        The current size of the journal.
+    """
+    def __init__(self, compact_bytes=COMPACT_BYTES):
+        self.compact_bytes = compact_bytes
+        self.journal_bytes = 0
+        self._filename = None
+        # Identifies a snapshot, and the journal that belongs to it.  None if the journal can't be appended to.
+        self._generation = None
+        self._dirty = set()
+        self._lock = threading.Lock()
+        # Held across a whole read, save or compaction, so that a save by the autosave thread and one by the
+        # application can't both take the same changes, or interleave an append with a compaction.
+        self._file_lock = threading.RLock()
+
+    def mark(self, paths):
+        with self._lock:
+            self._dirty.update(paths)
+
+    def read(self, filename):
+        """
+        Return the settings stored in filename and its journal, as nested dicts.
+        """
+        with self._file_lock:
+            return self._read(os.path.abspath(filename))
+
+    def _read(self, filename):
+        with open(filename, "rb") as inFile:
+            snapshot = json.loads(inFile.read(), object_hook=_decode)
+        data, generation = snapshot["settings"], snapshot["generation"]
+        try:
+            with open(filename + JOURNAL_SUFFIX, "rb") as inFile:
+                lines = inFile.read().splitlines(keepends=True)
+        except FileNotFoundError:
+            lines = []
+
+        size = 0
+        if lines and _header_generation(lines[0]) == generation:
+            size = len(lines[0])
+            for line in lines[1:]:
+                try:
+                    record = json.loads(line, object_hook=_decode)
+                except ValueError:
+                    # Torn by a crash partway through an append.  Anything appended after it would be lost, so the
+                    # next save writes a new snapshot instead.
+                    generation = None
+                    break
+                _assign(data, record["path"], record["value"])
+                size += len(line)
+        else:
+            # A journal left over from before a crash in the middle of compacting, which the snapshot already holds.
+            generation = None
+
+        self._filename = filename
+        self._generation = generation
+        self.journal_bytes = size
+        return data
+
+    def save(self, settings, filename, arrays=None):
+        """
+        Save settings to filename, by appending the settings that changed to its journal if possible.
+        """
+        filename = os.path.abspath(filename)
+        with self._file_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+            try:
+                if (
+                    filename != self._filename or self._generation is None or settings._root()[1]
+                    or not os.path.exists(filename + JOURNAL_SUFFIX)
+                ):
+                    self._compact(settings, filename, arrays)
+                    return
+                self._append(settings, filename, arrays, dirty)
+                if self.journal_bytes > self.compact_bytes:
+                    self._compact(settings, filename, arrays)
+            except BaseException:
+                self.mark(dirty)
+                raise
+
+    def compact(self, settings, filename, arrays=None):
+        """
+        Write all of settings to a new snapshot in filename, and start a new, empty journal.
+        """
+        with self._file_lock:
+            self._compact(settings, os.path.abspath(filename), arrays)
+
+    def _compact(self, settings, filename, arrays):
+        data = settings.to_dict()
+        if arrays is not None:
+            data, files = arrays.externalize(data, filename)
+        generation = secrets.token_hex(8)
+        _atomic_write(filename, _dumps({"generation": generation, "settings": data}))
+        # A crash here leaves the old journal, which read ignores because its generation no longer matches.
+        header = _dumps({"generation": generation}) + b"\n"
+        _atomic_write(filename + JOURNAL_SUFFIX, header)
+        if arrays is not None:
+            arrays.commit(files, filename)
+        self._filename = filename
+        self._generation = generation
+        self.journal_bytes = len(header)
+
+    def _append(self, settings, filename, arrays, dirty):
+        values = {}
+        for path in sorted(dirty):
+            # Settings replaced as a whole are written as a whole, which covers any changes below them.
+            if any(prefix in dirty for prefix in _prefixes(path)):
+                continue
+            value = _lookup(settings, path)
+            if value is not _MISSING:
+                values[path] = value
+        if not values:
+            return
+        if arrays is not None:
+            # The dotted paths are used as keys as they are, so arrays are tracked under the same paths as when they
+            # are saved in a snapshot.
+            values, files = arrays.externalize(values, filename)
+        records = b"".join(_dumps({"path": path, "value": value}) + b"\n" for path, value in values.items())
+        with open(filename + JOURNAL_SUFFIX, "ab") as outFile:
+            outFile.write(records)
+            outFile.flush()
+            os.fsync(outFile.fileno())
+        if arrays is not None:
+            arrays.commit(files, filename, partial=True)
+        self.journal_bytes += len(records)
+
+
+_MISSING = object()
+
+
+def _prefixes(path):
+    parts = path.split(".")
+    return (".".join(parts[:i]) for i in range(1, len(parts)))
+
+
+def _lookup(settings, path):
+    value = settings
+    for key in path.split("."):
+        try:
+            value = value[key]
+        except (KeyError, TypeError):
+            return _MISSING
+    return value.to_dict() if isinstance(value, Settings) else value
+
+
+def _assign(data, path, value):
+    *parents, key = path.split(".")
+    for parent in parents:
+        child = data.get(parent)
+        if type(child) is not dict:
+            child = data[parent] = {}
+        data = child
+    data[key] = value
+
+
+def _header_generation(line):
+    try:
+        return json.loads(line)["generation"]
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def _dumps(value):
+    return json.dumps(_to_json(value), separators=(",", ":")).encode()
+
+
+def _to_json(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            if not isinstance(key, str):
+                raise TypeError(f"Settings can only save str keys to a .json file, not {key!r}.")
+            result[key] = _to_json(item)
+        return result
+    if isinstance(value, list):
+        return [_to_json(item) for item in value]
+    if isinstance(value, tuple):
+        return {"__tuple__": [_to_json(item) for item in value]}
+    if isinstance(value, (set, frozenset)):
+        return {"__set__": [_to_json(item) for item in value]}
+    if isinstance(value, (bytes, bytearray)):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, complex):
+        return {"__complex__": [value.real, value.imag]}
+    if isinstance(value, _ArrayRef):
+        return {"__array_file__": value.filename}
+    if isinstance(value, os.PathLike):
+        # Like settings_path, which is a setting itself.  Pickled settings files accept them, so they are saved here
+        # too, as the str or bytes they stand for.
+        return _to_json(os.fspath(value))
+    numpy = sys.modules.get("numpy")
+    if numpy is not None:
+        if isinstance(value, numpy.ndarray) and not value.dtype.hasobject and value.dtype.fields is None:
+            return {
+                "__ndarray__": base64.b64encode(numpy.ascontiguousarray(value).tobytes()).decode("ascii"),
+                "dtype": value.dtype.str,
+                "shape": list(value.shape),
+            }
+        if isinstance(value, numpy.generic):
+            return _to_json(value.item())
+    raise TypeError(f"Settings can not save values of type {type(value).__name__} to a .json file.")
+
+
+def _decode(obj):
+    if "__tuple__" in obj:
+        return tuple(obj["__tuple__"])
+    if "__set__" in obj:
+        return set(obj["__set__"])
+    if "__bytes__" in obj:
+        return base64.b64decode(obj["__bytes__"])
+    if "__complex__" in obj:
+        return complex(*obj["__complex__"])
+    if "__array_file__" in obj:
+        return _ArrayRef(obj["__array_file__"])
+    if "__ndarray__" in obj:
+        import numpy
+        data = bytearray(base64.b64decode(obj["__ndarray__"]))
+        return numpy.frombuffer(data, dtype=obj["dtype"]).reshape(obj["shape"])
+    return obj
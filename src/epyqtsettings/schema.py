@@ -0,0 +1,389 @@
+"""
+Declarative descriptions of settings, which give their types, defaults, ranges and options in one place, validate a
+whole Settings object at once, and build panels of settings_widgets for them.
+
+    schema = Schema(
+        Group("Camera", [
+            Field("exposure", float, 10.0, low=0.1, high=1000.0, label="Exposure (ms)"),
+            Field("binning", int, 1, choices=[1, 2, 4]),
+            Field("roi", float, (0.0, 1.0), widget="range"),
+        ]),
+        Group("Output", [
+            Field("save_path", str, ".", widget="file", mode="save"),
+            Field("overlay", str, "#ff0000", widget="color"),
+        ]),
+    )
+    errors = schema.load(settings)
+    panel = SchemaPanel(settings, schema)
+
+Groups are only built the first time they are shown, so a large dialog only pays for the page that is open.
+"""
+import types
+
+import numpy as np
+import PyQt5.QtGui as qtg
+import PyQt5.QtWidgets as qtw
+
+from epyqtsettings import settings_widgets
+
+
+class Field:
+    """
+    Describes a single setting.
+
+    Parameters
+    ----------
+    key : str
+        The key of the setting.
+    value_type : type, optional
+        The type of the value: float, the default, int, str or bool.  For range and vector settings, the type of
+        each component.
+    default : optional
+        The value used when the setting is missing or invalid.
+    low, high : float, optional
+        The inclusive limits of numeric values, and of each component of ranges and vectors.
+    choices : sequence, optional
+        The allowed values.  Shown as a combo box.
+    widget : str, optional
+        The kind of widget to build: "entry", "check", "combo", "range", "vector", "file" or "color".  Inferred from
+        value_type and choices if not given.
+    label : str, optional
+        Shown next to the widget.  Defaults to the key, with underscores replaced by spaces.
+    callback : callable or list of callables, optional
+        Passed to the widget, to be called when the value is changed through it.
+    validator : QValidator, optional
+        Overrides the validator built from value_type, low and high.
+    kwargs
+        Any other arguments for the widget, like filter, mode and system_path for file settings, or rate_limit for
+        entry, range and vector settings.
+    """
+    def __init__(
+        self, key, value_type=float, default=None, low=None, high=None, choices=None, widget=None, label=None,
+        callback=None, validator=None, **kwargs
+    ):
+        self.key = key
+        self.value_type = value_type
+        self.default = default
+        self.low = low
+        self.high = high
+        self.choices = list(choices) if choices is not None else None
+        if widget is None:
+            if choices is not None:
+                widget = "combo"
+            elif value_type is bool:
+                widget = "check"
+            else:
+                widget = "entry"
+        self.widget = widget
+        self.label = label if label is not None else key.replace("_", " ")
+        self.callback = callback
+        self.validator = validator
+        self.kwargs = kwargs
+
+    def make_validator(self):
+        if self.validator is not None:
+            return self.validator
+        if self.value_type is int:
+            validator = qtg.QIntValidator()
+        elif self.value_type is float:
+            validator = qtg.QDoubleValidator()
+        else:
+            return None
+        if self.low is not None:
+            validator.setBottom(self.low)
+        if self.high is not None:
+            validator.setTop(self.high)
+        return validator
+
+    def build(self, settings):
+        """
+        Build the settings_widgets widget for this field.
+        """
+        if self.widget == "entry":
+            return settings_widgets.SettingsEntryBox(
+                settings, self.key, self.value_type, self.make_validator(), self.callback, self.label, **self.kwargs
+            )
+        if self.widget == "check":
+            return settings_widgets.SettingsCheckBox(settings, self.key, self.label, self.callback)
+        if self.widget == "combo":
+            return settings_widgets.SettingsComboBox(
+                types.SimpleNamespace(settings=settings), self.label, self.key, self.choices, self.callback
+            )
+        if self.widget == "range":
+            return _RangeField(settings, self)
+        if self.widget == "vector":
+            return settings_widgets.SettingsVectorBox(settings, self.label, self.key, self.callback, **self.kwargs)
+        if self.widget == "file":
+            kwargs = dict(self.kwargs)
+            system_path = kwargs.pop("system_path", ".")
+            return settings_widgets.SettingsFileBox(settings, self.key, system_path, callback=self.callback, **kwargs)
+        if self.widget == "color":
+            widget = qtw.QWidget()
+            layout = qtw.QHBoxLayout()
+            layout.setContentsMargins(0, 0, 0, 0)
+            widget.setLayout(layout)
+            layout.addWidget(qtw.QLabel(self.label))
+            layout.addWidget(settings_widgets.ColorEntryButton(settings, self.key, self.callback or (lambda: None)))
+            return widget
+        raise ValueError(f"Field: unknown widget {self.widget!r} for {self.key}.")
+
+
+class _RangeField(settings_widgets.SettingsRangeBox):
+    """
+    A SettingsRangeBox for a single setting holding a (low, high) pair, through a proxy of its two components.
+    """
+    def __init__(self, settings, field):
+        self._proxy = _PairProxy(settings, field.key)
+        super().__init__(
+            self._proxy, field.label, 0, 1, field.value_type, field.make_validator(), field.callback,
+            **field.kwargs
+        )
+        settings_widgets.bind_to_settings(self, settings, (field.key,), self.refresh)
+
+
+class _PairProxy:
+    # Presents a setting holding a pair as a settings object with keys 0 and 1, for SettingsRangeBox.
+    def __init__(self, settings, key):
+        self.settings = settings
+        self.key = key
+
+    @property
+    def dict(self):
+        return dict(enumerate(self.settings.dict[self.key]))
+
+    def update(self, updates):
+        pair = self.settings.dict[self.key]
+        values = (updates.get(0, pair[0]), updates.get(1, pair[1]))
+        self.settings[self.key] = type(pair)(values) if isinstance(pair, (list, tuple)) else values
+
+    def subscribe(self, callback, pattern="*"):
+        # The range box is bound to the real setting instead.
+        return None
+
+    def unsubscribe(self, token):
+        pass
+
+
+class Group:
+    """
+    A named group of fields and nested groups.  Top level groups become tabs of a SchemaPanel, and nested groups
+    become group boxes.
+    """
+    def __init__(self, name, fields=(), groups=()):
+        self.name = name
+        self.fields = list(fields)
+        self.groups = list(groups)
+
+    def all_fields(self):
+        yield from self.fields
+        for group in self.groups:
+            yield from group.all_fields()
+
+
+class Schema:
+    """
+    A set of fields, optionally organized into groups.
+
+    Parameters
+    ----------
+    items : Field or Group
+        The fields and groups of the schema.
+
+    Public Methods
+    --------------
+    defaults() :
+        Return a dict of the default value of every field.
+    validate(settings) :
+        Return a dict mapping the keys of invalid settings to descriptions of the problem.
+    load(settings, fix=True) :
+        Add any missing settings with their defaults, and validate the rest.  If fix, invalid numbers are clamped
+        to their limits, and other invalid values replaced with their defaults.  Returns the errors found.
+    """
+    def __init__(self, *items):
+        self.fields = [item for item in items if isinstance(item, Field)]
+        self.groups = [item for item in items if isinstance(item, Group)]
+        self._all_fields = self.fields + [field for group in self.groups for field in group.all_fields()]
+        self.by_key = {field.key: field for field in self._all_fields}
+
+    def __iter__(self):
+        return iter(self._all_fields)
+
+    def defaults(self):
+        return {field.key: field.default for field in self._all_fields if field.default is not None}
+
+    def load(self, settings, fix=True):
+        settings.establish_defaults(**self.defaults())
+        errors = self.validate(settings)
+        if fix and errors:
+            fixes = {}
+            for key in errors:
+                fixes[key] = self._fixed(self.by_key[key], settings.dict.get(key))
+            settings.update({key: value for key, value in fixes.items() if value is not None})
+        return errors
+
+    def _fixed(self, field, value):
+        if field.value_type in (int, float) and field.choices is None and field.widget not in ("range", "vector"):
+            try:
+                value = field.value_type(value)
+            except (TypeError, ValueError):
+                return field.default
+            if field.low is not None:
+                value = max(value, field.value_type(field.low))
+            if field.high is not None:
+                value = min(value, field.value_type(field.high))
+            return value
+        return field.default
+
+    def validate(self, settings):
+        values = settings.dict
+        errors = {}
+        numbers = []
+        for field in self._all_fields:
+            key = field.key
+            if key not in values:
+                errors[key] = "missing"
+            elif field.choices is not None:
+                if values[key] not in field.choices:
+                    errors[key] = f"{values[key]!r} is not one of {field.choices}"
+            elif field.value_type in (int, float):
+                numbers.append(field)
+            elif field.value_type is bool:
+                if not isinstance(values[key], bool):
+                    errors[key] = f"{values[key]!r} is not a bool"
+            elif not isinstance(values[key], field.value_type):
+                errors[key] = f"{values[key]!r} is not a {field.value_type.__name__}"
+        if numbers:
+            errors.update(_validate_numbers(numbers, values))
+        return errors
+
+
+def _validate_numbers(fields, values):
+    # Checks the types and limits of every numeric setting, and every component of numeric ranges and vectors, in a
+    # few array operations over all of them at once.
+    errors = {}
+    owners, flat = [], []
+    for index, field in enumerate(fields):
+        value = values[field.key]
+        if field.widget in ("range", "vector"):
+            try:
+                components = list(value)
+            except TypeError:
+                errors[field.key] = f"{value!r} is not a sequence"
+                continue
+            if field.widget == "range" and len(components) != 2:
+                errors[field.key] = f"{value!r} is not a (low, high) pair"
+                continue
+        else:
+            components = [value]
+        owners.extend([index] * len(components))
+        flat.extend(components)
+    owners = np.asarray(owners, dtype=np.intp)
+
+    # Booleans are ints to Python, but not valid numbers here.  Anything that isn't a real number becomes NaN.
+    is_number = np.fromiter(
+        (isinstance(each, (int, float, np.number)) and not isinstance(each, (bool, np.bool_)) for each in flat),
+        dtype=bool, count=len(flat)
+    )
+    numbers = np.array([each if ok else np.nan for each, ok in zip(flat, is_number)], dtype=float)
+    lows = np.array([-np.inf if fields[i].low is None else fields[i].low for i in range(len(fields))])
+    highs = np.array([np.inf if fields[i].high is None else fields[i].high for i in range(len(fields))])
+    integral = np.array([field.value_type is int for field in fields])
+
+    bad_type = ~is_number | (integral[owners] & (np.floor(numbers) != numbers))
+    out_of_range = ~bad_type & ((numbers < lows[owners]) | (numbers > highs[owners]))
+    for index in np.unique(owners[bad_type]):
+        field = fields[index]
+        errors[field.key] = f"{values[field.key]!r} is not a valid {field.value_type.__name__}"
+    for index in np.unique(owners[out_of_range]):
+        field = fields[index]
+        errors.setdefault(field.key, f"{values[field.key]!r} is outside [{field.low}, {field.high}]")
+    for field in fields:
+        if field.widget == "range" and field.key not in errors:
+            low, high = values[field.key]
+            if low >= high:
+                errors[field.key] = f"{values[field.key]!r} is not increasing"
+    return errors
+
+
+class _LazyPage(qtw.QWidget):
+    """
+    A page that builds the widgets of its group the first time it is shown.
+    """
+    def __init__(self, settings, group, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.settings = settings
+        self.group = group
+        self.built = False
+        self.setLayout(qtw.QVBoxLayout())
+
+    def showEvent(self, event):
+        if not self.built:
+            self.build()
+        super().showEvent(event)
+
+    def build(self):
+        # Built into a container that is only added once every widget was made, so that a page that fails to build
+        # is left empty, and is tried again the next time it is shown.
+        contents = qtw.QWidget()
+        layout = qtw.QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        contents.setLayout(layout)
+        _add_group_contents(layout, self.settings, self.group)
+        layout.addStretch()
+        self.layout().addWidget(contents)
+        self.built = True
+
+
+def _add_group_contents(layout, settings, group):
+    for field in group.fields:
+        layout.addWidget(field.build(settings))
+    for child in group.groups:
+        box = qtw.QGroupBox(child.name)
+        box_layout = qtw.QVBoxLayout()
+        box.setLayout(box_layout)
+        _add_group_contents(box_layout, settings, child)
+        layout.addWidget(box)
+
+
+class SchemaPanel(qtw.QWidget):
+    """
+    A panel of settings_widgets for the fields of a Schema.  Fields that aren't in a group are shown at the top, and
+    each top level group gets a tab, which is only built the first time it is shown.
+
+    Parameters
+    ----------
+    settings : Settings
+        The settings to edit.  Call schema.load on it first, so that every field has a valid value.
+    schema : Schema
+        The fields to show.
+    args and kwargs passed to qtw.QWidget constructor
+
+    Public Properties
+    -----------------
+    pages : dict
+        Maps the name of each top level group to its page.  page.built tells whether its widgets exist yet.
+    tabs : QTabWidget
+        Holds the pages.  None if the schema has no groups.
+    """
+    def __init__(self, settings, schema, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.settings = settings
+        self.schema = schema
+        layout = qtw.QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(layout)
+
+        for field in schema.fields:
+            layout.addWidget(field.build(settings))
+        self.pages = {}
+        self.tabs = None
+        if schema.groups:
+            self.tabs = qtw.QTabWidget()
+            for group in schema.groups:
+                page = _LazyPage(settings, group)
+                self.pages[group.name] = page
+                scroll = qtw.QScrollArea()
+                scroll.setWidgetResizable(True)
+                scroll.setWidget(page)
+                self.tabs.addTab(scroll, group.name)
+            layout.addWidget(self.tabs)
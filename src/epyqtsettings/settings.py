@@ -1,12 +1,51 @@
+import atexit
+import contextlib
+import fnmatch
+import hashlib
+import os
 import pickle
+import re
+import secrets
+import sys
+import tempfile
+import threading
+import time
+import weakref
+
+
+class MissingSettingError(AttributeError, KeyError):
+    """
+    Raised when reading a setting that does not exist.  It is both an AttributeError, so hasattr and getattr with a
+    default work, and a KeyError, which is what was raised historically.
+    """
 
 
 class Settings:
     """
     A simple settings data class, which is basically just a wrapper for a dict that exposes its keys as attributes
+
+    Changes made through attribute or item assignment, update, establish_defaults or mark_changed are tracked, so that
+    they can drive autosave and be subscribed to.  Values modified in place, like an element of a list, must be
+    reported with mark_changed.
+
+    Reading a setting as an attribute is a single dict lookup.  Real attributes, like methods, still take precedence
+    over settings with the same name.  Settings are slotted, and nested Settings made by upconvert_dicts carry nothing
+    but their dict and a link to their parent.
+
+    Large arrays can be saved to files of their own, with enable_array_files.
+
+    If settings_path ends in .json, the settings are saved as a JSON snapshot plus an append only journal of changes,
+    as described in epyqtsettings.journal, rather than pickled.  This is safe to load from shared locations, and each
+    save only writes the settings that changed.
     """
+    __slots__ = ("dict", "_parent", "autosaver", "_notifier", "_watcher", "_arrays", "_journal")
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._ATTRIBUTE_NAMES = frozenset(dir(cls))
+
     def __init__(self, settings_path=None, **kwargs):
-        object.__setattr__(self, "dict", dict(**kwargs))
+        self._init_slots(dict(**kwargs))
         self.settings_path = settings_path
         if self.settings_path is not None:
             try:
@@ -19,55 +58,886 @@ class Settings:
 
     def update(self, updates):
         self.dict.update(updates)
+        self._changed(updates.keys())
 
     def establish_defaults(self, **kwargs):
         keys = set(self.keys())
+        added = []
         for key, value in kwargs.items():
             if key not in keys:
                 self.dict[key] = value
+                added.append(key)
+        if added:
+            self._changed(added)
         return set(kwargs.keys())
 
     def get_subset(self, subset):
-        return {key: self.dict[key] for key in subset}
+        settings = _get_dict(self)
+        return {key: settings[key] for key in subset}
+
+    def mark_changed(self, *keys):
+        """
+        Report that the values of keys were modified in place.
+        """
+        root, path = self._root()
+        if _get_arrays(root) is not None:
+            _get_arrays(root).mark_dirty(f"{path}.{key}" if path else key for key in keys)
+        self._changed(keys)
 
     def __getattribute__(self, key):
+        # The common case, reading a setting, is one set lookup and one dict lookup, and raises nothing.
+        if key not in type(self)._ATTRIBUTE_NAMES:
+            try:
+                return _get_dict(self)[key]
+            except KeyError:
+                pass
         try:
             return object.__getattribute__(self, key)
         except AttributeError:
-            return self.dict[key]
+            raise MissingSettingError(key) from None
 
     def __setattr__(self, key, value):
         if key in {"dict", "keys", "update", "dict"}:
             object.__setattr__(self, key, value)
         else:
-            self.dict[key] = value
+            _get_dict(self)[key] = value
+            self._changed((key,))
+
+    def __getitem__(self, key):
+        return _get_dict(self)[key]
+
+    def __setitem__(self, key, value):
+        _get_dict(self)[key] = value
+        self._changed((key,))
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        if type(state) is dict and len(state) == 1 and type(state.get("dict")) is dict:
+            # Settings pickled before they were slotted, like those nested in older settings files, have their
+            # instance __dict__ as their state.
+            state = state["dict"]
+        self._init_slots(state)
+        self.upconvert_dicts()
+
+    def _init_slots(self, data, parent=None):
+        object.__setattr__(self, "dict", data)
+        object.__setattr__(self, "_parent", parent)
+        object.__setattr__(self, "autosaver", None)
+        object.__setattr__(self, "_notifier", None)
+        object.__setattr__(self, "_watcher", None)
+        object.__setattr__(self, "_arrays", None)
+        object.__setattr__(self, "_journal", None)
+
+    def _changed(self, keys, autosave=True):
+        parent = _get_parent(self)
+        if parent is not None:
+            parent, prefix = parent
+            parent._changed([f"{prefix}.{key}" for key in keys], autosave)
+            return
+        if autosave and _get_journal(self) is not None:
+            _get_journal(self).mark(keys)
+        if autosave and _get_autosaver(self) is not None:
+            _get_autosaver(self).schedule()
+        if _get_notifier(self) is not None:
+            _get_notifier(self).notify(keys)
+
+    def _root(self):
+        # The top level Settings, and the dotted path from it to this one.
+        settings, path = self, ""
+        while _get_parent(settings) is not None:
+            settings, key = _get_parent(settings)
+            path = f"{key}.{path}" if path else key
+        return settings, path
+
+    def subscribe(self, callback, pattern="*"):
+        """
+        Call callback whenever a setting matching pattern changes, and return a token for unsubscribe.
+
+        pattern is a dotted path relative to this Settings, like "calibration.gain", and matches that setting, any
+        setting nested below it, and any Settings above it being replaced.  "*", the default, matches everything.
+        Patterns containing other wildcards are matched against changed paths with fnmatch.
+
+        Notifications are coalesced: callback is called as callback(paths) with the set of dotted paths, from the top
+        level Settings, of every matching setting that changed since its last call.  When a Qt application exists,
+        this happens at most once per pass through the event loop, so a bulk update or a reload notifies each
+        subscriber once.  Without one, notifications are delivered at the end of each change, or at the end of a
+        batch.
+        """
+        root, path = self._root()
+        if _get_notifier(root) is None:
+            object.__setattr__(root, "_notifier", _Notifier())
+        if path:
+            pattern = path if pattern == "*" else f"{path}.{pattern}"
+        return _get_notifier(root).subscribe(callback, pattern)
+
+    def unsubscribe(self, token):
+        root, _ = self._root()
+        if _get_notifier(root) is not None:
+            _get_notifier(root).unsubscribe(token)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Context manager that holds notifications of every change made inside it, and delivers them once it exits.
+        """
+        root, _ = self._root()
+        if _get_notifier(root) is None:
+            yield
+            return
+        notifier = _get_notifier(root)
+        notifier.depth += 1
+        try:
+            yield
+        finally:
+            notifier.depth -= 1
+            if notifier.depth == 0:
+                notifier.schedule()
+
+    def flush_notifications(self):
+        """
+        Immediately deliver any pending notifications.
+        """
+        root, _ = self._root()
+        if _get_notifier(root) is not None:
+            _get_notifier(root).flush()
 
     def load(self, filename):
-        with open(filename, "rb") as inFile:
-            self.update(pickle.load(inFile))
+        data = self._read(filename)
+        if _get_journal(self) is not None:
+            # Settings that aren't in the file yet have to go in the next save.
+            _get_journal(self).mark(self.dict.keys() - data.keys())
+        self.dict.update(data)
         self.upconvert_dicts()
 
     def reload(self, filename):
         """
         Differs from load in that this function will update in place, so references are preserved.
+
+        Only the settings whose values differ from the file are changed, and only they are reported to subscribers.
+        Returns the set of dotted paths that changed.
         """
-        with open(filename, "rb") as inFile:
-            new_data = pickle.load(inFile)
-            for key, value in new_data.items():
-                if type(value is dict):
-                    self.dict[key].update(value)
-                else:
-                    self.dict[key] = value
+        return self.apply_changes(self._read(filename), autosave=False)
+
+    def apply_changes(self, data, autosave=True):
+        """
+        Update in place from a nested dict of new values, so references are preserved.  Each new value is compared to
+        the current one, and only the leaves that differ are assigned, and reported to subscribers and autosave.
+        Nested dicts are merged into the matching nested Settings.  Returns the set of dotted paths, relative to this
+        Settings, that changed.
+        """
+        changed = []
+        self._merge(data, "", changed)
+        if changed:
+            self._changed(changed, autosave)
+        return set(changed)
+
+    def _merge(self, data, prefix, changed):
+        settings = _get_dict(self)
+        for key, value in data.items():
+            current = settings.get(key, _MISSING)
+            if isinstance(value, Settings):
+                value = value.to_dict()
+            if type(value) is dict and isinstance(current, Settings):
+                current._merge(value, f"{prefix}{key}.", changed)
+            elif not _equal(current, value):
+                settings[key] = value
+                if type(value) is dict:
+                    self._upconvert(key)
+                changed.append(f"{prefix}{key}")
 
     def save(self, filename=None):
         if filename is None:
             filename = self.settings_path
         if filename is None:
             raise ValueError("Settings file path was never provided.")
-        with open(filename, "wb") as outFile:
-            pickle.dump(self.dict, outFile)
+        arrays = _get_arrays(self)
+        with _io_span("save", filename):
+            if _is_journaled(filename):
+                self._ensure_journal().save(self, filename, arrays)
+            else:
+                data = self.to_dict()
+                if arrays is not None:
+                    data, files = arrays.externalize(data, filename)
+                _atomic_write(filename, pickle.dumps(data))
+                if arrays is not None:
+                    arrays.commit(files, filename)
+        watcher = _get_watcher(self)
+        if watcher is not None and watcher.watches(filename):
+            watcher.remember()
+
+    def _read(self, filename):
+        # Read a settings file as nested dicts, with any array files loaded.
+        with _io_span("load", filename):
+            if _is_journaled(filename):
+                data = self._ensure_journal().read(filename)
+            else:
+                with open(filename, "rb") as inFile:
+                    data = pickle.load(inFile)
+            arrays = _get_arrays(self)
+            if arrays is None:
+                arrays = _ArrayStore()
+                if arrays.resolve(data, filename):
+                    object.__setattr__(self, "_arrays", arrays)
+            else:
+                arrays.resolve(data, filename)
+        return data
+
+    def _ensure_journal(self):
+        journal = _get_journal(self)
+        if journal is None:
+            from epyqtsettings.journal import Journal
+            journal = Journal()
+            object.__setattr__(self, "_journal", journal)
+        return journal
+
+    def _storage_files(self, filename):
+        # Every file that holds the settings saved to filename, other than array files.
+        if _is_journaled(filename):
+            from epyqtsettings.journal import JOURNAL_SUFFIX
+            return [filename, filename + JOURNAL_SUFFIX]
+        return [filename]
+
+    def to_dict(self):
+        """
+        Return the settings as plain nested dicts, with nested Settings converted.  Values are not copied.
+        """
+        return {
+            key: value.to_dict() if isinstance(value, Settings) else value for key, value in self.dict.copy().items()
+        }
 
     def upconvert_dicts(self):
         for key in self.keys():
             if type(self.dict[key]) is dict:
-                self.dict[key] = Settings(**self.dict[key])
+                self._upconvert(key)
+
+    def _upconvert(self, key):
+        child = Settings.__new__(Settings)
+        child._init_slots(self.dict[key], (self, key))
+        child.upconvert_dicts()
+        self.dict[key] = child
+
+    def enable_autosave(self, delay=.5):
+        """
+        Automatically save to settings_path whenever the settings change.
+
+        A burst of changes is coalesced into a single write, made delay seconds after the last change in the burst.
+        Serialization and writing happen on a background thread, and the file is replaced atomically, so a crash
+        mid-write never corrupts it.  Write count and latency are recorded on the autosaver attribute.
+        """
+        if self.settings_path is None:
+            raise ValueError("Settings file path was never provided.")
+        if self.autosaver is None:
+            object.__setattr__(self, "autosaver", Autosaver(self, delay))
+        else:
+            self.autosaver.delay = delay
+
+    def watch(self, enable=True, debounce=.05):
+        """
+        Hot reload settings_path whenever it is changed by another process.  Requires a running Qt application.
+
+        The file is watched with a QFileSystemWatcher, and a burst of events is debounced into a single check, debounce
+        seconds after the last event.  The file is only read if its modification time or size changed, and only
+        parsed if the hash of its contents changed, so saves made by this Settings, and rewrites of identical
+        contents, cost nearly nothing.  Changes are applied with apply_changes, so references are preserved and only
+        subscribers of the settings that changed are notified.
+        """
+        watcher = _get_watcher(self)
+        if enable and watcher is None:
+            if self.settings_path is None:
+                raise ValueError("Settings file path was never provided.")
+            object.__setattr__(self, "_watcher", _FileWatcher(self, self.settings_path, debounce))
+        elif not enable and watcher is not None:
+            watcher.close()
+            object.__setattr__(self, "_watcher", None)
+
+    def enable_array_files(self, min_bytes=1 << 20):
+        """
+        Save numpy arrays of at least min_bytes to files of their own, in a directory next to the settings file, so
+        that saving only rewrites the arrays that changed, and the settings file itself stays small.
+
+        An array file is only rewritten when a different array is assigned to its setting, or when the array is
+        reported modified with mark_changed.  Arrays are loaded as read only memory maps, so loading costs nearly
+        nothing until they are used, and they must be replaced rather than modified in place.  A Settings that loads a
+        file with array files has this enabled automatically.
+        """
+        if _get_arrays(self) is None:
+            object.__setattr__(self, "_arrays", _ArrayStore(min_bytes))
+        else:
+            _get_arrays(self).min_bytes = min_bytes
+
+    def disable_array_files(self):
+        """
+        Save arrays in the settings file again, from the next save on.
+        """
+        object.__setattr__(self, "_arrays", None)
+
+    def disable_autosave(self, flush=True):
+        """
+        Stop autosaving.  If flush is True, any pending changes are written first.
+        """
+        if self.autosaver is not None:
+            self.autosaver.stop(flush)
+            object.__setattr__(self, "autosaver", None)
+
+
+def _equal(a, b):
+    if a is b:
+        return True
+    if type(a) is not type(b):
+        return False
+    if hasattr(a, "shape") and hasattr(a, "dtype"):
+        return a.shape == b.shape and a.dtype == b.dtype and bool((a == b).all())
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        # Containers of arrays, and other values without a usable truth value, are assumed to have changed.
+        return False
+
+
+_MISSING = object()
+Settings._ATTRIBUTE_NAMES = frozenset(dir(Settings))
+_get_dict = Settings.dict.__get__
+_get_parent = Settings._parent.__get__
+_get_autosaver = Settings.autosaver.__get__
+_get_notifier = Settings._notifier.__get__
+_get_watcher = Settings._watcher.__get__
+_get_arrays = Settings._arrays.__get__
+_get_journal = Settings._journal.__get__
+
+
+def _io_span(name, filename):
+    # Settings don't depend on epyqtwidgets: if its instrument module was never imported, it can't have been enabled.
+    instrument = sys.modules.get("epyqtwidgets.instrument")
+    if instrument is None:
+        return contextlib.nullcontext()
+    return instrument.span("settings_io", name, file=filename)
+
+
+def _is_journaled(filename):
+    return os.fspath(filename).endswith(".json")
+
+
+class _Notifier:
+    """
+    Routes the changes of a top level Settings to its subscribers, coalescing them until they are delivered.
+
+    Subscriptions to plain paths are kept in a tree keyed by path components, so that a change only visits the
+    subscriptions above and below it.  Wildcard subscriptions are matched one by one.
+    """
+    def __init__(self):
+        self.depth = 0
+        self._callbacks = {}
+        self._tree = {}
+        self._patterns = {}
+        self._pending = {}
+        self._scheduled = False
+        self._next_token = 0
+        # Changes may be made from any thread, so _pending and _scheduled are only touched while holding this.
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback, pattern):
+        token = self._next_token
+        self._next_token += 1
+        self._callbacks[token] = callback
+        if pattern != "*" and any(character in pattern for character in "*?["):
+            self._patterns[token] = pattern
+        else:
+            node = self._tree
+            for part in pattern.split(".") if pattern != "*" else ():
+                node = node.setdefault(part, {})
+            node.setdefault(None, set()).add(token)
+        return token
+
+    def unsubscribe(self, token):
+        self._callbacks.pop(token, None)
+        with self._lock:
+            self._pending.pop(token, None)
+        if self._patterns.pop(token, None) is None:
+            self._discard(self._tree, token)
+
+    def _discard(self, node, token):
+        # Returns True if node is left empty.
+        for key, child in list(node.items()):
+            if key is None:
+                child.discard(token)
+                empty = not child
+            else:
+                empty = self._discard(child, token)
+            if empty:
+                del node[key]
+        return not node
+
+    def notify(self, paths):
+        for path in paths:
+            tokens = set()
+            node = self._tree
+            tokens.update(node.get(None, ()))
+            for part in path.split("."):
+                node = node.get(part)
+                if node is None:
+                    break
+                tokens.update(node.get(None, ()))
+            else:
+                self._collect(node, tokens)
+            for token, pattern in self._patterns.items():
+                if fnmatch.fnmatchcase(path, pattern):
+                    tokens.add(token)
+            with self._lock:
+                for token in tokens:
+                    self._pending.setdefault(token, set()).add(path)
+        if self.depth == 0:
+            self.schedule()
+
+    def _collect(self, node, tokens):
+        for key, child in node.items():
+            if key is None:
+                tokens.update(child)
+            else:
+                self._collect(child, tokens)
+
+    def schedule(self):
+        with self._lock:
+            if self._scheduled or not self._pending:
+                return
+            self._scheduled = True
+        QtCore = sys.modules.get("PyQt5.QtCore")
+        application = QtCore.QCoreApplication.instance() if QtCore is not None else None
+        if application is not None:
+            # Subscribers, like widgets bound to settings, are always called in the GUI thread, whichever thread
+            # made the change.
+            _gui_dispatcher(QtCore, application).call.emit(self.flush)
+        else:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            self._scheduled = False
+            pending, self._pending = self._pending, {}
+        for token, paths in pending.items():
+            callback = self._callbacks.get(token)
+            if callback is None:
+                continue
+            try:
+                callback(paths)
+            except Exception:
+                sys.excepthook(*sys.exc_info())
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def _gui_dispatcher(QtCore, application):
+    """
+    Return a QObject living in the GUI thread whose call signal calls the function it is emitted with, later, in the
+    GUI thread, even when emitted from the GUI thread itself.  Made on first use, since Settings doesn't need Qt.
+    """
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None or _dispatcher.application is not application:
+            class _Dispatcher(QtCore.QObject):
+                call = QtCore.pyqtSignal(object)
+
+                def run(self, function):
+                    function()
+
+            dispatcher = _Dispatcher()
+            dispatcher.application = application
+            dispatcher.moveToThread(application.thread())
+            # A slot that is a method of the dispatcher runs in the thread the dispatcher lives in.
+            dispatcher.call.connect(dispatcher.run, QtCore.Qt.ConnectionType.QueuedConnection)
+            _dispatcher = dispatcher
+        return _dispatcher
+
+
+class Autosaver:
+    """
+    Saves a Settings object on a background thread, a fixed delay after the most recent change.  Created by
+    Settings.enable_autosave.
+
+    A change still waiting to be written is written when the interpreter exits, or when the Qt application, if one
+    exists when autosave is enabled, is about to quit.
+
+    Public Properties
+    -----------------
+    delay : float
+        Seconds of quiet to wait after a change before writing.
+    write_count : int
+        The number of completed writes.
+    last_latency : float
+        The time taken by the most recent write, including serialization, in seconds.
+    max_latency : float
+        The longest time taken by any write, in seconds.
+    total_latency : float
+        The time taken by all writes, in seconds.
+    last_error : Exception
+        The exception raised by the most recent failed write, or None if it succeeded.
+
+    Public Methods
+    --------------
+    schedule() :
+        Request a write, delay seconds from now.
+    flush() :
+        Block until any requested write has completed, starting it immediately if it is still waiting.
+    stop(flush=True) :
+        Stop the background thread, optionally flushing first.
+    """
+    def __init__(self, settings, delay):
+        self.settings = settings
+        self.delay = delay
+        self.write_count = 0
+        self.last_latency = None
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+        self.last_error = None
+        self._deadline = None
+        self._busy = False
+        self._stopped = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="Settings autosave", daemon=True)
+        self._thread.start()
+
+        # The background thread is a daemon, so nothing would write the last changes at exit otherwise.  Only a weak
+        # reference is registered, so that an Autosaver that was dropped isn't kept alive until then.
+        reference = weakref.ref(self)
+
+        def at_exit():
+            autosaver = reference()
+            if autosaver is not None:
+                autosaver.stop()
+
+        self._at_exit = at_exit
+        atexit.register(at_exit)
+        QtCore = sys.modules.get("PyQt5.QtCore")
+        self._application = QtCore.QCoreApplication.instance() if QtCore is not None else None
+        if self._application is not None:
+            self._application.aboutToQuit.connect(at_exit)
+
+    def schedule(self):
+        with self._condition:
+            self._deadline = time.monotonic() + self.delay
+            self._condition.notify_all()
+
+    def flush(self):
+        with self._condition:
+            if self._deadline is not None:
+                self._deadline = time.monotonic()
+                self._condition.notify_all()
+            while self._deadline is not None or self._busy:
+                self._condition.wait()
+
+    def stop(self, flush=True):
+        if self._stopped:
+            return
+        if flush:
+            self.flush()
+        with self._condition:
+            self._deadline = None
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join()
+        atexit.unregister(self._at_exit)
+        if self._application is not None:
+            try:
+                self._application.aboutToQuit.disconnect(self._at_exit)
+            except (RuntimeError, TypeError):
+                # The application was already deleted.
+                pass
+            self._application = None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._stopped:
+                        return
+                    if self._deadline is None:
+                        self._condition.wait()
+                        continue
+                    remaining = self._deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                self._deadline = None
+                self._busy = True
+            try:
+                self._write()
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+    def _write(self):
+        start = time.perf_counter()
+        try:
+            self.settings.save()
+        except Exception as e:
+            self.last_error = e
+            return
+        latency = time.perf_counter() - start
+        self.last_error = None
+        self.write_count += 1
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        self.total_latency += latency
+
+
+class _FileWatcher:
+    """
+    Watches a settings file, and applies changes made to it by other processes.  Created by Settings.watch.
+    """
+    def __init__(self, settings, filename, debounce):
+        import PyQt5.QtCore as qtc
+
+        self.settings = settings
+        self.filename = os.path.abspath(filename)
+        self.files = settings._storage_files(self.filename)
+        self.signature = None
+        self.digest = None
+
+        self._timer = qtc.QTimer()
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(int(debounce * 1000))
+        self._timer.timeout.connect(self.check)
+        # The directory is watched too, because replacing a file, as atomic writes do, drops the watch on it.
+        self._watcher = qtc.QFileSystemWatcher()
+        self._watcher.addPath(os.path.dirname(self.filename))
+        self._watcher.fileChanged.connect(self._timer.start)
+        self._watcher.directoryChanged.connect(self._timer.start)
+        self._watch_files()
+        self.signature = self._signature()
+        self.digest = self._digest()
+
+    def watches(self, filename):
+        return os.path.abspath(filename) == self.filename
+
+    def remember(self):
+        """
+        Record the files as they are now, after being saved by the Settings, so that they are not applied again.
+        """
+        self.signature = self._signature()
+        # Hashing the files again would cost as much as the save, and apply_changes ignores values that didn't change.
+        self.digest = None
+
+    def check(self):
+        self._watch_files()
+        signature = self._signature()
+        if signature is None or signature == self.signature:
+            return
+        digest = self._digest()
+        if digest is None:
+            return
+        if digest == self.digest:
+            self.signature = signature
+            return
+        try:
+            new_data = self.settings._read(self.filename)
+        except Exception:
+            # Most likely caught halfway through a non-atomic write, so wait for the next event.
+            return
+        self.signature = signature
+        self.digest = digest
+        self.settings.apply_changes(new_data, autosave=False)
+
+    def close(self):
+        self._timer.stop()
+        self._watcher.removePaths(self._watcher.files() + self._watcher.directories())
+
+    def _signature(self):
+        signature = []
+        for name in self.files:
+            try:
+                stat = os.stat(name)
+            except FileNotFoundError:
+                if name == self.filename:
+                    return None
+                stat = None
+            except OSError:
+                return None
+            signature.append(None if stat is None else (stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def _digest(self):
+        digest = hashlib.blake2b()
+        for name in self.files:
+            try:
+                with open(name, "rb") as inFile:
+                    digest.update(inFile.read())
+            except FileNotFoundError:
+                pass
+            except OSError:
+                return None
+            digest.update(b"\0")
+        return digest.digest()
+
+    def _watch_files(self):
+        watched = self._watcher.files()
+        for name in self.files:
+            if os.path.exists(name) and name not in watched:
+                self._watcher.addPath(name)
+
+
+class _ArrayRef:
+    """
+    Stands in for an array saved to a file of its own, in a settings file.  filename is relative to the settings file.
+    """
+    __slots__ = ("filename",)
+
+    def __init__(self, filename):
+        self.filename = filename
+
+    def __getstate__(self):
+        return self.filename
+
+    def __setstate__(self, state):
+        self.filename = state
+
+
+class _ArrayStore:
+    """
+    Keeps track of the array files of a Settings, so that each is only written when its array changes.  Created by
+    Settings.enable_array_files.
+    """
+    def __init__(self, min_bytes=1 << 20):
+        self.min_bytes = min_bytes
+        # Maps the dotted path of each array to the array last saved or loaded there, and the file it is in.
+        self._files = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+
+    def mark_dirty(self, paths):
+        with self._lock:
+            self._dirty.update(paths)
+
+    def externalize(self, data, filename):
+        """
+        Replace the large arrays in data, a nested dict, with _ArrayRefs, writing any that changed to new files.
+        Returns the new data, and the files to pass to commit once the settings file has been written.
+        """
+        numpy = sys.modules.get("numpy")
+        files = {}
+        if numpy is None:
+            return data, files
+        filename = os.path.abspath(filename)
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            previous = self._files.copy()
+        try:
+            data = self._externalize(data, "", filename, previous, dirty, files, numpy)
+        except BaseException:
+            self.mark_dirty(dirty)
+            raise
+        return data, files
+
+    def _externalize(self, data, prefix, filename, previous, dirty, files, numpy):
+        directory = filename + ".arrays"
+        result = {}
+        for key, value in data.items():
+            path = prefix + key
+            if type(value) is dict:
+                value = self._externalize(value, f"{path}.", filename, previous, dirty, files, numpy)
+            elif isinstance(value, numpy.ndarray) and value.nbytes >= self.min_bytes and not value.dtype.hasobject:
+                array, name = previous.get(path, (None, ""))
+                if array is not value or os.path.dirname(name) != directory or _is_dirty(path, dirty):
+                    # Every write goes to a new file, so that an array still memory mapped from the old one is never
+                    # overwritten.
+                    os.makedirs(directory, exist_ok=True)
+                    stem = _UNSAFE_FILENAME_CHARACTERS.sub("_", path)
+                    name = os.path.join(directory, f"{stem}-{secrets.token_hex(4)}.npy")
+                    with _atomic_file(name) as outFile:
+                        numpy.save(outFile, value, allow_pickle=False)
+                files[path] = (value, name)
+                value = _ArrayRef(os.path.relpath(name, os.path.dirname(filename)))
+            result[key] = value
+        return result
+
+    def commit(self, files, filename, partial=False):
+        """
+        Record the files written by a save to filename, and delete the ones it no longer refers to.  If partial, the
+        save only wrote some of the settings, and nothing is deleted.
+        """
+        with self._lock:
+            if partial:
+                self._files.update(files)
+                return
+            self._files = files
+        directory = os.path.abspath(filename) + ".arrays"
+        if not os.path.isdir(directory):
+            return
+        keep = {os.path.basename(name) for _, name in files.values()}
+        for name in os.listdir(directory):
+            if name.endswith(".npy") and name not in keep:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    # Most likely still memory mapped, on Windows.  It is retried on the next save.
+                    pass
+
+    def resolve(self, data, filename):
+        """
+        Replace the _ArrayRefs in data, a freshly loaded nested dict, with memory mapped arrays.  Arrays whose file is
+        already loaded are reused, so reloading leaves them untouched.  Returns True if there were any.
+        """
+        files = {}
+        with self._lock:
+            previous = self._files.copy()
+        self._resolve(data, "", os.path.dirname(os.path.abspath(filename)), previous, files)
+        if files:
+            with self._lock:
+                self._files.update(files)
+        return bool(files)
+
+    def _resolve(self, data, prefix, directory, previous, files):
+        for key, value in data.items():
+            path = prefix + key
+            if type(value) is dict:
+                self._resolve(value, f"{path}.", directory, previous, files)
+            elif isinstance(value, _ArrayRef):
+                name = os.path.join(directory, value.filename)
+                array, loaded_name = previous.get(path, (None, None))
+                if loaded_name != name:
+                    import numpy
+                    array = numpy.load(name, mmap_mode="r", allow_pickle=False)
+                files[path] = (array, name)
+                data[key] = array
+
+
+_UNSAFE_FILENAME_CHARACTERS = re.compile(r"[^\w.-]")
+
+
+def _is_dirty(path, dirty):
+    # A path is dirty if it, or any Settings above it, was reported modified.
+    while path:
+        if path in dirty:
+            return True
+        path = path.rpartition(".")[0]
+    return False
+
+
+@contextlib.contextmanager
+def _atomic_file(filename):
+    """
+    Open a temporary file next to filename for writing, and move it into place once the block exits without error, so
+    that filename always holds either its old or its new contents.
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    handle, temp_name = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as outFile:
+            yield outFile
+            outFile.flush()
+            os.fsync(outFile.fileno())
+        os.replace(temp_name, filename)
+    except BaseException:
+        try:
+            os.remove(temp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _atomic_write(filename, data):
+    with _atomic_file(filename) as outFile:
+        outFile.write(data)
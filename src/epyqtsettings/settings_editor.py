@@ -0,0 +1,435 @@
+import pathlib
+
+import PyQt5.QtCore as qtc
+import PyQt5.QtGui as qtg
+import PyQt5.QtWidgets as qtw
+
+from epyqtsettings.settings import Settings, _equal
+
+# Arrays with more elements than this are shown as a summary, rather than edited as vectors.
+_MAX_VECTOR_SIZE = 16
+
+
+class _Node:
+    """
+    One row of a SettingsModel, for the setting named key in settings.
+    """
+    __slots__ = ("settings", "key", "path", "parent", "row", "children")
+
+    def __init__(self, settings, key, path, parent, row):
+        self.settings = settings
+        self.key = key
+        self.path = path
+        self.parent = parent
+        self.row = row
+        self.children = None
+
+    @property
+    def value(self):
+        return self.settings.dict[self.key]
+
+
+class SettingsModel(qtc.QAbstractItemModel):
+    """
+    A tree model over a Settings object, with a row for each setting, and nested Settings as children.  Column 0 holds
+    the names of the settings, and column 1 their values.
+
+    Rows are only created for the levels of the tree that a view actually asks for, and changes to the settings, made
+    anywhere, are reported as dataChanged for just the rows that changed.
+
+    Parameters
+    ----------
+    settings : Settings
+        The settings to show.
+    options : dict, optional
+        Maps dotted paths of settings to dicts of options controlling how each is shown and edited.  Any setting may
+        have a "label", shown instead of its key, and "read_only".  The "kind" of editor is inferred from the value,
+        but may be given as one of:
+        "text" : A line edit, for ints, floats and strs.  Accepts a "validator", which defaults to an int or double
+            validator for numbers.
+        "bool" : A check box.
+        "choice" : A combo box of the values in "choices".
+        "range" : A pair of line edits, for a (low, high) pair where low must be less than high.
+        "vector" : A line edit of comma separated numbers, for lists, tuples and small arrays.
+        "file" : A line edit with a button opening a file dialog.  Accepts "mode", "load" or "save", "filter" and
+            "directory".
+        "color" : A line edit of the color name with a button opening a color dialog.
+    parent : QObject, optional
+    """
+    HEADERS = ("Setting", "Value")
+
+    def __init__(self, settings, options=None, parent=None):
+        super().__init__(parent)
+        self.settings = settings
+        self.options = options or {}
+        self._root = _Node(None, None, "", None, 0)
+        self._nodes = {}
+        # Changes are reported with paths from the top level Settings.
+        _, path = settings._root()
+        self._prefix = f"{path}." if path else ""
+        token = settings.subscribe(self._on_change)
+        self.destroyed.connect(lambda: settings.unsubscribe(token))
+
+    def _children(self, node):
+        if node.children is None:
+            settings = self.settings if node is self._root else node.value
+            prefix = f"{node.path}." if node.path else ""
+            node.children = [
+                _Node(settings, key, prefix + key, node, row) for row, key in enumerate(settings.keys())
+            ]
+            for child in node.children:
+                self._nodes[child.path] = child
+        return node.children
+
+    def _node(self, index):
+        return index.internalPointer() if index.isValid() else self._root
+
+    def node_options(self, node):
+        return self.options.get(node.path, {})
+
+    def kind(self, node):
+        options = self.node_options(node)
+        if "kind" in options:
+            return options["kind"]
+        return _infer_kind(node.value)
+
+    def index(self, row, column, parent=qtc.QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return qtc.QModelIndex()
+        return self.createIndex(row, column, self._children(self._node(parent))[row])
+
+    def parent(self, index=None):
+        if index is None:
+            return super().parent()
+        if not index.isValid():
+            return qtc.QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is self._root:
+            return qtc.QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+
+    def rowCount(self, parent=qtc.QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        node = self._node(parent)
+        if node is not self._root and not isinstance(node.value, Settings):
+            return 0
+        return len(self._children(node))
+
+    def hasChildren(self, parent=qtc.QModelIndex()):
+        if parent.column() > 0:
+            return False
+        node = self._node(parent)
+        return node is self._root or (isinstance(node.value, Settings) and len(node.value.dict) > 0)
+
+    def columnCount(self, parent=qtc.QModelIndex()):
+        return 2
+
+    def headerData(self, section, orientation, role=qtc.Qt.DisplayRole):
+        if orientation == qtc.Qt.Horizontal and role == qtc.Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return qtc.Qt.NoItemFlags
+        flags = qtc.Qt.ItemIsEnabled | qtc.Qt.ItemIsSelectable
+        node = index.internalPointer()
+        if index.column() != 1 or self.node_options(node).get("read_only", False):
+            return flags
+        kind = self.kind(node)
+        if kind == "bool":
+            return flags | qtc.Qt.ItemIsUserCheckable
+        if kind is not None:
+            return flags | qtc.Qt.ItemIsEditable
+        return flags
+
+    def data(self, index, role=qtc.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if index.column() == 0:
+            if role == qtc.Qt.DisplayRole:
+                return self.node_options(node).get("label", str(node.key).replace("_", " "))
+            if role == qtc.Qt.ToolTipRole:
+                return node.path
+            return None
+
+        value = node.value
+        if isinstance(value, Settings):
+            return None
+        kind = self.kind(node)
+        if role == qtc.Qt.DisplayRole:
+            if kind == "bool":
+                return None
+            return _format(value, kind)
+        if role == qtc.Qt.EditRole:
+            return value
+        if role == qtc.Qt.CheckStateRole and kind == "bool":
+            return qtc.Qt.Checked if value else qtc.Qt.Unchecked
+        if role == qtc.Qt.DecorationRole and kind == "color":
+            color = qtg.QColor(str(value))
+            return color if color.isValid() else None
+        return None
+
+    def setData(self, index, value, role=qtc.Qt.EditRole):
+        if not index.isValid() or index.column() != 1:
+            return False
+        node = index.internalPointer()
+        if role == qtc.Qt.CheckStateRole:
+            value = value == qtc.Qt.Checked
+        elif role != qtc.Qt.EditRole:
+            return False
+        # The change is reported back through _on_change, which emits dataChanged.
+        node.settings[node.key] = value
+        return True
+
+    def _on_change(self, paths):
+        reset = False
+        changed = []
+        for path in paths:
+            path = path[len(self._prefix):] if path.startswith(self._prefix) else path
+            node = self._nodes.get(path)
+            if node is None:
+                parent = self._nodes.get(path.rpartition(".")[0]) if "." in path else self._root
+                # A setting added to a level that has already been shown.
+                reset = reset or (parent is not None and parent.children is not None)
+            elif node.children is not None or isinstance(node.value, Settings):
+                # A nested Settings was replaced, so its rows are out of date.
+                reset = True
+            else:
+                changed.append(node)
+        if reset:
+            self.beginResetModel()
+            self._root.children = None
+            self._nodes = {}
+            self.endResetModel()
+            return
+        for node in changed:
+            index = self.createIndex(node.row, 1, node)
+            self.dataChanged.emit(index, index)
+
+
+class SettingsDelegate(qtw.QStyledItemDelegate):
+    """
+    Creates an editor for a value in a SettingsModel, of the kind given by the model, only while it is being edited.
+    """
+    def createEditor(self, parent, option, index):
+        model = index.model()
+        node = index.internalPointer()
+        kind = model.kind(node)
+        options = model.node_options(node)
+        if kind == "choice":
+            editor = qtw.QComboBox(parent)
+            editor.addItems([str(choice) for choice in options["choices"]])
+            return editor
+        if kind == "range":
+            return _RangeEditor(parent)
+        if kind == "file":
+            return _BrowseEditor(parent, lambda current: _browse_file(parent, current, options))
+        if kind == "color":
+            return _BrowseEditor(parent, lambda current: _browse_color(parent, current))
+        editor = qtw.QLineEdit(parent)
+        validator = options.get("validator")
+        if validator is None and kind == "text":
+            if isinstance(node.value, int):
+                validator = qtg.QIntValidator(editor)
+            elif isinstance(node.value, float):
+                validator = qtg.QDoubleValidator(editor)
+        if validator is not None:
+            editor.setValidator(validator)
+        return editor
+
+    def setEditorData(self, editor, index):
+        model = index.model()
+        node = index.internalPointer()
+        kind = model.kind(node)
+        value = node.value
+        if kind == "choice":
+            choices = model.node_options(node)["choices"]
+            if value in choices:
+                editor.setCurrentIndex(list(choices).index(value))
+        elif kind == "range":
+            editor.set_value(value)
+        elif isinstance(editor, _BrowseEditor):
+            editor.edit.setText(str(value))
+        else:
+            editor.setText(_format(value, kind))
+
+    def setModelData(self, editor, model, index):
+        node = index.internalPointer()
+        kind = model.kind(node)
+        value = node.value
+        try:
+            if kind == "choice":
+                new_value = model.node_options(node)["choices"][editor.currentIndex()]
+            elif kind == "range":
+                new_value = editor.get_value(value)
+                if new_value is None:
+                    return
+            elif isinstance(editor, _BrowseEditor):
+                new_value = editor.edit.text()
+            elif kind == "vector":
+                new_value = _parse_vector(editor.text(), value)
+            else:
+                validator = editor.validator()
+                if validator is not None and validator.validate(editor.text(), 0)[0] != qtg.QValidator.Acceptable:
+                    return
+                new_value = type(value)(editor.text())
+        except (TypeError, ValueError):
+            return
+        if not _equal(new_value, value):
+            model.setData(index, new_value, qtc.Qt.EditRole)
+
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(option.rect)
+
+
+class SettingsEditor(qtw.QTreeView):
+    """
+    A tree view for editing a Settings object, which scales to settings with thousands of entries.
+
+    Unlike a panel of the widgets in settings_widgets, which builds a complete widget for every setting, this only
+    paints the rows that are visible, and creates an editor widget only for the value being edited, so building it
+    costs the same no matter how many settings there are.  Values are edited by double clicking, or by typing into the
+    selected row.
+
+    Parameters
+    ----------
+    settings : Settings
+        The settings to edit.
+    options : dict, optional
+        Options for the editors of individual settings.  See SettingsModel.
+    expand : bool, optional
+        If True, nested settings start expanded.  Defaults to False.
+    args and kwargs passed to qtw.QTreeView constructor
+
+    Public Properties
+    -----------------
+    settings_model : SettingsModel
+        The model of the settings.
+    """
+    def __init__(self, settings, options=None, expand=False, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.settings_model = SettingsModel(settings, options, self)
+        self.setModel(self.settings_model)
+        self.setItemDelegate(SettingsDelegate(self))
+        # Lets the view compute the size of the contents without measuring every row.
+        self.setUniformRowHeights(True)
+        self.setAlternatingRowColors(True)
+        self.setEditTriggers(
+            qtw.QAbstractItemView.DoubleClicked | qtw.QAbstractItemView.SelectedClicked
+            | qtw.QAbstractItemView.AnyKeyPressed | qtw.QAbstractItemView.EditKeyPressed
+        )
+        self.header().setSectionResizeMode(0, qtw.QHeaderView.Interactive)
+        self.header().setStretchLastSection(True)
+        self.setColumnWidth(0, 200)
+        if expand:
+            self.expandAll()
+
+
+class _RangeEditor(qtw.QWidget):
+    def __init__(self, parent):
+        super().__init__(parent)
+        layout = qtw.QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(layout)
+        self.low_entry = qtw.QLineEdit()
+        self.high_entry = qtw.QLineEdit()
+        layout.addWidget(self.low_entry)
+        layout.addWidget(self.high_entry)
+        self.setFocusProxy(self.low_entry)
+
+    def set_value(self, value):
+        low, high = value
+        self.low_entry.setText(str(low))
+        self.high_entry.setText(str(high))
+
+    def get_value(self, current):
+        # Returns None if the range is invalid.
+        low_type, high_type = type(current[0]), type(current[1])
+        low, high = low_type(self.low_entry.text()), high_type(self.high_entry.text())
+        if low >= high:
+            return None
+        return type(current)((low, high)) if isinstance(current, (list, tuple)) else (low, high)
+
+
+class _BrowseEditor(qtw.QWidget):
+    def __init__(self, parent, browse):
+        super().__init__(parent)
+        self.setAutoFillBackground(True)
+        layout = qtw.QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+        self.setLayout(layout)
+        self.edit = qtw.QLineEdit()
+        layout.addWidget(self.edit)
+        self.button = qtw.QToolButton()
+        self.button.setText("...")
+        layout.addWidget(self.button)
+        self.setFocusProxy(self.edit)
+        self.button.clicked.connect(lambda: self._browse(browse))
+
+    def _browse(self, browse):
+        selected = browse(self.edit.text())
+        if selected:
+            self.edit.setText(selected)
+
+
+def _browse_file(parent, current, options):
+    directory = options.get("directory", str(pathlib.Path(current).parent) if current else "")
+    if options.get("mode", "load") == "save":
+        selected, _ = qtw.QFileDialog.getSaveFileName(
+            parent, directory=str(directory), filter=options.get("filter", "*")
+        )
+    else:
+        selected, _ = qtw.QFileDialog.getOpenFileName(
+            parent, directory=str(directory), filter=options.get("filter", "*")
+        )
+    return str(pathlib.Path(selected)) if selected else None
+
+
+def _browse_color(parent, current):
+    color = qtw.QColorDialog.getColor(qtg.QColor(current), parent)
+    return color.name() if color.isValid() else None
+
+
+def _infer_kind(value):
+    if isinstance(value, Settings):
+        return None
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, (int, float, str)):
+        return "text"
+    if _is_vector(value):
+        return "vector"
+    return None
+
+
+def _is_vector(value):
+    if hasattr(value, "shape") and hasattr(value, "dtype"):
+        return value.ndim == 1 and value.size <= _MAX_VECTOR_SIZE and value.dtype.kind in "biuf"
+    if isinstance(value, (list, tuple)) and 0 < len(value) <= _MAX_VECTOR_SIZE:
+        return all(isinstance(each, (int, float)) and not isinstance(each, bool) for each in value)
+    return False
+
+
+def _format(value, kind):
+    if kind in ("vector", "range"):
+        return ", ".join(str(each) for each in value)
+    if hasattr(value, "shape") and hasattr(value, "dtype"):
+        return f"array {value.shape} {value.dtype}"
+    return str(value)
+
+
+def _parse_vector(text, current):
+    parts = [part.strip() for part in text.split(",")]
+    if len(parts) != len(current):
+        raise ValueError("Wrong number of components.")
+    if hasattr(current, "shape") and hasattr(current, "dtype"):
+        new_value = current.copy()
+        new_value[...] = [float(part) for part in parts]
+        return new_value
+    values = [type(each)(float(part)) if isinstance(each, int) else float(part) for each, part in zip(current, parts)]
+    return type(current)(values)
+
@@ -1,14 +1,92 @@
 import pathlib
+import weakref
 
+import PyQt5.QtCore as qtc
 import PyQt5.QtWidgets as qtw
 import PyQt5.QtGui as qtg
 
+from epyqtwidgets import instrument
+from epyqtwidgets.rate_limit import make_rate_limiter
+
+
+def bind_to_settings(widget, settings, keys, refresh):
+    """
+    Call refresh whenever one of keys changes in settings, for as long as widget exists, so that the widget tracks
+    changes made elsewhere, like a reload.  Only widgets whose keys actually changed are refreshed.
+    """
+    # Only a weak reference to the widget is kept, so that a widget dropped without being destroyed through Qt isn't
+    # kept alive, and refreshed, by the settings.
+    try:
+        reference = weakref.WeakMethod(refresh)
+    except TypeError:
+        def reference():
+            return refresh
+
+    def changed(paths):
+        method = reference()
+        if method is None:
+            unbind()
+        else:
+            method()
+
+    tokens = [settings.subscribe(changed, key) for key in keys]
+
+    def unbind():
+        for token in tokens:
+            settings.unsubscribe(token)
+        tokens.clear()
+
+    widget.destroyed.connect(unbind)
+
+
+def _run_callbacks(callback, name, *args):
+    # name identifies the widget in instrumentation.  args, like the argument of the signal that triggered the
+    # callbacks, are passed on to each.
+    if callback is None:
+        return
+    try:
+        callbacks = iter(callback)
+    except TypeError:
+        callbacks = (callback,)
+    with instrument.span("callback", name):
+        for each in callbacks:
+            each(*args)
+
+
+def _live_updates(widget, signals, update, rate_limit):
+    """
+    Call update while the user is typing into a widget, at the rate allowed by rate_limit, and cancel any pending
+    update when editing is finished, since the edit is then written anyway.  Returns the RateLimiter, or None if
+    rate_limit is None.
+    """
+    rate_limiter = make_rate_limiter(rate_limit, widget)
+    if rate_limiter is not None:
+        rate_limiter.connect(update)
+        for changed, finished in signals:
+            changed.connect(rate_limiter)
+            finished.connect(rate_limiter.cancel)
+    return rate_limiter
+
 
 class SettingsEntryBox(qtw.QWidget):
+    """
+    A line edit bound to a setting, which is written when editing is finished.
+
+    Parameters
+    ----------
+    rate_limit : float, dict or RateLimiter, optional
+        If given, the setting is also written while the user types, whenever the text is a valid value, and the
+        validation highlight follows the text, both at the rate allowed by this: a debounce time in seconds, a dict
+        of RateLimiter keyword arguments, or a RateLimiter.  callback runs after each of these writes.  Defaults to
+        None, so that nothing is done until editing is finished.
+    """
     def __init__(
-        self, settings, key, value_type, validator=None, callback=None, label=None, left_margin=0
+        self, settings, key, value_type, validator=None, callback=None, label=None, left_margin=0, rate_limit=None
     ):
         super().__init__()
+        self.settings = settings
+        self.key = key
+        self.value_type = value_type
         layout = qtw.QHBoxLayout()
         layout.setContentsMargins(left_margin, 0, 0, 0)
         self.setLayout(layout)
@@ -28,7 +106,7 @@ class SettingsEntryBox(qtw.QWidget):
 
         def edit_callback():
             value = value_type(self.edit_box.text())
-            settings.dict[key] = value
+            settings[key] = value
 
         def changed_calback():
             if self.edit_box.validator() is not None:
@@ -37,22 +115,58 @@ class SettingsEntryBox(qtw.QWidget):
                 else:
                     self.edit_box.setStyleSheet("QLineEdit { background-color: pink}")
 
+        name = f"SettingsEntryBox.{key}"
+
+        def typed_callback(*args):
+            if validator:
+                changed_calback()
+                if validator.validate(self.edit_box.text(), 0)[0] != qtg.QValidator.Acceptable:
+                    return
+            try:
+                value = value_type(self.edit_box.text())
+            except (TypeError, ValueError):
+                return
+            if value != settings.dict[key]:
+                settings[key] = value
+                _run_callbacks(callback, name)
+
+        self.rate_limiter = _live_updates(
+            self, ((self.edit_box.textChanged, self.edit_box.editingFinished),), typed_callback, rate_limit
+        )
         self.edit_box.editingFinished.connect(edit_callback)
-        if validator:
+        if validator and self.rate_limiter is None:
             self.edit_box.textChanged.connect(changed_calback)
         if callback is not None:
-            try:
-                for each in callback:
-                    self.edit_box.editingFinished.connect(each)
-            except TypeError:
-                self.edit_box.editingFinished.connect(callback)
+            self.edit_box.editingFinished.connect(lambda: _run_callbacks(callback, name))
+        bind_to_settings(self, settings, (key,), self.refresh)
 
     def set_value(self, val):
         self.edit_box.setText(str(val))
 
+    def refresh(self):
+        value = self.settings.dict[self.key]
+        try:
+            if self.value_type(self.edit_box.text()) == value:
+                return
+        except (TypeError, ValueError):
+            pass
+        self.set_value(value)
+
 
 class SettingsRangeBox(qtw.QWidget):
-    def __init__(self, settings, label, low_key, high_key, value_type, validator=None, callback=None):
+    """
+    A pair of line edits bound to the low and high ends of a range, which are written together when editing is
+    finished and low is less than high.
+
+    Parameters
+    ----------
+    rate_limit : float, dict or RateLimiter, optional
+        If given, the range is also written while the user types, whenever both ends are valid, at the rate allowed by
+        this, as for SettingsEntryBox.  Defaults to None.
+    """
+    def __init__(
+        self, settings, label, low_key, high_key, value_type, validator=None, callback=None, rate_limit=None
+    ):
         super().__init__()
         layout = qtw.QHBoxLayout()
         layout.setContentsMargins(0, 0, 0, 0)
@@ -80,8 +194,26 @@ class SettingsRangeBox(qtw.QWidget):
         if validator:
             self.high_entry.setValidator(validator)
 
+        self.rate_limiter = _live_updates(
+            self, (
+                (self.low_entry.textChanged, self.low_entry.editingFinished),
+                (self.high_entry.textChanged, self.high_entry.editingFinished)
+            ), self.typed_callback, rate_limit
+        )
         self.low_entry.editingFinished.connect(self.low_callback)
         self.high_entry.editingFinished.connect(self.high_callback)
+        bind_to_settings(self, settings, (low_key, high_key), self.refresh)
+
+    def typed_callback(self, *args):
+        try:
+            low_value = self.value_type(self.low_entry.text())
+            high_value = self.value_type(self.high_entry.text())
+        except (TypeError, ValueError):
+            return
+        if low_value < high_value and (
+            low_value != self.settings.dict[self.low_key] or high_value != self.settings.dict[self.high_key]
+        ):
+            self.common_callback(low_value, high_value)
 
     def low_callback(self):
         low_value = self.value_type(self.low_entry.text())
@@ -104,14 +236,8 @@ class SettingsRangeBox(qtw.QWidget):
     def common_callback(self, low_value, high_value):
         self.high_entry.setStyleSheet("QLineEdit { background-color: white}")
         self.low_entry.setStyleSheet("QLineEdit { background-color: white}")
-        self.settings.dict[self.low_key] = low_value
-        self.settings.dict[self.high_key] = high_value
-        if self.callback is not None:
-            try:
-                for each in self.callback:
-                    each()
-            except TypeError:
-                self.callback()
+        self.settings.update({self.low_key: low_value, self.high_key: high_value})
+        _run_callbacks(self.callback, f"SettingsRangeBox.{self.low_key}")
 
     def set_range(self, low, high):
         self.low_entry.setText(str(low))
@@ -119,6 +245,17 @@ class SettingsRangeBox(qtw.QWidget):
         self.high_entry.setText(str(high))
         self.high_callback()
 
+    def refresh(self):
+        for entry, key in ((self.low_entry, self.low_key), (self.high_entry, self.high_key)):
+            value = self.settings.dict[key]
+            try:
+                if self.value_type(entry.text()) == value:
+                    continue
+            except (TypeError, ValueError):
+                pass
+            entry.setText(str(value))
+            entry.setStyleSheet("QLineEdit { background-color: white}")
+
 
 class SettingsFileBox(qtw.QWidget):
     def __init__(
@@ -180,22 +317,13 @@ class SettingsFileBox(qtw.QWidget):
         self.label.setText(str(self.settings.dict[key]))
         self.label.setReadOnly(True)
         layout.addWidget(self.label)
+        bind_to_settings(self, settings, (key,), self.refresh)
 
     def save(self):
-        if self.save_callback is not None:
-            try:
-                self.save_callback()
-            except TypeError:
-                for each in self.save_callback:
-                    each()
+        _run_callbacks(self.save_callback, f"SettingsFileBox.{self.key}.save")
 
     def load(self):
-        if self.load_callback is not None:
-            try:
-                self.load_callback()
-            except TypeError:
-                for each in self.load_callback:
-                    each()
+        _run_callbacks(self.load_callback, f"SettingsFileBox.{self.key}.load")
 
     def select(self):
         if self.do_save:
@@ -207,13 +335,21 @@ class SettingsFileBox(qtw.QWidget):
                 directory=str(self.system_path), filter=self.filter
             )
         if selected_file:
-            self.settings.dict[self.key] = str(pathlib.Path(selected_file))
+            self.settings[self.key] = str(pathlib.Path(selected_file))
             self.label.setText(selected_file)
         self.label.setStyleSheet("QLineEdit { background-color: white}")
 
     def notify_bad_selection(self):
         self.label.setStyleSheet("QLineEdit { background-color: pink}")
 
+    def set_value(self, val):
+        self.label.setText(str(val))
+
+    def refresh(self):
+        value = str(self.settings.dict[self.key])
+        if self.label.text() != value:
+            self.set_value(value)
+
 
 class SettingsComboBox(qtw.QWidget):
     def __init__(self, component, label, settings_key, settings_options, callback=None):
@@ -228,26 +364,47 @@ class SettingsComboBox(qtw.QWidget):
         self.label = qtw.QLabel(label)
         layout.addWidget(self.label)
 
-        selector = qtw.QComboBox()
-        layout.addWidget(selector)
-        selector.addItems(settings_options)
-        selector.setCurrentIndex(settings_options.index(self.component.settings.dict[settings_key]))
-        selector.currentIndexChanged.connect(self.set_setting)
+        self.selector = qtw.QComboBox()
+        layout.addWidget(self.selector)
+        # Options may be any values, like numbers, so they are shown as text and written back as themselves.
+        self.selector.addItems([str(option) for option in settings_options])
+        self.selector.setCurrentIndex(settings_options.index(self.component.settings.dict[settings_key]))
+        self.selector.currentIndexChanged.connect(self.set_setting)
 
         if callback is not None:
-            try:
-                for each in callback:
-                    selector.currentIndexChanged.connect(each)
-            except TypeError:
-                selector.currentIndexChanged.connect(callback)
+            self.selector.currentIndexChanged.connect(
+                lambda index: _run_callbacks(callback, f"SettingsComboBox.{settings_key}", index)
+            )
+        bind_to_settings(self, self.component.settings, (settings_key,), self.refresh)
 
     def set_setting(self, index):
-        self.component.settings.dict[self.settings_key] = self.settings_options[index]
+        self.component.settings[self.settings_key] = self.settings_options[index]
+
+    def set_value(self, val):
+        self.selector.setCurrentIndex(self.settings_options.index(val))
+
+    def refresh(self):
+        value = self.component.settings.dict[self.settings_key]
+        index = self.selector.currentIndex()
+        if index < 0 or self.settings_options[index] != value:
+            # The value came from the settings, so it isn't written back, and callbacks for user edits don't run.
+            with qtc.QSignalBlocker(self.selector):
+                self.set_value(value)
 
 
 class SettingsVectorBox(qtw.QWidget):
-    def __init__(self, settings, label, settings_key, callback=None):
+    """
+    Three line edits bound to the components of a 3-vector, each written when its editing is finished.
+
+    Parameters
+    ----------
+    rate_limit : float, dict or RateLimiter, optional
+        If given, the vector is also written while the user types, whenever every component is valid, at the rate
+        allowed by this, as for SettingsEntryBox.  Defaults to None.
+    """
+    def __init__(self, settings, label, settings_key, callback=None, rate_limit=None):
         super().__init__()
+        self.callback = callback
         self.settings = settings
         self.settings_key = settings_key
 
@@ -265,37 +422,65 @@ class SettingsVectorBox(qtw.QWidget):
             entry.setValidator(qtg.QDoubleValidator(-1e6, 1e6, 7))
             layout.addWidget(entry)
 
+        self.rate_limiter = _live_updates(
+            self, [(entry.textChanged, entry.editingFinished) for entry in self.entries], self.typed_callback,
+            rate_limit
+        )
         self.entries[0].editingFinished.connect(self.callback_x)
         self.entries[1].editingFinished.connect(self.callback_y)
         self.entries[2].editingFinished.connect(self.callback_z)
 
         if callback is not None:
-            try:
-                for each in callback:
-                    self.entries[0].editingFinished.connect(each)
-                    self.entries[1].editingFinished.connect(each)
-                    self.entries[2].editingFinished.connect(each)
-            except TypeError:
-                self.entries[0].editingFinished.connect(callback)
-                self.entries[1].editingFinished.connect(callback)
-                self.entries[2].editingFinished.connect(callback)
+            for entry in self.entries:
+                entry.editingFinished.connect(lambda: _run_callbacks(callback, f"SettingsVectorBox.{settings_key}"))
+        bind_to_settings(self, settings, (settings_key,), self.refresh)
+
+    def typed_callback(self, *args):
+        try:
+            values = [float(entry.text()) for entry in self.entries]
+        except ValueError:
+            return
+        vector = self.settings.dict[self.settings_key]
+        if any(value != component for value, component in zip(values, vector)):
+            for i, value in enumerate(values):
+                vector[i] = value
+            self.settings.mark_changed(self.settings_key)
+            _run_callbacks(self.callback, f"SettingsVectorBox.{self.settings_key}")
 
     def callback_x(self):
         value = float(self.entries[0].text())
         self.settings.dict[self.settings_key][0] = value
+        self.settings.mark_changed(self.settings_key)
 
     def callback_y(self):
         value = float(self.entries[1].text())
         self.settings.dict[self.settings_key][1] = value
+        self.settings.mark_changed(self.settings_key)
 
     def callback_z(self):
         value = float(self.entries[2].text())
         self.settings.dict[self.settings_key][2] = value
+        self.settings.mark_changed(self.settings_key)
+
+    def set_value(self, val):
+        for entry, component in zip(self.entries, val):
+            entry.setText(str(component))
+
+    def refresh(self):
+        for entry, component in zip(self.entries, self.settings.dict[self.settings_key]):
+            try:
+                if float(entry.text()) == component:
+                    continue
+            except ValueError:
+                pass
+            entry.setText(str(component))
 
 
 class SettingsCheckBox(qtw.QWidget):
     def __init__(self, settings, key, label, callback=None):
         super().__init__()
+        self.settings = settings
+        self.key = key
 
         layout = qtw.QHBoxLayout()
         layout.setContentsMargins(0, 0, 0, 0)
@@ -309,16 +494,15 @@ class SettingsCheckBox(qtw.QWidget):
         self._check_box.setTristate(False)
 
         def set_setting(new_state):
-            settings.dict[key] = bool(new_state)
+            settings[key] = bool(new_state)
 
         self._check_box.stateChanged.connect(set_setting)
 
         if callback is not None:
-            try:
-                for each in callback:
-                    self._check_box.stateChanged.connect(each)
-            except TypeError:
-                self._check_box.stateChanged.connect(callback)
+            self._check_box.stateChanged.connect(
+                lambda state: _run_callbacks(callback, f"SettingsCheckBox.{key}", state)
+            )
+        bind_to_settings(self, settings, (key,), self.refresh)
 
     def set_value(self, val):
         if val:
@@ -326,6 +510,12 @@ class SettingsCheckBox(qtw.QWidget):
         else:
             self._check_box.setCheckState(0)
 
+    def refresh(self):
+        if self._check_box.isChecked() != bool(self.settings.dict[self.key]):
+            # As for SettingsComboBox, the value isn't written back to the settings.
+            with qtc.QSignalBlocker(self._check_box):
+                self.set_value(self.settings.dict[self.key])
+
 
 class ColorEntryButton(qtw.QPushButton):
     def __init__(self, settings, key, callback=None):
@@ -335,9 +525,20 @@ class ColorEntryButton(qtw.QPushButton):
         self.callback = callback
         self.settings = settings
         self.key = key
+        self._color = None
+        bind_to_settings(self, settings, (key,), self.refresh)
 
     def click(self):
         color = qtw.QColorDialog.getColor().name()
-        self.settings.dict[self.key] = color
-        self.setStyleSheet(f"QPushButton {{ background-color: {color}}}")
-        self.callback()
+        self.settings[self.key] = color
+        self.set_value(color)
+        with instrument.span("callback", f"ColorEntryButton.{self.key}"):
+            self.callback()
+
+    def set_value(self, val):
+        self._color = val
+        self.setStyleSheet(f"QPushButton {{ background-color: {val}}}")
+
+    def refresh(self):
+        if self._color is not None and self._color != self.settings.dict[self.key]:
+            self.set_value(self.settings.dict[self.key])
@@ -0,0 +1,338 @@
+"""
+Shares a Settings object with worker processes through shared memory, so that workers don't need a pickled copy of
+the settings with every task.
+
+The GUI process wraps its Settings in a SharedSettings, which publishes the settings to shared memory whenever they
+change.  Workers read them through a SharedSettingsView, which only has to compare one integer per task to find out
+whether anything changed:
+
+    shared = SharedSettings(settings)
+    with multiprocessing.Pool() as pool:
+        pool.map(work, [(shared.view, item) for item in items])
+
+    def work(args):
+        view, item = args
+        view.refresh()
+        return process(item, view.gain, view.calibration.table)
+
+Large arrays are each placed in a segment of their own, which is only rewritten when the array changes, and are read
+by the workers as read only views straight out of shared memory.  Everything else is pickled into a small segment
+once per change, and unpickled by each worker once per change.
+
+On Python versions before 3.13, views should only be attached from processes started by multiprocessing, which share
+the resource tracker of the process that created the SharedSettings.  Shared memory needs Python 3.8 or newer.
+"""
+import pickle
+import struct
+import sys
+import threading
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    # Python 3.7.  The rest of epyqtsettings doesn't need it, so only using shared settings fails.
+    shared_memory = None
+
+from epyqtsettings.settings import Settings, _is_dirty
+
+# The control segment holds a sequence number, which is odd while an update is being written, the version, and the
+# name of the segment holding the pickled settings.
+_HEADER = struct.Struct("<QQI")
+_SEQUENCE = struct.Struct("<Q")
+_VERSION = struct.Struct("<8xQ")
+_NAME_SIZE = 128
+_CONTROL_SIZE = _HEADER.size + _NAME_SIZE
+
+
+class _SharedArray:
+    """
+    Stands in for an array in the pickled settings, giving the segment that holds it.
+    """
+    __slots__ = ("name", "dtype", "shape")
+
+    def __init__(self, name, dtype, shape):
+        self.name = name
+        self.dtype = dtype
+        self.shape = shape
+
+    def __getstate__(self):
+        return self.name, self.dtype, self.shape
+
+    def __setstate__(self, state):
+        self.name, self.dtype, self.shape = state
+
+
+class SharedSettings:
+    """
+    Publishes a Settings object to shared memory, for SharedSettingsView to read in other processes.
+
+    The settings are published when the SharedSettings is created, and again after every change reported by the
+    Settings, coalesced the same way as subscriptions.  Values modified in place must be reported with mark_changed,
+    as usual.
+
+    Parameters
+    ----------
+    settings : Settings
+        The settings to share.
+    min_bytes : int, optional
+        numpy arrays of at least this many bytes are placed in segments of their own, and shared without copying.
+        Smaller ones are pickled with the other values.  Defaults to 4096.
+
+    Public Properties
+    -----------------
+    name : str
+        The name of the control segment, from which a SharedSettingsView can be attached.
+    view : SharedSettingsView
+        A view of these settings, which is cheap to pickle and send to a worker.
+    version : int
+        Incremented with every publish.
+
+    Public Methods
+    --------------
+    publish() :
+        Publish the settings now.  Only needed if they were changed without being reported.
+    close() :
+        Stop publishing, and release the shared memory.
+    """
+    def __init__(self, settings, min_bytes=4096):
+        _require_shared_memory()
+        self.settings = settings
+        self.min_bytes = min_bytes
+        self.version = 0
+        self._lock = threading.Lock()
+        self._dirty = set()
+        self._meta = None
+        # Maps the dotted path of each shared array to the array and the segment it was copied into.
+        self._arrays = {}
+        self._control = shared_memory.SharedMemory(create=True, size=_CONTROL_SIZE)
+        _HEADER.pack_into(self._control.buf, 0, 0, 0, 0)
+        self.publish()
+        self._token = settings.subscribe(self._on_change)
+
+    @property
+    def name(self):
+        return self._control.name
+
+    @property
+    def view(self):
+        return attach(self.name)
+
+    def _on_change(self, paths):
+        self._dirty.update(paths)
+        self.publish()
+
+    def publish(self):
+        with self._lock:
+            if self._control is None:
+                return
+            dirty, self._dirty = self._dirty, set()
+            arrays = {}
+            data = self._externalize(self.settings.to_dict(), "", dirty, arrays)
+            pickled = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+            meta = shared_memory.SharedMemory(create=True, size=max(len(pickled), 1))
+            meta.buf[:len(pickled)] = pickled
+            name = meta.name.encode()
+
+            buffer = self._control.buf
+            sequence = _SEQUENCE.unpack_from(buffer, 0)[0]
+            _SEQUENCE.pack_into(buffer, 0, sequence + 1)
+            buffer[_HEADER.size:_HEADER.size + len(name)] = name
+            self.version += 1
+            _HEADER.pack_into(buffer, 0, sequence + 1, self.version, len(name))
+            _SEQUENCE.pack_into(buffer, 0, sequence + 2)
+
+            # Views that still refer to old segments keep them mapped, so they can be unlinked straight away.
+            if self._meta is not None:
+                _release(self._meta)
+            self._meta = meta
+            for path, (_, segment) in self._arrays.items():
+                if arrays.get(path, (None, None))[1] is not segment:
+                    _release(segment)
+            self._arrays = arrays
+
+    def _externalize(self, data, prefix, dirty, arrays):
+        numpy = sys.modules.get("numpy")
+        result = {}
+        for key, value in data.items():
+            path = prefix + key
+            if type(value) is dict:
+                value = self._externalize(value, f"{path}.", dirty, arrays)
+            elif (
+                numpy is not None and isinstance(value, numpy.ndarray) and value.nbytes >= self.min_bytes
+                and not value.dtype.hasobject
+            ):
+                array, segment = self._arrays.get(path, (None, None))
+                if array is not value or _is_dirty(path, dirty):
+                    segment = shared_memory.SharedMemory(create=True, size=value.nbytes)
+                    numpy.ndarray(value.shape, value.dtype, buffer=segment.buf)[...] = value
+                arrays[path] = (value, segment)
+                value = _SharedArray(segment.name, value.dtype.str, value.shape)
+            result[key] = value
+        return result
+
+    def close(self):
+        with self._lock:
+            if self._control is None:
+                return
+            self.settings.unsubscribe(self._token)
+            for _, segment in self._arrays.values():
+                _release(segment)
+            self._arrays = {}
+            if self._meta is not None:
+                _release(self._meta)
+                self._meta = None
+            _release(self._control)
+            self._control = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class SharedSettingsView:
+    """
+    A read only view, in any process, of the settings published by a SharedSettings.  Create it with attach, or get
+    it from SharedSettings.view.  Pickling a view only pickles the name of the shared memory, and views are cached
+    per process, so sending one with every task is cheap.
+
+    Settings are read from the view like from a Settings object, as attributes or items.  Arrays are read only views
+    of shared memory, which stay valid for as long as they are referenced, and must be copied to be modified.
+
+    Public Properties
+    -----------------
+    name : str
+        The name of the control segment of the SharedSettings.
+    settings : Settings
+        A Settings object holding the values as of the last refresh.  Replaced, rather than modified, by refresh.
+    version : int
+        The version of the settings as of the last refresh.
+
+    Public Methods
+    --------------
+    refresh() :
+        Pick up the latest published settings.  Returns True if they changed.  Costs one integer compare if they
+        didn't, so call it at the start of every task.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.version = None
+        self.settings = None
+        self._control = _attach(name)
+        self._segments = {}
+        self._retired = []
+        self.refresh()
+
+    def refresh(self):
+        if _VERSION.unpack_from(self._control.buf, 0)[0] == self.version:
+            return False
+        while True:
+            sequence, version, length = _HEADER.unpack_from(self._control.buf, 0)
+            if sequence & 1:
+                continue
+            name = bytes(self._control.buf[_HEADER.size:_HEADER.size + length]).decode()
+            try:
+                meta = _attach(name)
+                try:
+                    data = pickle.loads(meta.buf)
+                finally:
+                    meta.close()
+                segments = {}
+                data = self._resolve(data, segments)
+            except (FileNotFoundError, pickle.UnpicklingError, EOFError):
+                # Replaced and unlinked while it was being read.
+                if _SEQUENCE.unpack_from(self._control.buf, 0)[0] == sequence:
+                    raise
+                continue
+            if _SEQUENCE.unpack_from(self._control.buf, 0)[0] == sequence:
+                break
+
+        settings = Settings.__new__(Settings)
+        settings._init_slots(data)
+        settings.upconvert_dicts()
+        self.settings = settings
+        self.version = version
+        self._retired.extend(segment for name, segment in self._segments.items() if name not in segments)
+        self._segments = segments
+        self._close_retired()
+        return True
+
+    def _resolve(self, data, segments):
+        for key, value in data.items():
+            if type(value) is dict:
+                self._resolve(value, segments)
+            elif isinstance(value, _SharedArray):
+                segment = segments.get(value.name) or self._segments.get(value.name) or _attach(value.name)
+                segments[value.name] = segment
+                import numpy
+                array = numpy.ndarray(value.shape, value.dtype, buffer=segment.buf)
+                array.flags.writeable = False
+                data[key] = array
+        return data
+
+    def _close_retired(self):
+        retired, self._retired = self._retired, []
+        for segment in retired:
+            try:
+                segment.close()
+            except BufferError:
+                # Arrays from an old version are still in use.
+                self._retired.append(segment)
+
+    def keys(self):
+        return self.settings.keys()
+
+    def get_subset(self, subset):
+        return self.settings.get_subset(subset)
+
+    def to_dict(self):
+        return self.settings.to_dict()
+
+    def __getattr__(self, key):
+        if key.startswith("_") or key in ("name", "version", "settings"):
+            raise AttributeError(key)
+        return getattr(self.settings, key)
+
+    def __getitem__(self, key):
+        return self.settings[key]
+
+    def __reduce__(self):
+        return attach, (self.name,)
+
+
+_views = {}
+
+
+def attach(name):
+    """
+    Return the SharedSettingsView of the SharedSettings whose control segment is name, attaching it on first use.
+    """
+    view = _views.get(name)
+    if view is None:
+        view = _views[name] = SharedSettingsView(name)
+    return view
+
+
+def _require_shared_memory():
+    if shared_memory is None:
+        raise RuntimeError("SharedSettings: shared memory requires Python 3.8 or newer.")
+
+
+def _attach(name):
+    _require_shared_memory()
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    return shared_memory.SharedMemory(name)
+
+
+def _release(segment):
+    try:
+        segment.close()
+    except BufferError:
+        pass
+    try:
+        segment.unlink()
+    except FileNotFoundError:
+        pass
+
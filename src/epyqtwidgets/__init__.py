@@ -0,0 +1,43 @@
+"""
+Every widget is importable straight from the package, but the module that defines it is only
+imported the first time it is accessed, so that an application that only wants, say, a
+HumbleSlider doesn't pay to import numpy and mpl.
+"""
+import importlib
+
+_LAZY_ATTRIBUTES = {
+    "AutoContrast": "contrast",
+    "CanvasPool": "mpl",
+    "DelayedSlider": "slider",
+    "DiagnosticsWidget": "diagnostics",
+    "FrameRateCounter": "timing",
+    "FrameSink": "frame_sink",
+    "HumbleComboBox": "humble_combobox",
+    "HumbleSlider": "slider",
+    "ImageWidget": "image",
+    "Indicator": "indicator",
+    "IndicatorBank": "indicator_bank",
+    "IP4Validator": "ip4validator",
+    "LatestExecutor": "latest_executor",
+    "MPLWidget": "mpl",
+    "MplImageGrid": "mpl",
+    "MplImshowWidget": "mpl",
+    "MplStreamWidget": "mpl",
+    "RateLimiter": "rate_limit",
+}
+
+__all__ = sorted(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    try:
+        module_name = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(f"{__name__}.{module_name}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,120 @@
+import numpy as np
+
+# The number of bytes of an image that are reduced at a time by minmax, chosen so that each chunk
+# stays in cache between the min and the max reduction, which makes the two a single pass over
+# memory.
+_MINMAX_CHUNK_BYTES = 1 << 19
+
+
+def minmax(data):
+    """
+    Compute the minimum and maximum of an array in a single pass over memory, ignoring NaNs.
+    Returns (nan, nan) if every element is NaN.
+    """
+    flat = np.ravel(data)
+    chunk = max(_MINMAX_CHUNK_BYTES // flat.itemsize, 1)
+    low = np.fmin.reduce(flat[:chunk])
+    high = np.fmax.reduce(flat[:chunk])
+    for start in range(chunk, flat.size, chunk):
+        piece = flat[start:start + chunk]
+        low = np.fmin(low, np.fmin.reduce(piece))
+        high = np.fmax(high, np.fmax.reduce(piece))
+    return low, high
+
+
+def strided_sample(data, sample_size):
+    """
+    Return a view of roughly sample_size elements of an image, taken on a regular grid.
+    """
+    data = np.asarray(data)
+    if data.size <= sample_size:
+        return data
+    if data.ndim == 1:
+        return data[::data.size // sample_size]
+    stride = int(np.sqrt(data.shape[0] * data.shape[1] / sample_size)) or 1
+    return data[::stride, ::stride]
+
+
+class AutoContrast:
+    """
+    Chooses the color limits for a stream of images, at a fraction of the cost of scanning every
+    frame twice with np.min and np.max.  All modes ignore NaNs.
+
+    Parameters
+    ----------
+    mode : str, optional
+        How to compute the limits.  One of:
+        "fixed" : Always use clim.
+        "minmax" : The default.  The full range of the image, computed in a single pass.
+        "percentile" : The given percentiles of a strided sample of the image.
+        "smoothed" : The range of a strided sample of the image, exponentially smoothed across
+            frames, so that the limits don't flicker with noise.
+    clim : 2-tuple of floats, optional
+        The limits to use in fixed mode, and until the first frame is seen in the other modes.
+    interval : int, optional
+        Only recompute the limits every this many frames, and reuse the previous limits in
+        between.  Defaults to 1, every frame.
+    percentiles : 2-tuple of floats, optional
+        The low and high percentiles used in percentile mode.  Defaults to (1, 99).
+    smoothing : float, optional
+        The weight given to the newest frame in smoothed mode, between 0 and 1.  Defaults to .2.
+    sample_size : int, optional
+        The approximate number of pixels sampled in percentile and smoothed modes.
+        Defaults to 65536.
+
+    Public Properties
+    -----------------
+    clim : 2-tuple of floats
+        The most recently computed limits.
+
+    Public Methods
+    --------------
+    __call__(data) :
+        Return the limits to use to display data.
+    reset() :
+        Forget any running limits, so that the next frame recomputes them from scratch.
+    """
+    MODES = ("fixed", "minmax", "percentile", "smoothed")
+
+    def __init__(
+        self, mode="minmax", clim=None, interval=1, percentiles=(1, 99), smoothing=.2,
+        sample_size=65536
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f"AutoContrast: mode must be one of {self.MODES}.")
+        if mode == "fixed" and clim is None:
+            raise ValueError("AutoContrast: clim must be specified in fixed mode.")
+        self.mode = mode
+        self.clim = clim
+        self.interval = interval
+        self.percentiles = percentiles
+        self.smoothing = smoothing
+        self.sample_size = sample_size
+        self._frames = 0
+
+    def reset(self):
+        self._frames = 0
+        if self.mode != "fixed":
+            self.clim = None
+
+    def __call__(self, data):
+        if self.mode == "fixed":
+            return self.clim
+        recompute = self.clim is None or self._frames % self.interval == 0
+        self._frames += 1
+        if not recompute:
+            return self.clim
+
+        if self.mode == "minmax":
+            low, high = minmax(data)
+        elif self.mode == "percentile":
+            low, high = np.nanpercentile(strided_sample(data, self.sample_size), self.percentiles)
+        else:
+            low, high = minmax(strided_sample(data, self.sample_size))
+            if self.clim is not None:
+                low = self.clim[0] + self.smoothing * (low - self.clim[0])
+                high = self.clim[1] + self.smoothing * (high - self.clim[1])
+
+        if np.isfinite(low) and np.isfinite(high):
+            self.clim = (low, high)
+        return self.clim
@@ -0,0 +1,150 @@
+import PyQt5.QtCore as qtc
+import PyQt5.QtWidgets as qtw
+
+from epyqtwidgets import instrument
+
+
+class DiagnosticsWidget(qtw.QWidget):
+    """
+    A live view of what epyqtwidgets.instrument has recorded: a sortable table of the durations of every span, with
+    controls to start and stop recording, clear the statistics and save a Chrome trace.
+
+    The table is refreshed periodically, only while the widget is visible, and only changed cells are rewritten, so
+    watching it costs little next to what it measures.
+
+    Parameters
+    ----------
+    interval : float, optional
+        The refresh period, in seconds.  Defaults to .5.
+    args and kwargs passed to qtw.QWidget constructor
+
+    Public Methods
+    --------------
+    refresh() :
+        Update the table now.
+    """
+    COLUMNS = ("Category", "Name", "Count", "Mean (ms)", "p50 (ms)", "p95 (ms)", "Max (ms)", "Total (ms)")
+
+    def __init__(self, interval=.5, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        layout = qtw.QVBoxLayout()
+        self.setLayout(layout)
+
+        controls = qtw.QHBoxLayout()
+        layout.addLayout(controls)
+        self.record_box = qtw.QCheckBox("Record")
+        self.record_box.setChecked(instrument.enabled())
+        self.record_box.toggled.connect(self._set_recording)
+        controls.addWidget(self.record_box)
+        self.trace_box = qtw.QCheckBox("Trace")
+        recorder = instrument.recorder()
+        self.trace_box.setChecked(recorder is not None and recorder.trace)
+        self.trace_box.toggled.connect(self._set_tracing)
+        controls.addWidget(self.trace_box)
+        reset_button = qtw.QPushButton("Reset")
+        reset_button.clicked.connect(self._reset)
+        controls.addWidget(reset_button)
+        self.save_button = qtw.QPushButton("Save trace")
+        self.save_button.clicked.connect(self._save_trace)
+        controls.addWidget(self.save_button)
+        controls.addStretch()
+
+        self.status = qtw.QLabel()
+        layout.addWidget(self.status)
+
+        self.table = qtw.QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(qtw.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setSortingEnabled(True)
+        layout.addWidget(self.table)
+        # (category, name): the items of its row.
+        self._rows = {}
+
+        self._timer = qtc.QTimer(self)
+        self._timer.setInterval(max(1, int(interval * 1000)))
+        self._timer.timeout.connect(self.refresh)
+        self._update_controls()
+
+    def showEvent(self, event):
+        self.refresh()
+        self._timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        super().hideEvent(event)
+
+    def _set_recording(self, checked):
+        if checked and not instrument.enabled():
+            instrument.enable(trace=self.trace_box.isChecked())
+            self._rows.clear()
+            self.table.setRowCount(0)
+        elif not checked:
+            instrument.disable()
+        self._update_controls()
+        self.refresh()
+
+    def _set_tracing(self, checked):
+        recorder = instrument.recorder()
+        if recorder is not None:
+            recorder.trace = checked
+        self._update_controls()
+
+    def _update_controls(self):
+        recorder = instrument.recorder()
+        self.save_button.setEnabled(recorder is not None and recorder.trace)
+
+    def _reset(self):
+        recorder = instrument.recorder()
+        if recorder is not None:
+            recorder.reset()
+        self._rows.clear()
+        self.table.setRowCount(0)
+        self.refresh()
+
+    def _save_trace(self):
+        filename, _ = qtw.QFileDialog.getSaveFileName(self, "Save trace", "trace.json", "Chrome trace (*.json)")
+        if filename:
+            instrument.dump_trace(filename)
+
+    def refresh(self):
+        recorder = instrument.recorder()
+        if self.record_box.isChecked() != (recorder is not None):
+            self.record_box.blockSignals(True)
+            self.record_box.setChecked(recorder is not None)
+            self.record_box.blockSignals(False)
+            self._update_controls()
+        if recorder is None:
+            self.status.setText("Not recording.")
+            return
+
+        stats = recorder.stats()
+        latency = stats.get(("event_loop", "latency"))
+        stalls = stats.get(("event_loop", "stall"))
+        self.status.setText(
+            f"Event loop latency p95 {latency['p95'] * 1000:.1f} ms, max {latency['max'] * 1000:.1f} ms.  "
+            f"Stalls: {stalls['count'] if stalls else 0}."
+            if latency else "Event loop not monitored."
+        )
+
+        self.table.setSortingEnabled(False)
+        for key, summary in stats.items():
+            cells = key + (
+                summary["count"], summary["mean"] * 1000, summary["p50"] * 1000, summary["p95"] * 1000,
+                summary["max"] * 1000, summary["total"] * 1000
+            )
+            items = self._rows.get(key)
+            if items is None:
+                row = self.table.rowCount()
+                self.table.insertRow(row)
+                items = self._rows[key] = [qtw.QTableWidgetItem() for _ in self.COLUMNS]
+                for column, item in enumerate(items):
+                    self.table.setItem(row, column, item)
+            for item, value in zip(items, cells):
+                # Numbers are stored as numbers, so that they sort as numbers.
+                value = round(value, 3) if type(value) is float else value
+                if item.data(qtc.Qt.ItemDataRole.DisplayRole) != value:
+                    item.setData(qtc.Qt.ItemDataRole.DisplayRole, value)
+        self.table.setSortingEnabled(True)
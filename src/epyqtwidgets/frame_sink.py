@@ -0,0 +1,138 @@
+import threading
+import time
+
+import numpy as np
+import PyQt5.QtCore as qtc
+import PyQt5.QtWidgets as qtw
+
+from epyqtwidgets import instrument
+
+
+class FrameSink(qtc.QObject):
+    """
+    A thread safe, latest-frame-wins hand off between a producer thread and a display widget.
+
+    Any thread may call submit() as fast as it likes.  Frames are copied into a small ring of
+    preallocated buffers, and the GUI thread renders only the newest one, at most once per
+    display refresh.  Frames that are superseded before they could be rendered are dropped and
+    counted, so a fast producer never backs up the event queue.
+
+    The FrameSink must be created in the GUI thread.
+
+    Parameters
+    ----------
+    render : callable
+        Called in the GUI thread as render(data, extent) with the newest frame.  data is one of
+        the ring buffers, which will be reused once render returns, so render must copy
+        anything it wants to keep, unless retain_frames is True.
+    buffer_size : int, optional
+        The number of frame buffers in the ring.  Must be at least 3: one being rendered, one
+        waiting to be rendered, and one being written.  Defaults to 3.
+    max_rate : float, optional
+        The maximum number of frames rendered per second.  Defaults to None, in which case the
+        refresh rate of the primary screen is used.
+    retain_frames : bool, optional
+        If False, the default, buffers are reused once rendered.
+        If True, render may keep a reference to the data it was passed, and the buffer is
+        replaced by a fresh allocation instead of being reused.
+    parent : QObject, optional
+        The Qt parent of this object.
+
+    Public Properties
+    -----------------
+    frames_submitted : int
+        The number of frames passed to submit().
+    frames_rendered : int
+        The number of frames passed to render.
+    frames_dropped : int
+        The number of frames that were superseded by a newer frame before being rendered.
+
+    Public Methods
+    --------------
+    submit(data, extent) :
+        Queue a frame for display.  May be called from any thread.
+    """
+    _frame_ready = qtc.pyqtSignal()
+
+    def __init__(self, render, buffer_size=3, max_rate=None, retain_frames=False, parent=None):
+        super().__init__(parent)
+        if buffer_size < 3:
+            raise ValueError("FrameSink: buffer_size must be at least 3.")
+        self._render = render
+        self.max_rate = max_rate
+        self.retain_frames = retain_frames
+        self._buffers = [None] * buffer_size
+        self._extents = [None] * buffer_size
+        self._latest = None
+        self._reading = None
+        self._render_pending = False
+        self._last_render = 0.0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+        self.frames_submitted = 0
+        self.frames_rendered = 0
+        self.frames_dropped = 0
+
+        self._timer = qtc.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._render_latest)
+        self._frame_ready.connect(self._schedule_render)
+
+    def submit(self, data, extent):
+        data = np.asarray(data)
+        with self._write_lock:
+            with self._lock:
+                index = next(
+                    i for i in range(len(self._buffers)) if i != self._latest and i != self._reading
+                )
+            buffer = self._buffers[index]
+            if buffer is None or buffer.shape != data.shape or buffer.dtype != data.dtype:
+                buffer = np.empty_like(data)
+                self._buffers[index] = buffer
+            np.copyto(buffer, data)
+
+            with self._lock:
+                if self._latest is not None:
+                    self.frames_dropped += 1
+                self._latest = index
+                self._extents[index] = extent
+                self.frames_submitted += 1
+                notify = not self._render_pending
+                self._render_pending = True
+        if notify:
+            self._frame_ready.emit()
+
+    def _frame_interval(self):
+        rate = self.max_rate
+        if rate is None:
+            screen = qtw.QApplication.primaryScreen()
+            rate = screen.refreshRate() if screen is not None else 0
+            rate = rate or 60.0
+        return 1.0 / rate
+
+    def _schedule_render(self):
+        wait = self._last_render + self._frame_interval() - time.perf_counter()
+        if wait > 0:
+            self._timer.start(int(wait * 1000) + 1)
+        else:
+            self._render_latest()
+
+    def _render_latest(self):
+        with self._lock:
+            index = self._latest
+            self._latest = None
+            self._render_pending = False
+            if index is None:
+                return
+            self._reading = index
+        try:
+            with instrument.span("render", "FrameSink"):
+                self._render(self._buffers[index], self._extents[index])
+        finally:
+            with self._lock:
+                self._reading = None
+                if self.retain_frames:
+                    self._buffers[index] = None
+        self._last_render = time.perf_counter()
+        self.frames_rendered += 1
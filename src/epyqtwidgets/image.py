@@ -0,0 +1,249 @@
+import numpy as np
+import PyQt5.QtCore as qtc
+import PyQt5.QtGui as qtg
+import PyQt5.QtWidgets as qtw
+
+from epyqtwidgets import instrument
+from epyqtwidgets.contrast import AutoContrast
+from epyqtwidgets.frame_sink import FrameSink
+from epyqtwidgets.timing import FrameRateCounter
+
+
+def colormap_lut(cmap="gray", size=256):
+    """
+    Build a color lookup table, as an array of size 32 bit ARGB values.
+
+    Parameters
+    ----------
+    cmap : str or array, optional
+        Either "gray", the default, an array of shape (N, 3) or (N, 4) of colors as floats in
+        [0, 1] or as uint8, which is resampled to size entries, or the name of a mpl colormap.
+        mpl is only imported in the last case.
+    size : int, optional
+        The number of entries in the table.  Defaults to 256.
+    """
+    if isinstance(cmap, str):
+        if cmap == "gray":
+            colors = np.repeat(np.linspace(0, 1, size)[:, np.newaxis], 3, axis=1)
+        else:
+            import matplotlib
+            colors = matplotlib.colormaps[cmap](np.linspace(0, 1, size))
+    else:
+        colors = np.asarray(cmap)
+        if colors.dtype == np.uint8:
+            colors = colors / 255
+        positions = np.linspace(0, len(colors) - 1, size)
+        colors = np.stack(
+            [np.interp(positions, np.arange(len(colors)), channel) for channel in colors.T],
+            axis=1
+        )
+    colors = np.round(np.clip(colors, 0, 1) * 255).astype(np.uint32)
+    alpha = colors[:, 3] if colors.shape[1] == 4 else 255
+    return (alpha << 24) | (colors[:, 0] << 16) | (colors[:, 1] << 8) | colors[:, 2]
+
+
+class ImageWidget(qtw.QWidget):
+    """
+    A lightweight widget that displays a single image, painted directly with Qt rather than
+    through mpl.  It has the same set_data and submit_frame interface as MplImshowWidget, but no
+    axes, toolbar or colorbar, and much higher frame rates.
+
+    The image is wrapped in a QImage without copying wherever possible: uint8 images are
+    displayed straight out of the array's memory, with the colormap and color limits applied by
+    Qt's color table.  uint16 images are mapped through a 65536 entry lookup table and other
+    types are scaled to 8 bits first, in a few vectorized numpy passes into reused buffers.
+    (H, W, 3) uint8 images are displayed as RGB.
+
+    Because the image may be displayed straight out of the array passed to set_data, that
+    array must not be modified in place afterwards.
+
+    Parameters
+    ----------
+    initial_data : 2D array, optional
+        The image to display before the first call to set_data.  Defaults to a single black
+        pixel.
+    cmap : str or array, optional
+        The colormap, as accepted by colormap_lut.  Defaults to "gray".
+    contrast : str or AutoContrast, optional
+        How the color limits are chosen for each frame.  May be an AutoContrast, or one of
+        its modes, in which case an AutoContrast with default options is used.  Defaults to
+        "minmax", the full range of each frame.
+    aspect : str, optional
+        If "equal", the default, the image keeps the aspect ratio given by its extent.
+        If "auto", the image is stretched to fill the widget.
+    args and kwargs passed to qtw.QWidget constructor
+
+    Public Properties
+    -----------------
+    contrast : AutoContrast
+        Chooses the color limits.  May be replaced or reconfigured at any time.
+    fps : float
+        The rate at which frames have recently been displayed by set_data.
+    frame_rate : FrameRateCounter
+        The object that measures fps.
+    frame_sink : FrameSink
+        Buffers frames passed to submit_frame, and holds the counts of submitted, rendered and
+        dropped frames.
+
+    Public Methods
+    --------------
+    set_data(data, extent) :
+        Display a new image, which is drawn with its first row at the bottom, like
+        MplImshowWidget.  Must be called from the GUI thread.
+    submit_frame(data, extent) :
+        Queue a new image for display.  May be called from any thread, at any rate; only the
+        newest frame is displayed, at most once per display refresh.
+    set_cmap(cmap) :
+        Change the colormap.
+    """
+    def __init__(
+        self,
+        initial_data=None,
+        cmap="gray",
+        contrast="minmax",
+        aspect="equal",
+        *args,
+        **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        if isinstance(contrast, str):
+            contrast = AutoContrast(contrast)
+        self.contrast = contrast
+        self.aspect = aspect
+        self.frame_rate = FrameRateCounter()
+        self.frame_sink = FrameSink(self.set_data, retain_frames=True, parent=self)
+        self.setAttribute(qtc.Qt.WidgetAttribute.WA_OpaquePaintEvent)
+
+        self._image = None
+        self._image_data = None
+        self._extent = (0, 1, 0, 1)
+        self._buffers = {}
+        self._table_key = None
+        self._table = None
+        self.set_cmap(cmap)
+        if initial_data is None:
+            initial_data = np.zeros((1, 1), dtype=np.uint8)
+        self.set_data(initial_data, (0, 1, 0, 1))
+        self.contrast.reset()
+        self.frame_rate.reset()
+
+    @property
+    def fps(self):
+        return self.frame_rate.fps
+
+    def set_cmap(self, cmap):
+        self._lut = colormap_lut(cmap)
+        self._table_key = None
+
+    def set_data(self, data, extent):
+        data = np.asarray(data)
+        if data.ndim == 3 and data.shape[2] == 3 and data.dtype == np.uint8:
+            data = self._contiguous_rows(data)
+            image = qtg.QImage(
+                data.data, data.shape[1], data.shape[0], data.strides[0],
+                qtg.QImage.Format.Format_RGB888
+            )
+        elif data.dtype == np.uint16:
+            table = self._color_table(data, 65536)
+            rgb = self._buffer("_rgb", data.shape, np.uint32)
+            np.take(table, data, out=rgb)
+            data = rgb
+            image = qtg.QImage(
+                data.data, data.shape[1], data.shape[0], data.strides[0],
+                qtg.QImage.Format.Format_ARGB32
+            )
+        else:
+            if data.dtype == np.uint8:
+                table = self._color_table(data, 256)
+                data = self._contiguous_rows(data)
+            else:
+                table = self._lut
+                data = self._scale_to_uint8(data)
+            image = qtg.QImage(
+                data.data, data.shape[1], data.shape[0], data.strides[0],
+                qtg.QImage.Format.Format_Indexed8
+            )
+            image.setColorTable(table.tolist())
+
+        # The QImage does not own its memory, so the array has to be kept alive with it.
+        self._image = image
+        self._image_data = data
+        self._extent = tuple(extent)
+        self.update()
+        self.frame_rate.tick()
+
+    def submit_frame(self, data, extent):
+        self.frame_sink.submit(data, extent)
+
+    def sizeHint(self):
+        if self._image is None:
+            return super().sizeHint()
+        return self._image.size()
+
+    @instrument.instrumented("render")
+    def paintEvent(self, event):
+        painter = qtg.QPainter(self)
+        painter.fillRect(self.rect(), qtc.Qt.GlobalColor.black)
+        if self._image is None:
+            return
+
+        x0, x1, y0, y1 = self._extent
+        width, height = self.width(), self.height()
+        if self.aspect == "equal" and x1 != x0 and y1 != y0:
+            ratio = abs(x1 - x0) / abs(y1 - y0)
+            if width / height > ratio:
+                width = height * ratio
+            else:
+                height = width / ratio
+
+        # Flip the image so that the first row is at the bottom, and by any inverted extent.
+        painter.translate(self.width() / 2, self.height() / 2)
+        painter.scale(1 if x1 >= x0 else -1, -1 if y1 >= y0 else 1)
+        painter.drawImage(qtc.QRectF(-width / 2, -height / 2, width, height), self._image)
+
+    def _buffer(self, name, shape, dtype):
+        # Output buffers are double buffered, since the displayed QImage still refers to the
+        # previous frame's buffer until it is replaced.
+        buffers = self._buffers.setdefault(name, [])
+        for buffer in buffers:
+            if buffer is not self._image_data and buffer.shape == shape:
+                return buffer
+        buffer = np.empty(shape, dtype=dtype)
+        buffers[:] = [each for each in buffers if each.shape == shape][-1:] + [buffer]
+        return buffer
+
+    @staticmethod
+    def _contiguous_rows(data):
+        if data.strides[-1] != data.itemsize or (data.ndim == 3 and data.strides[1] != 3):
+            return np.ascontiguousarray(data)
+        return data
+
+    def _color_table(self, data, size):
+        # A table mapping every possible value of an integer image straight to a color, with
+        # the color limits baked in.  Rebuilt only when the limits change.
+        clim = self.contrast(data)
+        if clim is None:
+            clim = (0, size - 1)
+        key = (size, clim)
+        if key != self._table_key:
+            low, high = clim
+            span = high - low if high != low else 1
+            positions = (np.arange(size) - low) * ((len(self._lut) - 1) / span)
+            np.clip(positions, 0, len(self._lut) - 1, out=positions)
+            self._table = self._lut[positions.astype(np.intp)]
+            self._table_key = key
+        return self._table
+
+    def _scale_to_uint8(self, data):
+        clim = self.contrast(data)
+        low, high = clim if clim is not None else (0, 1)
+        span = high - low if high != low else 1
+        scaled = self._buffer("_scaled", data.shape, np.float32)
+        np.subtract(data, low, out=scaled, casting="unsafe")
+        np.multiply(scaled, (len(self._lut) - 1) / span, out=scaled)
+        np.clip(scaled, 0, len(self._lut) - 1, out=scaled)
+        if np.issubdtype(data.dtype, np.floating):
+            np.nan_to_num(scaled, copy=False, nan=0)
+        indices = self._buffer("_indices", data.shape, np.uint8)
+        np.copyto(indices, scaled, casting="unsafe")
+        return indices
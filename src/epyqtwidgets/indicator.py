@@ -1,11 +1,37 @@
+import re
+
+import PyQt5.QtGui as qtg
 import PyQt5.QtWidgets as qtw
 
+# The color functions of Qt style sheets, like "rgb(255, 0, 0)" or "hsva(0, 100%, 100%, 50%)", which QColor doesn't
+# parse itself.
+_COLOR_FUNCTION = re.compile(r"\s*(rgb|hsv|hsl)(a?)\s*\(([^()]*)\)\s*", re.IGNORECASE)
+
 
 class Indicator(qtw.QFrame):
+    """
+    A small colored square, for showing a status.  For more than a few dozen indicators, IndicatorBank is much
+    cheaper.
+
+    Parameters
+    ----------
+    color : str, QColor or tuple
+        The initial color, as anything QColor accepts: a name like "red" or "#ff0000", or an (r, g, b) tuple.  The
+        color functions of style sheets, like "rgb(255, 0, 0)" or "rgba(255, 0, 0, 50%)", are also accepted.
+    indicator_size : int, optional
+        The width and height of the indicator, in pixels.  Defaults to DEFAULT_SIZE.
+
+    Public Methods
+    --------------
+    set_color(color) :
+        Change the color.  Does nothing if the color is unchanged, so it may be called on every update.  Raises
+        ValueError if color isn't a valid color.
+    """
     DEFAULT_SIZE = 20
 
     def __init__(self, color, indicator_size=None):
         super().__init__()
+        self._color = None
         self.set_color(color)
         size = indicator_size or self.DEFAULT_SIZE
         self.setMinimumWidth(size)
@@ -15,4 +41,53 @@ class Indicator(qtw.QFrame):
         self.setAutoFillBackground(True)
 
     def set_color(self, color):
-        self.setStyleSheet(f"background-color: {color};")
+        # Setting the palette only repaints the widget, where a style sheet would be parsed and repolished.
+        color = _to_qcolor(color)
+        if color == self._color:
+            return
+        self._color = color
+        palette = self.palette()
+        palette.setColor(qtg.QPalette.ColorRole.Window, color)
+        self.setPalette(palette)
+
+
+def _to_qcolor(color):
+    if isinstance(color, tuple):
+        qcolor = qtg.QColor(*color)
+    else:
+        match = _COLOR_FUNCTION.fullmatch(color) if isinstance(color, str) else None
+        qcolor = _parse_color_function(match) if match else qtg.QColor(color)
+    if qcolor is None or not qcolor.isValid():
+        raise ValueError(f"{color!r} is not a valid color.")
+    return qcolor
+
+
+def _parse_color_function(match):
+    # Returns None if the arguments are invalid.
+    model, alpha, arguments = match.group(1).lower(), match.group(2), match.group(3).split(",")
+    if len(arguments) != (4 if alpha else 3):
+        return None
+    # Hues are in degrees, and everything else is out of 255.
+    limits = (255 if model == "rgb" else 359, 255, 255, 255)
+    values = []
+    for i, argument in enumerate(arguments):
+        argument = argument.strip()
+        try:
+            if argument.endswith("%"):
+                value = float(argument[:-1]) * limits[i] / 100
+            else:
+                value = float(argument)
+                if i == 3 and 0 < value < 1:
+                    # An alpha written as a fraction, as in CSS.
+                    value *= 255
+        except ValueError:
+            return None
+        value = int(round(value))
+        if not 0 <= value <= limits[i]:
+            return None
+        values.append(value)
+    if model == "rgb":
+        return qtg.QColor.fromRgb(*values)
+    if model == "hsv":
+        return qtg.QColor.fromHsv(*values)
+    return qtg.QColor.fromHsl(*values)
@@ -0,0 +1,155 @@
+import numpy as np
+import PyQt5.QtCore as qtc
+import PyQt5.QtGui as qtg
+import PyQt5.QtWidgets as qtw
+
+from epyqtwidgets import instrument
+from epyqtwidgets.indicator import _to_qcolor
+
+
+def _argb(color):
+    return _to_qcolor(color).rgba()
+
+
+class IndicatorBank(qtw.QWidget):
+    """
+    A grid of indicators, like a wall of Indicator widgets, drawn by a single widget.
+
+    The colors of the cells are kept in an image, and each update only rewrites and repaints the cells whose colors
+    changed, in a few vectorized numpy operations, so thousands of indicators can be updated many times a second.
+
+    Parameters
+    ----------
+    rows, cols : int
+        The shape of the grid.
+    colors : sequence, optional
+        The color of each state, as anything Indicator accepts: names like "red" or "#ff0000", (r, g, b) tuples, or
+        style sheet colors like "rgb(255, 0, 0)".
+        Cell states passed to set_states index into this.  Defaults to gray, green, yellow and red.
+    cell_size : int, optional
+        The width and height of each cell, in pixels.  Defaults to 20, the size of an Indicator.
+    spacing : int, optional
+        The gap between cells, in pixels.  Defaults to 2.
+    args and kwargs passed to qtw.QWidget constructor
+
+    Public Properties
+    -----------------
+    states : 2D int array
+        The state of each cell, as of the last call to set_states.
+    cell_colors : 2D uint32 array
+        The ARGB color of each cell.  Must not be modified directly.
+
+    Public Methods
+    --------------
+    set_states(states) :
+        Set the state of every cell, from an int array of shape (rows, cols).
+    set_colors(colors) :
+        Set the color of every cell directly, from an array of shape (rows, cols) of uint32 ARGB colors, or of shape
+        (rows, cols, 3) or (rows, cols, 4) of uint8 RGB or RGBA colors.
+    set_state_colors(colors) :
+        Change the colors of the states.
+    cell_at(pos) :
+        Return the (row, col) of the cell at a position in the widget, or None.
+    """
+    DEFAULT_COLORS = ("gray", "green", "yellow", "red")
+
+    def __init__(self, rows, cols, colors=None, cell_size=20, spacing=2, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rows = rows
+        self.cols = cols
+        self.cell_size = cell_size
+        self.spacing = spacing
+        self.pitch = cell_size + spacing
+        self.setAttribute(qtc.Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.setFixedSize(self.sizeHint())
+
+        self.states = np.zeros((rows, cols), dtype=np.intp)
+        self.cell_colors = np.zeros((rows, cols), dtype=np.uint32)
+        # The grid is drawn from this image, whose pixels are reshaped so that each cell is a block of it.
+        self._pixels = np.empty((rows * self.pitch, cols * self.pitch), dtype=np.uint32)
+        self._image = qtg.QImage(
+            self._pixels.data, self._pixels.shape[1], self._pixels.shape[0], self._pixels.strides[0],
+            qtg.QImage.Format.Format_ARGB32
+        )
+        self._fill_background()
+        self._lut = None
+        self.set_state_colors(colors if colors is not None else self.DEFAULT_COLORS)
+
+    def sizeHint(self):
+        return qtc.QSize(self.cols * self.pitch - self.spacing, self.rows * self.pitch - self.spacing)
+
+    def _fill_background(self):
+        self._pixels[...] = self.palette().color(qtg.QPalette.ColorRole.Window).rgba()
+        self._write_cells(*np.indices((self.rows, self.cols)).reshape(2, -1))
+
+    def changeEvent(self, event):
+        if event.type() == qtc.QEvent.Type.PaletteChange:
+            self._fill_background()
+            self.update()
+        super().changeEvent(event)
+
+    def set_state_colors(self, colors):
+        self._lut = np.array([_argb(color) for color in colors], dtype=np.uint32)
+        self.set_colors(self._lut[self.states])
+
+    def set_states(self, states):
+        states = np.asarray(states)
+        if states.shape != (self.rows, self.cols):
+            raise ValueError(f"IndicatorBank: states must have shape {(self.rows, self.cols)}.")
+        self.states = states.astype(np.intp, copy=True)
+        self.set_colors(self._lut[self.states])
+
+    def set_colors(self, colors):
+        colors = np.asarray(colors)
+        if colors.ndim == 3:
+            if colors.shape[2] == 3:
+                alpha = np.uint32(255)
+            else:
+                alpha = colors[..., 3].astype(np.uint32)
+            colors = (
+                (alpha << 24) | (colors[..., 0].astype(np.uint32) << 16) | (colors[..., 1].astype(np.uint32) << 8)
+                | colors[..., 2].astype(np.uint32)
+            )
+        if colors.shape != (self.rows, self.cols):
+            raise ValueError(f"IndicatorBank: colors must have shape {(self.rows, self.cols)}.")
+        rows, cols = np.nonzero(colors != self.cell_colors)
+        if rows.size == 0:
+            return
+        self.cell_colors = colors.astype(np.uint32, copy=True)
+        self._write_cells(rows, cols)
+        self._update_cells(rows, cols)
+
+    def _write_cells(self, rows, cols):
+        blocks = self._pixels.reshape(self.rows, self.pitch, self.cols, self.pitch)
+        blocks[rows, :self.cell_size, cols, :self.cell_size] = self.cell_colors[rows, cols][:, np.newaxis, np.newaxis]
+
+    def _update_cells(self, rows, cols):
+        # A region with a rectangle per cell is only worth building while it is small.  Beyond that, the bounding
+        # box of the changed cells is repainted.
+        if rows.size <= 64:
+            region = qtg.QRegion()
+            for row, col in zip(rows.tolist(), cols.tolist()):
+                region += qtc.QRect(col * self.pitch, row * self.pitch, self.cell_size, self.cell_size)
+            self.update(region)
+        else:
+            top, bottom = rows.min(), rows.max()
+            left, right = cols.min(), cols.max()
+            self.update(
+                int(left * self.pitch), int(top * self.pitch),
+                int((right - left + 1) * self.pitch), int((bottom - top + 1) * self.pitch)
+            )
+
+    def cell_at(self, pos):
+        row, col = pos.y() // self.pitch, pos.x() // self.pitch
+        if (
+            0 <= row < self.rows and 0 <= col < self.cols
+            and pos.y() % self.pitch < self.cell_size and pos.x() % self.pitch < self.cell_size
+        ):
+            return row, col
+        return None
+
+    @instrument.instrumented("render")
+    def paintEvent(self, event):
+        painter = qtg.QPainter(self)
+        for rect in event.region().rects():
+            painter.drawImage(rect, self._image, rect)
@@ -0,0 +1,343 @@
+"""
+Opt-in instrumentation of the hot paths of these packages.
+
+While enabled, the time spent in settings widget callbacks, figure draws and image renders, Settings saves and loads,
+and DelayedSlider emissions is recorded, along with how late the event loop runs.  Durations are summarized per
+category and name, as counts, totals and log2 histograms, which can be queried with stats and histogram or watched in
+a DiagnosticsWidget.  If tracing, every span is also kept, and can be written out with dump_trace in the Chrome trace
+event format, for chrome://tracing or Perfetto.
+
+    from epyqtwidgets import instrument
+
+    instrument.enable(trace=True)
+    ...
+    print(instrument.stats())
+    instrument.dump_trace("trace.json")
+
+While disabled, which is the default, an instrumented call costs one check of a module global.  This module imports
+nothing from Qt until the event loop monitor is started, so it may be used from anywhere.
+"""
+import collections
+import functools
+import json
+import os
+import threading
+import time
+
+# The recorder while enabled, else None.  Checked by every instrumented call.
+_recorder = None
+
+# Histogram bucket i holds durations of less than 2**i microseconds, and at least half that.
+_BUCKETS = 32
+
+
+class _Stats:
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * _BUCKETS
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+        self.buckets[min(int(duration * 1e6).bit_length(), _BUCKETS - 1)] += 1
+
+    def percentile(self, fraction):
+        # The upper bound of the bucket holding the percentile, so accurate to within a factor of 2.
+        target = fraction * self.count
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                return min(2 ** i / 1e6, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.percentile(.5),
+            "p95": self.percentile(.95),
+            "p99": self.percentile(.99),
+        }
+
+
+class Recorder:
+    """
+    Holds everything recorded while instrumentation is enabled.  Made by enable, which is how it should be created.
+
+    Parameters
+    ----------
+    trace : bool, optional
+        Keep every span, for dump_trace.  Defaults to False, so that only the summaries are kept.
+    max_events : int, optional
+        The number of spans kept for the trace.  The oldest are forgotten first.  Defaults to 100000.
+
+    Public Methods
+    --------------
+    record(category, name, start, duration, args=None) :
+        Record a span, with start from time.perf_counter and duration in seconds.  May be called from any thread.
+    count(name, amount=1) :
+        Add to a counter.
+    stats(category=None) :
+        Return {(category, name): summary} for every span recorded, or only for those in category.  Each summary is a
+        dict of count, and of total, mean, max, p50, p95 and p99 in seconds.
+    counters() :
+        Return {name: count}.
+    histogram(category, name) :
+        Return [(upper bound in seconds, count)] for the non empty buckets of the durations of a span.
+    reset() :
+        Forget everything recorded.
+    dump_trace(filename) :
+        Write the kept spans and counters in the Chrome trace event format.
+    """
+    def __init__(self, trace=False, max_events=100000):
+        self.trace = trace
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._counters = collections.Counter()
+        self._events = collections.deque(maxlen=max_events)
+        self._thread_names = {}
+
+    def record(self, category, name, start, duration, args=None):
+        key = (category, name)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _Stats()
+            stats.add(duration)
+            if self.trace:
+                thread = threading.get_ident()
+                if thread not in self._thread_names:
+                    self._thread_names[thread] = threading.current_thread().name
+                self._events.append((category, name, start, duration, thread, args))
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+            if self.trace:
+                self._events.append(("counter", name, time.perf_counter(), None, None, self._counters[name]))
+
+    def stats(self, category=None):
+        with self._lock:
+            return {
+                key: stats.summary() for key, stats in self._stats.items() if category is None or key[0] == category
+            }
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def histogram(self, category, name):
+        with self._lock:
+            stats = self._stats.get((category, name))
+            if stats is None:
+                return []
+            return [(2 ** i / 1e6, count) for i, count in enumerate(stats.buckets) if count]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._counters.clear()
+            self._events.clear()
+
+    def dump_trace(self, filename):
+        pid = os.getpid()
+        with self._lock:
+            events = list(self._events)
+            thread_names = dict(self._thread_names)
+        trace = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": thread, "args": {"name": name}}
+            for thread, name in thread_names.items()
+        ]
+        for category, name, start, duration, thread, args in events:
+            timestamp = (start - self.start) * 1e6
+            if category == "counter":
+                trace.append({"name": name, "ph": "C", "ts": timestamp, "pid": pid, "args": {name: args}})
+            else:
+                event = {
+                    "name": name, "cat": category, "ph": "X", "ts": timestamp, "dur": duration * 1e6, "pid": pid,
+                    "tid": thread
+                }
+                if args:
+                    event["args"] = {key: str(value) for key, value in args.items()}
+                trace.append(event)
+        with open(filename, "w") as file:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, file)
+
+
+class _Span:
+    __slots__ = ("recorder", "category", "name", "args", "begin")
+
+    def __init__(self, recorder, category, name, args):
+        self.recorder = recorder
+        self.category = category
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.begin = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.recorder.record(self.category, self.name, self.begin, time.perf_counter() - self.begin, self.args)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _EventLoopMonitor:
+    # A timer that should fire every interval seconds.  How late it fires is how long the event loop was blocked.
+    def __init__(self, recorder, interval, stall_threshold):
+        import PyQt5.QtCore as qtc
+
+        self.recorder = recorder
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self._timer = qtc.QTimer()
+        self._timer.setTimerType(qtc.Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._tick)
+        self._last = time.perf_counter()
+        self._timer.start(max(1, int(interval * 1000)))
+
+    def _tick(self):
+        now = time.perf_counter()
+        due = self._last + self.interval
+        lateness = max(0.0, now - due)
+        self._last = now
+        self.recorder.record("event_loop", "latency", due, lateness)
+        if lateness >= self.stall_threshold:
+            self.recorder.record("event_loop", "stall", due, lateness)
+
+    def stop(self):
+        self._timer.stop()
+
+
+_monitor = None
+
+
+def enable(trace=False, max_events=100000, monitor_event_loop=True, interval=.01, stall_threshold=.05):
+    """
+    Start recording, with a new Recorder, which is returned.
+
+    Parameters
+    ----------
+    trace : bool, optional
+        Keep every span, for dump_trace.  Defaults to False.
+    max_events : int, optional
+        The number of spans kept for the trace.  Defaults to 100000.
+    monitor_event_loop : bool, optional
+        If True, the default, and a QApplication exists, the event loop is checked every interval seconds.  How late
+        each check runs is recorded as ("event_loop", "latency"), and checks at least stall_threshold seconds late are
+        also recorded as ("event_loop", "stall").  Must be called from the GUI thread.
+    interval, stall_threshold : float, optional
+        In seconds.  Default to .01 and .05.
+    """
+    global _recorder, _monitor
+    disable()
+    recorder = Recorder(trace, max_events)
+    if monitor_event_loop:
+        import PyQt5.QtCore as qtc
+
+        if qtc.QCoreApplication.instance() is not None:
+            _monitor = _EventLoopMonitor(recorder, interval, stall_threshold)
+    _recorder = recorder
+    return recorder
+
+
+def disable():
+    """
+    Stop recording.  The last recorder can still be queried through the Recorder returned by enable.
+    """
+    global _recorder, _monitor
+    _recorder = None
+    if _monitor is not None:
+        _monitor.stop()
+        _monitor = None
+
+
+def enabled():
+    return _recorder is not None
+
+
+def recorder():
+    """
+    Return the current Recorder, or None if disabled.
+    """
+    return _recorder
+
+
+def span(category, name, **args):
+    """
+    A context manager that records the time spent in its body as a span of category and name, if enabled.  Any
+    keyword arguments are added to the trace event.
+    """
+    recorder = _recorder
+    if recorder is None:
+        return _NULL_SPAN
+    return _Span(recorder, category, name, args)
+
+
+def count(name, amount=1):
+    recorder = _recorder
+    if recorder is not None:
+        recorder.count(name, amount)
+
+
+def instrumented(category, name=None):
+    """
+    Decorate a function or method so that every call is recorded as a span of category and name, if enabled.  The
+    name defaults to the qualified name of the function.
+    """
+    def decorate(function):
+        span_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder
+            if recorder is None:
+                return function(*args, **kwargs)
+            begin = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                recorder.record(category, span_name, begin, time.perf_counter() - begin)
+
+        return wrapper
+
+    return decorate
+
+
+def stats(category=None):
+    """
+    Return the summaries of the current recorder, as for Recorder.stats, or an empty dict if disabled.
+    """
+    recorder = _recorder
+    return recorder.stats(category) if recorder is not None else {}
+
+
+def dump_trace(filename):
+    """
+    Write the trace of the current recorder.  Raises RuntimeError if disabled.
+    """
+    if _recorder is None:
+        raise RuntimeError("instrument: not enabled.")
+    _recorder.dump_trace(filename)
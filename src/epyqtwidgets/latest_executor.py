@@ -0,0 +1,225 @@
+import sys
+import threading
+
+import PyQt5.QtCore as qtc
+
+from epyqtwidgets import instrument
+
+
+class LatestExecutor(qtc.QObject):
+    """
+    Runs an expensive computation in a thread or process pool on behalf of the GUI thread, where newer requests win.
+
+    Each call to submit requests compute(*args, **kwargs).  Up to max_workers computations run at once, and while
+    every worker is busy, only the newest request waits for one: any older request that hadn't started yet is
+    dropped without ever running.  Results come back to the GUI thread, where deliver is called with them, but only
+    while they are newer than any result already delivered, so the display never steps back to a stale value.
+
+    This keeps a slider drag or a stream of settings edits responsive while the computation uses every worker, for
+    example
+
+        executor = LatestExecutor(render, image_widget.set_data, signal=slider.valueChanged)
+
+    where render(value) builds an image for an MplImshowWidget from the position of a DelayedSlider.
+
+    The LatestExecutor must be created in the GUI thread, and submit must be called from it.
+
+    Parameters
+    ----------
+    compute : callable
+        The computation.  Called in a worker with the arguments passed to submit.  For a process pool, it and its
+        arguments and result must be picklable.
+    deliver : callable, optional
+        Called in the GUI thread with each delivered result.
+    executor : str or concurrent.futures.Executor, optional
+        "thread", the default, for a thread pool, or "process" for a process pool, either of which is owned by the
+        LatestExecutor and shut down by close.  Or an existing executor to share, which is left running.
+    max_workers : int, optional
+        The number of computations that may run at once.  Defaults to the number of CPUs, or to the number of
+        workers of a shared executor.
+    intermediate : bool, optional
+        If True, the default, results are delivered as they arrive, as long as they are newer than the last one
+        delivered, so the display follows a drag.
+        If False, only the result of the newest request is delivered, and computations for older requests are
+        cancelled as soon as a newer request is made.
+    cancel_event : bool, optional
+        If True, compute is also passed a threading.Event as the keyword argument cancelled, which is set once its
+        result would be dropped, so that a long computation can check it and stop early.  Only supported for
+        thread pools.  Defaults to False.
+    error : callable, optional
+        Called in the GUI thread as error(exception) when a computation whose result would have been delivered
+        raises.  Defaults to reporting the exception through sys.excepthook.
+    signal : pyqtBoundSignal, optional
+        A signal to connect submit to, like the valueChanged signal of a DelayedSlider.
+    parent : QObject, optional
+        The Qt parent of this object.
+
+    Public Properties
+    -----------------
+    max_workers : int
+    submitted : int
+        The number of calls to submit.
+    started : int
+        The number of computations started.
+    delivered : int
+        The number of results delivered.
+    dropped : int
+        The number of requests superseded before they started, plus the number of results discarded as stale.
+    busy : bool
+        True while any computation is running or waiting for a worker.
+
+    Public Methods
+    --------------
+    submit(*args, **kwargs) :
+        Request compute(*args, **kwargs).
+    submit_on_change(settings, keys=("*",), arguments=None) :
+        Submit whenever one of keys changes in settings, which covers edits made through settings widgets.
+        arguments, if given, is called in the GUI thread to make the arguments, and must return a tuple.
+    cancel() :
+        Drop every request that hasn't been delivered yet.
+    close() :
+        Cancel, unsubscribe from any settings, and shut down an owned executor.
+    """
+    _done = qtc.pyqtSignal(object)
+
+    def __init__(
+        self, compute, deliver=None, executor="thread", max_workers=None, intermediate=True, cancel_event=False,
+        error=None, signal=None, parent=None
+    ):
+        super().__init__(parent)
+        # Imported here, since concurrent.futures takes longer to import than the rest of this package.
+        import concurrent.futures
+
+        self.compute = compute
+        self.deliver = deliver
+        self.error = error
+        self.intermediate = intermediate
+        self.cancel_event = cancel_event
+        self.submitted = 0
+        self.started = 0
+        self.delivered = 0
+        self.dropped = 0
+
+        self._owned = isinstance(executor, str)
+        if executor == "thread":
+            self.max_workers = max_workers or qtc.QThread.idealThreadCount()
+            self._executor = concurrent.futures.ThreadPoolExecutor(self.max_workers, "LatestExecutor")
+        elif executor == "process":
+            if cancel_event:
+                raise ValueError("LatestExecutor: cancel_event is only supported for thread pools.")
+            self.max_workers = max_workers or qtc.QThread.idealThreadCount()
+            self._executor = concurrent.futures.ProcessPoolExecutor(self.max_workers)
+        elif isinstance(executor, concurrent.futures.Executor):
+            self.max_workers = max_workers or getattr(executor, "_max_workers", 1)
+            self._executor = executor
+        else:
+            raise ValueError('LatestExecutor: executor must be "thread", "process" or an Executor.')
+
+        self._generation = 0
+        self._last_delivered = 0
+        # generation: (future, cancel event) for each running computation.
+        self._running = {}
+        self._pending = None
+        self._tokens = []
+        # Queued even within the GUI thread, where cancelling a future that hadn't started calls back straight away.
+        self._done.connect(self._on_done, qtc.Qt.ConnectionType.QueuedConnection)
+        if signal is not None:
+            signal.connect(self.submit)
+
+    @property
+    def busy(self):
+        return bool(self._running) or self._pending is not None
+
+    def submit(self, *args, **kwargs):
+        self._generation += 1
+        self.submitted += 1
+        if self._pending is not None:
+            self.dropped += 1
+        self._pending = (self._generation, args, kwargs)
+        if not self.intermediate:
+            self._cancel_running(self._generation)
+        self._start_pending()
+
+    def submit_on_change(self, settings, keys=("*",), arguments=None):
+        def changed(paths):
+            if arguments is None:
+                self.submit()
+            else:
+                self.submit(*arguments())
+
+        self._tokens += [(settings, settings.subscribe(changed, key)) for key in keys]
+
+    def _start_pending(self):
+        if self._pending is None or len(self._running) >= self.max_workers:
+            return
+        generation, args, kwargs = self._pending
+        self._pending = None
+        event = None
+        if self.cancel_event:
+            event = threading.Event()
+            kwargs = dict(kwargs, cancelled=event)
+        future = self._executor.submit(self.compute, *args, **kwargs)
+        self._running[generation] = (future, event)
+        self.started += 1
+        future.add_done_callback(lambda future: self._emit_done(generation, future))
+
+    def _emit_done(self, generation, future):
+        # Called in a worker, or in the thread that manages a process pool, so the result is passed on to the GUI
+        # thread through a queued signal.
+        try:
+            self._done.emit((generation, future))
+        except RuntimeError:
+            # The LatestExecutor was deleted while this was running.
+            pass
+
+    def _cancel_running(self, newer_than):
+        # Running computations whose results could no longer be delivered are told to stop, if they can.
+        for generation, (future, event) in list(self._running.items()):
+            if generation < newer_than:
+                future.cancel()
+                if event is not None:
+                    event.set()
+
+    def _on_done(self, done):
+        generation, future = done
+        del self._running[generation]
+        if generation > self._last_delivered and (self.intermediate or generation == self._generation) and not (
+            future.cancelled()
+        ):
+            self._last_delivered = generation
+            self._cancel_running(generation)
+            exception = future.exception()
+            if exception is not None:
+                self._report(exception)
+            else:
+                self.delivered += 1
+                if self.deliver is not None:
+                    with instrument.span("callback", "LatestExecutor.deliver"):
+                        self.deliver(future.result())
+        else:
+            self.dropped += 1
+        self._start_pending()
+
+    def _report(self, exception):
+        if self.error is not None:
+            self.error(exception)
+        else:
+            sys.excepthook(type(exception), exception, exception.__traceback__)
+
+    def cancel(self):
+        if self._pending is not None:
+            self.dropped += 1
+            self._pending = None
+        self._cancel_running(self._generation + 1)
+        # Anything still running finishes unseen.
+        self._last_delivered = self._generation
+
+    def close(self):
+        self.cancel()
+        for settings, token in self._tokens:
+            settings.unsubscribe(token)
+        self._tokens = []
+        if self._owned:
+            # cancel already cancelled every future submitted by this that hadn't started, which are the only ones in
+            # an owned executor.  shutdown's cancel_futures would do the same, but needs Python 3.9.
+            self._executor.shutdown(wait=False)
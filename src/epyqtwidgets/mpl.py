@@ -1,10 +1,92 @@
+import copy
+import functools
+import types
+
 import numpy as np
+import PyQt5.QtCore as qtc
 import PyQt5.QtWidgets as qtw
 
-from matplotlib.backends.backend_qt5agg import (
-    FigureCanvasQTAgg as FigureCanvas, NavigationToolbar2QT as NavigationToolbar
-)
-import matplotlib.pyplot as plt
+from epyqtwidgets import instrument
+from epyqtwidgets.contrast import AutoContrast
+from epyqtwidgets.frame_sink import FrameSink
+from epyqtwidgets.timing import FrameRateCounter
+
+
+@functools.lru_cache(maxsize=None)
+def _mpl():
+    # mpl and its Qt backend take a large fraction of a second to import, so they are only
+    # imported when the first widget that needs them is created.
+    from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg, NavigationToolbar2QT
+    from matplotlib.figure import Figure
+    from matplotlib.ticker import NullLocator
+    from matplotlib.transforms import Bbox
+
+    return types.SimpleNamespace(
+        FigureCanvas=FigureCanvasQTAgg,
+        NavigationToolbar=NavigationToolbar2QT,
+        Figure=Figure,
+        NullLocator=NullLocator,
+        Bbox=Bbox
+    )
+
+
+def _new_figure():
+    fig = _mpl().Figure(constrained_layout=True)
+    return fig, _mpl().FigureCanvas(fig)
+
+
+class CanvasPool:
+    """
+    A pool of mpl figures and canvases, so that MPLWidgets which are frequently created and
+    destroyed, like plot tabs, can reuse them instead of allocating new ones each time.
+
+    Pass the pool to each MPLWidget that should use it.  When such a widget is torn down, its
+    figure is cleared and the figure and canvas are returned to the pool.
+
+    Parameters
+    ----------
+    max_size : int, optional
+        The maximum number of idle figures and canvases kept in the pool.  Any more that are
+        released are discarded.  Defaults to 8.
+
+    Public Methods
+    --------------
+    acquire() :
+        Return a (figure, canvas) pair, either an idle one from the pool or a new one.
+    release(fig, canvas) :
+        Clear the figure, and return the pair to the pool.
+    clear() :
+        Discard every idle figure and canvas.
+    """
+    def __init__(self, max_size=8):
+        self.max_size = max_size
+        self._idle = []
+
+    def __len__(self):
+        return len(self._idle)
+
+    def acquire(self):
+        if self._idle:
+            return self._idle.pop()
+        return _new_figure()
+
+    def release(self, fig, canvas):
+        canvas.setParent(None)
+        # Forget every mpl callback the previous owner, and its toolbar, connected.
+        canvas.toolbar = None
+        for cids in list(canvas.callbacks.callbacks.values()):
+            for cid in list(cids):
+                canvas.mpl_disconnect(cid)
+        fig.clear()
+        if len(self._idle) < self.max_size:
+            self._idle.append((fig, canvas))
+        else:
+            canvas.deleteLater()
+
+    def clear(self):
+        for fig, canvas in self._idle:
+            canvas.deleteLater()
+        self._idle.clear()
 
 
 class MPLWidget(qtw.QWidget):
@@ -31,14 +113,20 @@ class MPLWidget(qtw.QWidget):
         If False, the default, draws the plot as normal.
         If True, the canvas will be a blank white square with no axes or anything, ideal
         for drawing.
+    nrows, ncols : int, optional
+        The number of rows and columns of axes in the figure.  Both default to 1.
+    pool : CanvasPool, optional
+        If given, the figure and canvas are taken from this pool, and returned to it when the
+        widget is torn down.
     args and kwargs passed to qtw.QWidget constructor
 
     Public Properties
     -----------------
     fig : mpl figure
         A handle to the generated mpl figure.
-    ax : mpl axes
-        A handle to the generated axes, where you can draw/plot stuff.
+    ax : mpl axes, or array of mpl axes
+        A handle to the generated axes, where you can draw/plot stuff.  If there is more than
+        one, this is an array of axes, exactly as returned by plt.subplots.
     fig_canvas : mpl backend object
         The canvas object that plugs into pyqt.
 
@@ -46,22 +134,38 @@ class MPLWidget(qtw.QWidget):
     --------------
     draw() :
         Draw or redraw the figure.
+    teardown() :
+        Release the figure, and return it and the canvas to the pool if there is one.  This
+        happens automatically when the widget is deleted with deleteLater, or closed with
+        WA_DeleteOnClose set, and the widget must not be drawn to afterwards.
+
+    The figure is not registered with pyplot, so it is freed along with the widget rather than
+    living for the rest of the program.
     """
 
     def __init__(
             self,
             name=None,
             blank=False,
+            nrows=1,
+            ncols=1,
+            pool=None,
     ):
         super().__init__()
-        self.fig, self.ax = plt.subplots(constrained_layout=True)
-        self.fig_canvas = FigureCanvas(self.fig)
+        self._pool = pool
+        self._torn_down = False
+        if pool is None:
+            self.fig, self.fig_canvas = _new_figure()
+        else:
+            self.fig, self.fig_canvas = pool.acquire()
+        self.ax = self.fig.subplots(nrows, ncols)
         if blank:
-            self.ax.set_frame_on(False)
-            self.ax.axes.get_xaxis().set_visible(False)
-            self.ax.axes.get_yaxis().set_visible(False)
-            self.ax.axes.get_xaxis().set_major_locator(plt.NullLocator())
-            self.ax.axes.get_yaxis().set_major_locator(plt.NullLocator())
+            for ax in np.ravel(self.ax):
+                ax.set_frame_on(False)
+                ax.axes.get_xaxis().set_visible(False)
+                ax.axes.get_yaxis().set_visible(False)
+                ax.axes.get_xaxis().set_major_locator(_mpl().NullLocator())
+                ax.axes.get_yaxis().set_major_locator(_mpl().NullLocator())
 
         layout = qtw.QVBoxLayout()
         layout.setContentsMargins(0, 0, 0, 0)
@@ -70,28 +174,561 @@ class MPLWidget(qtw.QWidget):
             label.setSizePolicy(qtw.QSizePolicy.Minimum, qtw.QSizePolicy.Fixed)
             layout.addWidget(label)
         layout.addWidget(self.fig_canvas)
-        layout.addWidget(NavigationToolbar(self.fig_canvas, self))
+        layout.addWidget(_mpl().NavigationToolbar(self.fig_canvas, self))
         self.setLayout(layout)
 
     def draw(self):
-        self.fig_canvas.draw()
+        with instrument.span("draw", type(self).__name__):
+            self.fig_canvas.draw()
+
+    def teardown(self):
+        if self._torn_down:
+            return
+        self._torn_down = True
+        if self._pool is not None:
+            self.layout().removeWidget(self.fig_canvas)
+            self._pool.release(self.fig, self.fig_canvas)
+        else:
+            self.fig.clear()
+
+    def event(self, event):
+        # Children are destroyed before any destructor or destroyed signal of ours runs, so the
+        # canvas has to be rescued for the pool here, while it is still alive.
+        if event.type() == qtc.QEvent.Type.DeferredDelete:
+            self.teardown()
+        return super().event(event)
 
 
 class MplImshowWidget(MPLWidget):
+    """
+    A MPLWidget that displays a single image, which can be rapidly updated with set_data.
+
+    Parameters
+    ----------
+    initial_data : 2D array, optional
+        The image to display before the first call to set_data.  Defaults to a single black
+        pixel.
+    blank : bool, optional
+        Passed to MPLWidget.
+    blit : bool, optional
+        If False, the default, every call to set_data redraws the entire figure.
+        If True, the figure background (axes, ticks, etc) is cached whenever the figure is
+        fully drawn, and set_data only redraws the image on top of it.  The figure is still
+        fully redrawn when it is resized, zoomed or panned, or when the extent of the image
+        changes.  This is much faster for rapidly updating images, like a camera feed.
+    lod : bool, optional
+        If False, the default, the whole image is handed to mpl, which resamples all of it on
+        every draw.
+        If True, a level of detail pyramid of decimated images is built lazily for each frame,
+        and only the part of the level that matches the current view limits and the pixel size
+        of the canvas is displayed.  Finer levels are used as the view is zoomed in with the
+        toolbar, so memory and draw time scale with the size of the canvas rather than the
+        size of the image.  This is intended for images much larger than the screen.
+    contrast : str or AutoContrast, optional
+        How the color limits are chosen for each frame.  May be an AutoContrast, or one of
+        its modes, in which case an AutoContrast with default options is used.  Defaults to
+        "minmax", the full range of each frame.
+    args and kwargs passed to MPLWidget constructor
+
+    Public Properties
+    -----------------
+    plot : mpl AxesImage
+        A handle to the displayed image.
+    contrast : AutoContrast
+        Chooses the color limits.  May be replaced or reconfigured at any time.
+    fps : float
+        The rate at which frames have recently been displayed by set_data.
+    frame_rate : FrameRateCounter
+        The object that measures fps.
+    frame_sink : FrameSink
+        Buffers frames passed to submit_frame, and holds the counts of submitted, rendered and
+        dropped frames.
+
+    Public Methods
+    --------------
+    set_data(data, extent) :
+        Display a new image.  Must be called from the GUI thread.
+    submit_frame(data, extent) :
+        Queue a new image for display.  May be called from any thread, at any rate; only the
+        newest frame is displayed, at most once per display refresh.
+    """
     def __init__(
         self,
         initial_data=None,
         blank=False,
+        blit=False,
+        lod=False,
+        contrast="minmax",
         *args,
         **kwargs
     ):
         super().__init__(blank=blank, *args, **kwargs)
         if initial_data is None:
             initial_data = np.zeros((1, 1))
-        self.plot = self.ax.imshow(initial_data, origin="lower", cmap="gray")
+        self.plot = self.ax.imshow(initial_data, origin="lower", cmap="gray", animated=blit)
+        self.blit = blit
+        self.lod = lod
+        if isinstance(contrast, str):
+            contrast = AutoContrast(contrast)
+        self.contrast = contrast
+        self.frame_rate = FrameRateCounter()
+        self._background = None
+        self._extent = None
+        self._levels = []
+        self._lod_key = None
+        self.frame_sink = FrameSink(self.set_data, retain_frames=lod, parent=self)
+        if blit:
+            self.fig_canvas.mpl_connect("draw_event", self._on_draw)
+        if lod:
+            # The displayed image only covers the view, so it must not drive the view limits.
+            self.ax.set_autoscale_on(False)
+            self.ax.callbacks.connect("xlim_changed", self._update_lod)
+            self.ax.callbacks.connect("ylim_changed", self._update_lod)
+            self.fig_canvas.mpl_connect("resize_event", self._update_lod)
+
+    @property
+    def fps(self):
+        return self.frame_rate.fps
+
+    def set_data(self, data, extent):
+        extent = tuple(extent)
+        new_extent = extent != self._extent
+        self._extent = extent
+        if self.lod:
+            self._levels = [data]
+            self._lod_key = None
+            if new_extent:
+                self.ax.set_xlim(extent[0], extent[1])
+                self.ax.set_ylim(extent[2], extent[3])
+            self._update_lod()
+        else:
+            self.plot.set_data(data)
+            if new_extent:
+                self.plot.set_extent(extent)
+        clim = self.contrast(data)
+        if clim is not None:
+            self.plot.set_clim(*clim)
+
+        if self.blit and self._background is not None and not new_extent:
+            self._blit()
+        else:
+            self.draw()
+        self.frame_rate.tick()
+
+    def submit_frame(self, data, extent):
+        self.frame_sink.submit(data, extent)
+
+    def _level(self, level):
+        # Each level is a strided view of the previous one, so building them is nearly free;
+        # only the cropped part of a level is ever copied, when it is handed to mpl.
+        while len(self._levels) <= level:
+            self._levels.append(self._levels[-1][::2, ::2])
+        return self._levels[level]
+
+    def _update_lod(self, *args):
+        if not self._levels:
+            return
+        rows, cols = self._levels[0].shape[:2]
+        x0, x1, y0, y1 = self._extent
+        dx = (x1 - x0) / cols
+        dy = (y1 - y0) / rows
+
+        def visible_range(limits, origin, step, count):
+            low, high = sorted(((limits[0] - origin) / step, (limits[1] - origin) / step))
+            low = min(max(int(np.floor(low)), 0), count - 1)
+            high = max(min(int(np.ceil(high)), count), low + 1)
+            return low, high
+
+        col_low, col_high = visible_range(self.ax.get_xlim(), x0, dx, cols)
+        row_low, row_high = visible_range(self.ax.get_ylim(), y0, dy, rows)
+
+        # Choose the coarsest level that still has at least one data pixel per screen pixel.
+        bbox = self.ax.bbox
+        oversampling = min(
+            (col_high - col_low) / max(bbox.width, 1), (row_high - row_low) / max(bbox.height, 1)
+        )
+        level = max(int(np.floor(np.log2(oversampling))), 0) if oversampling >= 2 else 0
+        stride = 2 ** level
+        col_low, col_high = col_low // stride, -(-col_high // stride)
+        row_low, row_high = row_low // stride, -(-row_high // stride)
+
+        key = (level, row_low, row_high, col_low, col_high)
+        if key == self._lod_key:
+            return
+        self._lod_key = key
+        self.plot.set_data(self._level(level)[row_low:row_high, col_low:col_high])
+        self.plot.set_extent((
+            x0 + col_low * stride * dx,
+            x0 + col_high * stride * dx,
+            y0 + row_low * stride * dy,
+            y0 + row_high * stride * dy
+        ))
+
+    def _on_draw(self, event):
+        # Called at the end of every full draw, including those triggered by resizing or by the
+        # toolbar, so the cached background always matches what is on screen.
+        self._background = self.fig_canvas.copy_from_bbox(self.fig.bbox)
+        self.ax.draw_artist(self.plot)
+
+    def _blit(self):
+        with instrument.span("draw", "MplImshowWidget.blit"):
+            self.fig_canvas.restore_region(self._background)
+            self.ax.draw_artist(self.plot)
+            self.fig_canvas.blit(self.fig.bbox)
+
+
+class MplImagePanel:
+    """
+    One image panel of a MplImageGrid.  Panels are created by the grid, not directly.
+
+    Public Properties
+    -----------------
+    ax : mpl axes
+        The axes the panel draws into.
+    plot : mpl AxesImage
+        A handle to the displayed image.
+    contrast : AutoContrast
+        Chooses the color limits for this panel.  May be replaced or reconfigured at any time.
+
+    Public Methods
+    --------------
+    set_data(data, extent) :
+        Display a new image in this panel.  The panel is redrawn along with every other panel
+        that changed, the next time the event loop runs.
+    """
+    def __init__(self, grid, ax, contrast):
+        self.grid = grid
+        self.ax = ax
+        self.plot = ax.imshow(np.zeros((1, 1)), origin="lower", cmap="gray", animated=grid.blit)
+        if isinstance(contrast, str):
+            contrast = AutoContrast(contrast)
+        self.contrast = contrast
+        self._extent = None
+        self._background = None
 
     def set_data(self, data, extent):
         self.plot.set_data(data)
-        self.plot.set_extent(extent)
-        self.plot.set_clim(np.min(data), np.max(data))
-        self.draw()
\ No newline at end of file
+        clim = self.contrast(data)
+        if clim is not None:
+            self.plot.set_clim(*clim)
+        extent = tuple(extent)
+        if extent != self._extent:
+            self._extent = extent
+            self.plot.set_extent(extent)
+            self.grid._full_draw_needed = True
+        self.grid._mark_dirty(self)
+
+
+class MplImageGrid(MPLWidget):
+    """
+    A MPLWidget that displays a grid of images in a single figure, canvas and toolbar.  This
+    is much lighter than many separate MplImshowWidgets, which each own a figure, canvas,
+    toolbar and layout solver.
+
+    Panels are updated individually with set_data, but redrawn together: every panel that
+    changed is redrawn once, the next time the event loop runs.  When blitting, only the
+    changed images are redrawn, over a cached background.
+
+    Parameters
+    ----------
+    nrows, ncols : int, optional
+        The shape of the grid of panels.  Both default to 1.
+    blit : bool, optional
+        If True, the default, only the images of changed panels are redrawn, over a background
+        that is cached whenever the figure is fully drawn.  The figure is still fully redrawn
+        when it is resized, zoomed or panned, or when the extent of an image changes.
+        If False, the whole figure is redrawn.
+    contrast : str or AutoContrast, optional
+        Passed to each panel.  A single AutoContrast must not be shared between panels, so if
+        an AutoContrast is given it is only used by the first panel, and the others get a copy
+        of it, with the same configuration.  Defaults to "minmax".
+    blank : bool, optional
+        Passed to MPLWidget.
+    args and kwargs passed to MPLWidget constructor
+
+    Public Properties
+    -----------------
+    panels : list of MplImagePanel
+        The panels, in row major order.
+    fps : float
+        The rate at which the grid has recently been redrawn.
+    frame_rate : FrameRateCounter
+        The object that measures fps.
+
+    Public Methods
+    --------------
+    set_data(index, data, extent) :
+        Display a new image in the panel at index, which is either a position in panels or a
+        (row, column) pair.
+    redraw() :
+        Immediately redraw every panel that changed.
+    """
+    def __init__(
+        self,
+        nrows=1,
+        ncols=1,
+        blit=True,
+        contrast="minmax",
+        blank=False,
+        *args,
+        **kwargs
+    ):
+        super().__init__(blank=blank, nrows=nrows, ncols=ncols, *args, **kwargs)
+        self.nrows = nrows
+        self.ncols = ncols
+        self.blit = blit
+        self.frame_rate = FrameRateCounter()
+        self._dirty = {}
+        self._full_draw_needed = True
+        self._redraw_pending = False
+
+        self.panels = []
+        for ax in np.ravel(self.ax):
+            if self.panels and not isinstance(contrast, str):
+                # A copy keeps the configuration, like clim, interval and percentiles, and not just the mode.
+                contrast = copy.copy(contrast)
+            self.panels.append(MplImagePanel(self, ax, contrast))
+        if blit:
+            self.fig_canvas.mpl_connect("draw_event", self._on_draw)
+
+    @property
+    def fps(self):
+        return self.frame_rate.fps
+
+    def set_data(self, index, data, extent):
+        if isinstance(index, tuple):
+            row, column = index
+            index = row * self.ncols + column
+        self.panels[index].set_data(data, extent)
+
+    def redraw(self):
+        self._redraw_pending = False
+        dirty = list(self._dirty)
+        self._dirty.clear()
+        if not dirty:
+            return
+        if not self.blit or self._full_draw_needed or any(p._background is None for p in dirty):
+            self.draw()
+        else:
+            with instrument.span("draw", "MplImageGrid.blit"):
+                for panel in dirty:
+                    self.fig_canvas.restore_region(panel._background)
+                    panel.ax.draw_artist(panel.plot)
+                self.fig_canvas.blit(_mpl().Bbox.union([panel.ax.bbox for panel in dirty]))
+        self.frame_rate.tick()
+
+    def draw(self):
+        self._full_draw_needed = False
+        super().draw()
+
+    def _mark_dirty(self, panel):
+        self._dirty[panel] = None
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            qtc.QTimer.singleShot(0, self.redraw)
+
+    def _on_draw(self, event):
+        for panel in self.panels:
+            panel._background = self.fig_canvas.copy_from_bbox(panel.ax.bbox)
+        for panel in self.panels:
+            panel.ax.draw_artist(panel.plot)
+
+
+class MplStreamWidget(MPLWidget):
+    """
+    A MPLWidget that plots live time series with very long histories.
+
+    Each channel keeps its most recent samples in a preallocated ring buffer.  Rather than
+    handing every sample to mpl, each pixel column of the visible part of the plot is reduced
+    to the min and max of the samples that fall in it, so only about twice as many vertices as
+    the canvas is wide are drawn per line, no matter how long the history is.  Redraws are
+    coalesced to at most one per pass through the event loop, and when blitting only the lines
+    are redrawn over a cached background.
+
+    The x axis is time relative to the newest sample, so it does not scroll as data arrives.
+
+    Parameters
+    ----------
+    channels : int, optional
+        The number of traces.  Defaults to 1.
+    capacity : int, optional
+        The number of most recent samples kept for each channel.  Defaults to 1,000,000.
+    sample_interval : float, optional
+        The time between samples, which sets the scale of the x axis.  Defaults to 1.
+    ylim : 2-tuple of floats, optional
+        Fixed limits for the y axis.  Defaults to None, in which case the y limits grow as
+        needed to fit the data.
+    blit : bool, optional
+        If True, the default, only the lines are redrawn when data is appended, over a
+        background that is cached whenever the figure is fully drawn.
+        If False, the entire figure is redrawn.
+    args and kwargs passed to MPLWidget constructor
+
+    Public Properties
+    -----------------
+    lines : list of mpl Line2D
+        The line for each channel.  Hiding a line with set_visible(False) also skips its
+        decimation.
+    sample_count : int
+        The total number of samples appended to each channel.
+    fps : float
+        The rate at which the plot has recently been redrawn.
+    frame_rate : FrameRateCounter
+        The object that measures fps.
+
+    Public Methods
+    --------------
+    append(samples) :
+        Add samples to the end of every channel.  samples must have shape (channels, n), or
+        shape (n,) if there is only one channel.
+    clear() :
+        Discard all samples.
+    redraw() :
+        Immediately redraw the plot with the current data.
+    """
+    def __init__(
+        self,
+        channels=1,
+        capacity=1000000,
+        sample_interval=1.0,
+        ylim=None,
+        blit=True,
+        *args,
+        **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.channels = channels
+        self.capacity = capacity
+        self.sample_interval = sample_interval
+        self.blit = blit
+        self.frame_rate = FrameRateCounter()
+        self.sample_count = 0
+
+        # Every sample is written twice, capacity apart, so that the most recent capacity
+        # samples are always available as one contiguous view, without unrolling the ring.
+        self._buffer = np.zeros((channels, 2 * capacity))
+        self._autoscale_y = ylim is None
+        self._background = None
+        self._redraw_pending = False
+
+        self.lines = [self.ax.plot([], [], animated=blit)[0] for _ in range(channels)]
+        self.ax.set_xlim(-(capacity - 1) * sample_interval, 0)
+        self.ax.set_ylim(ylim or (-1, 1))
+
+        if blit:
+            self.fig_canvas.mpl_connect("draw_event", self._on_draw)
+        self.fig_canvas.mpl_connect("resize_event", self._update_lines)
+        self.ax.callbacks.connect("xlim_changed", self._update_lines)
+
+    @property
+    def fps(self):
+        return self.frame_rate.fps
+
+    def append(self, samples):
+        samples = np.asarray(samples, dtype=self._buffer.dtype)
+        if samples.ndim == 1:
+            samples = samples[np.newaxis]
+        if samples.shape[0] != self.channels:
+            raise ValueError(
+                f"MplStreamWidget: samples must have shape ({self.channels}, n), "
+                f"got {samples.shape}."
+            )
+        count = samples.shape[1]
+        if count == 0:
+            return
+        if count > self.capacity:
+            self.sample_count += count - self.capacity
+            samples = samples[:, -self.capacity:]
+            count = self.capacity
+
+        position = self.sample_count % self.capacity
+        first = min(count, self.capacity - position)
+        for offset in (0, self.capacity):
+            self._buffer[:, offset + position:offset + position + first] = samples[:, :first]
+            self._buffer[:, offset:offset + count - first] = samples[:, first:]
+        self.sample_count += count
+
+        if self._autoscale_y:
+            low, high = np.nanmin(samples), np.nanmax(samples)
+            y_low, y_high = self.ax.get_ylim()
+            if low < y_low or high > y_high:
+                low, high = min(low, y_low), max(high, y_high)
+                margin = .05 * (high - low)
+                self.ax.set_ylim(low - margin, high + margin)
+                self._background = None
+
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            qtc.QTimer.singleShot(0, self.redraw)
+
+    def clear(self):
+        self.sample_count = 0
+        self.redraw()
+
+    def redraw(self):
+        self._redraw_pending = False
+        self._update_lines()
+        if self.blit and self._background is not None:
+            with instrument.span("draw", "MplStreamWidget.blit"):
+                self.fig_canvas.restore_region(self._background)
+                for line in self.lines:
+                    self.ax.draw_artist(line)
+                self.fig_canvas.blit(self.ax.bbox)
+        else:
+            self.draw()
+        self.frame_rate.tick()
+
+    def _window(self):
+        # The most recent samples, oldest first, as a view into the buffer.
+        count = min(self.sample_count, self.capacity)
+        end = self.sample_count % self.capacity + self.capacity
+        return self._buffer[:, end - count:end]
+
+    def _update_lines(self, *args):
+        window = self._window()
+        count = window.shape[1]
+
+        # Index range of the samples inside the current x limits.
+        x_low, x_high = sorted(self.ax.get_xlim())
+        start = min(max(int(np.floor(count - 1 + x_low / self.sample_interval)), 0), count)
+        stop = max(min(int(np.ceil(count + x_high / self.sample_interval)), count), start)
+        visible = stop - start
+
+        columns = max(int(self.ax.bbox.width), 1)
+        if visible <= 2 * columns:
+            x = (np.arange(start, stop) - (count - 1)) * self.sample_interval
+            per_column = 0
+        else:
+            # Each column is drawn as a separate vertical segment, separated by NaNs.  Agg
+            # strokes one long zigzag through every column far more slowly than it strokes the
+            # disjoint segments.
+            per_column = visible // columns
+            start = stop - per_column * columns
+            centers = np.arange(start, stop, per_column) + (per_column - 1) / 2
+            x = np.repeat((centers - (count - 1)) * self.sample_interval, 3)
+            x[2::3] = np.nan
+
+        for line, trace in zip(self.lines, window):
+            if not line.get_visible():
+                continue
+            trace = trace[start:stop]
+            if per_column:
+                blocks = trace.reshape(columns, per_column)
+                low = blocks.min(axis=1)
+                high = blocks.max(axis=1)
+                # Stretch each segment to reach the last sample of the previous column, so
+                # that neighbouring segments connect just like the full trace would.
+                np.minimum(low[1:], blocks[:-1, -1], out=low[1:])
+                np.maximum(high[1:], blocks[:-1, -1], out=high[1:])
+                y = np.empty(3 * columns)
+                y[0::3] = low
+                y[1::3] = high
+                y[2::3] = np.nan
+            else:
+                y = trace.copy()
+            line.set_data(x, y)
+
+    def _on_draw(self, event):
+        self._background = self.fig_canvas.copy_from_bbox(self.ax.bbox)
+        for line in self.lines:
+            self.ax.draw_artist(line)
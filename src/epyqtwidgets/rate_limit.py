@@ -0,0 +1,184 @@
+import math
+import time
+
+import PyQt5.QtCore as qtc
+
+# Timers may fire up to this early, in seconds, and still count as on time.
+_TOLERANCE = .001
+
+
+class RateLimiter(qtc.QObject):
+    """
+    Limits the rate at which callbacks are called in response to a signal, or to any other stream of calls, so that
+    expensive work downstream of a slider drag or of typing runs at a bounded rate.
+
+    Calls are coalesced: when the callbacks run, they are passed the arguments of the most recent call.
+
+    Parameters
+    ----------
+    signal : pyqtBoundSignal, optional
+        A signal to connect to.  The limiter may also be called directly, like a slot.
+    mode : str, optional
+        "debounce", the default, waits until calls have stopped for wait seconds.
+        "throttle" runs at most once every wait seconds while calls continue.
+    wait : float, optional
+        In seconds.  Defaults to .05.
+    leading : bool, optional
+        Run on the first call of a burst, straight away.  Defaults to False.
+    trailing : bool, optional
+        Run at the end of a burst (or of each throttle interval) with the latest arguments, if there were any calls
+        since the last run.  Defaults to True.
+    max_wait : float, optional
+        In debounce mode, the longest time, in seconds, that a burst of calls may delay the callbacks.  Defaults to
+        None, unlimited.  Throttle mode is debounce with max_wait equal to wait.
+    callback : callable or list of callables, optional
+        Connected straight away.
+    parent : QObject, optional
+        The Qt parent of this object, which keeps it alive.
+
+    Public Properties
+    -----------------
+    pending : bool
+        True if there were calls that the callbacks haven't yet been run for.
+    call_count : int
+        The number of calls received.
+    run_count : int
+        The number of times the callbacks were run.
+
+    Public Methods
+    --------------
+    connect(callback) :
+        Call callback(*args) with the latest arguments whenever the limiter runs.
+    disconnect(callback=None) :
+        Remove callback, or every callback.
+    flush() :
+        Run now if there are pending calls.
+    cancel() :
+        Forget any pending calls.
+    """
+    MODES = ("debounce", "throttle")
+
+    def __init__(
+        self, signal=None, mode="debounce", wait=.05, leading=False, trailing=True, max_wait=None, callback=None,
+        parent=None
+    ):
+        super().__init__(parent)
+        if mode not in self.MODES:
+            raise ValueError(f"RateLimiter: mode must be one of {self.MODES}.")
+        self.mode = mode
+        self.wait = wait
+        self.leading = leading
+        self.trailing = trailing
+        self.max_wait = wait if mode == "throttle" else max_wait
+        self.pending = False
+        self.call_count = 0
+        self.run_count = 0
+
+        self._callbacks = []
+        self._args = ()
+        self._burst_start = None
+        self._last_call = -math.inf
+        self._last_run = -math.inf
+        self._timer = qtc.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._on_timeout)
+
+        if callback is not None:
+            try:
+                for each in callback:
+                    self.connect(each)
+            except TypeError:
+                self.connect(callback)
+        if signal is not None:
+            signal.connect(self)
+
+    def connect(self, callback):
+        self._callbacks.append(callback)
+
+    def disconnect(self, callback=None):
+        if callback is None:
+            self._callbacks.clear()
+        else:
+            self._callbacks.remove(callback)
+
+    def __call__(self, *args):
+        now = time.monotonic()
+        self.call_count += 1
+        self._args = args
+        self._last_call = now
+        if self._burst_start is None:
+            if self.leading and now - self._last_run >= self.wait:
+                self._burst_start = now
+                self._run(now)
+            else:
+                self.pending = True
+                self._burst_start = now
+                if self.mode == "throttle" and now - self._last_run < self.wait:
+                    # Right after a run, a throttle waits out the rest of its interval before running again.
+                    self._burst_start = self._last_run
+        else:
+            self.pending = True
+        self._schedule(now)
+
+    def _deadline(self):
+        deadline = self._last_call + self.wait
+        if self.max_wait is not None:
+            deadline = min(deadline, self._burst_start + self.max_wait)
+        return deadline
+
+    def _schedule(self, now):
+        # A debounce postpones its timer with every call, a throttle doesn't.
+        if self._timer.isActive() and self.mode == "throttle":
+            return
+        self._timer.start(max(0, int(math.ceil((self._deadline() - now) * 1000))))
+
+    def _on_timeout(self):
+        now = time.monotonic()
+        deadline = self._deadline()
+        if now < deadline - _TOLERANCE:
+            self._timer.start(int(math.ceil((deadline - now) * 1000)))
+            return
+        if self.pending and self.trailing:
+            self._run(now)
+        if now >= self._last_call + self.wait - _TOLERANCE:
+            # Calls have stopped, so the burst is over.
+            self._burst_start = None
+            self.pending = False
+        else:
+            # Still going, past max_wait: start the next interval, on whose leading edge any calls that weren't run
+            # on the trailing edge of the last are run.
+            self._burst_start = now
+            if self.pending and self.leading:
+                self._run(now)
+            self._timer.start(max(0, int(math.ceil((self._deadline() - now) * 1000))))
+
+    def _run(self, now):
+        self.pending = False
+        self._last_run = now
+        self.run_count += 1
+        args = self._args
+        for callback in list(self._callbacks):
+            callback(*args)
+
+    def flush(self):
+        if self.pending:
+            self._timer.stop()
+            self._run(time.monotonic())
+            self._burst_start = None
+
+    def cancel(self):
+        self._timer.stop()
+        self.pending = False
+        self._burst_start = None
+
+
+def make_rate_limiter(rate_limit, parent=None):
+    """
+    Build a RateLimiter from the rate_limit option of a widget: None for no limiter, a number for a debounce of that
+    many seconds, a dict of RateLimiter keyword arguments, or a RateLimiter, which is used as is.
+    """
+    if rate_limit is None or isinstance(rate_limit, RateLimiter):
+        return rate_limit
+    if isinstance(rate_limit, dict):
+        return RateLimiter(parent=parent, **rate_limit)
+    return RateLimiter(wait=rate_limit, parent=parent)
@@ -1,6 +1,9 @@
 import PyQt5.QtCore as qtc
 import PyQt5.QtWidgets as qtw
 
+from epyqtwidgets import instrument
+from epyqtwidgets.rate_limit import RateLimiter
+
 
 class HumbleSlider(qtw.QSlider):
     def __init__(self, *args):
@@ -23,24 +26,45 @@ class HumbleSlider(qtw.QSlider):
 
 
 class DelayedSlider(HumbleSlider):
-    def __init__(self, orientation=qtc.Qt.Orientation.Horizontal, time_delay=.05):
-        super().__init__(orientation)
+    """
+    A HumbleSlider whose valueChanged signal is rate limited, so that slots doing expensive work aren't called for
+    every step of a drag.
 
-        self._time_delay_ms = int(time_delay * 1000)
-        self._has_time_deferred_call = False
-        self._timer = qtc.QTimer()
+    By default, valueChanged is emitted time_delay seconds after the first change, with the value at that time, and
+    at most once every time_delay seconds while the slider keeps moving.  The remaining arguments select other
+    behaviors, as described for RateLimiter.
 
-        self.valueChanged.connect(self._emit_value_changed)
-        self.valueChanged = DelayedSliderValueChanged()
+    Parameters
+    ----------
+    orientation : Qt.Orientation, optional
+    time_delay : float, optional
+        In seconds.  Defaults to .05.
+    mode : str, optional
+        "throttle", the default, or "debounce".
+    leading : bool, optional
+        Emit on the first change straight away.  Defaults to False.
+    max_wait : float, optional
+        In debounce mode, the longest a drag may delay valueChanged.
 
-    def _emit_value_changed(self):
-        if not self._has_time_deferred_call:
-            self._has_time_deferred_call = True
-            self._timer.singleShot(self._time_delay_ms, self._emit_timed_value_changed)
+    Public Properties
+    -----------------
+    rate_limiter : RateLimiter
+        Rate limits valueChanged, and holds the counts of changes and emissions.
+    """
+    def __init__(
+        self, orientation=qtc.Qt.Orientation.Horizontal, time_delay=.05, mode="throttle", leading=False,
+        max_wait=None
+    ):
+        super().__init__(orientation)
+        self.rate_limiter = RateLimiter(
+            self.valueChanged, mode, time_delay, leading=leading, max_wait=max_wait,
+            callback=self._emit, parent=self
+        )
+        self.valueChanged = DelayedSliderValueChanged()
 
-    def _emit_timed_value_changed(self):
-        self._has_time_deferred_call = False
-        self.valueChanged.sig.emit(self.value())
+    def _emit(self, *args):
+        with instrument.span("slider", "DelayedSlider.valueChanged"):
+            self.valueChanged.sig.emit(self.value())
 
 
 class DelayedSliderValueChanged(qtc.QObject):
@@ -0,0 +1,49 @@
+import collections
+import time
+
+
+class FrameRateCounter:
+    """
+    Measures the rate at which frames are delivered to a display widget, averaged over a sliding
+    window of the most recent frames.
+
+    Parameters
+    ----------
+    window : int, optional
+        The number of recent frames to average over.  Defaults to 60.
+
+    Public Properties
+    -----------------
+    fps : float
+        The achieved frame rate over the window, in frames per second.  Zero until at least two
+        frames have been recorded.
+    frame_count : int
+        The total number of frames recorded since creation or the last reset.
+
+    Public Methods
+    --------------
+    tick() :
+        Record that a frame was just displayed.
+    reset() :
+        Forget all recorded frames.
+    """
+    def __init__(self, window=60):
+        self._times = collections.deque(maxlen=window)
+        self.frame_count = 0
+
+    def tick(self):
+        self._times.append(time.perf_counter())
+        self.frame_count += 1
+
+    def reset(self):
+        self._times.clear()
+        self.frame_count = 0
+
+    @property
+    def fps(self):
+        if len(self._times) < 2:
+            return 0.0
+        elapsed = self._times[-1] - self._times[0]
+        if elapsed <= 0:
+            return 0.0
+        return (len(self._times) - 1) / elapsed
@@ -0,0 +1,15 @@
+import os
+import pathlib
+import sys
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "src"))
+
+import PyQt5.QtWidgets as qtw  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    return qtw.QApplication.instance() or qtw.QApplication([])
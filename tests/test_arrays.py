@@ -0,0 +1,81 @@
+import os
+
+import numpy as np
+import pytest
+
+from epyqtsettings.settings import Settings
+
+
+def _array_files(filename):
+    directory = filename + ".arrays"
+    return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+
+@pytest.mark.parametrize("suffix", [".pkl", ".json"])
+def test_large_arrays_round_trip_through_files(tmp_path, suffix):
+    filename = str(tmp_path / f"settings{suffix}")
+    settings = Settings(filename, large=np.arange(1024.0), small=np.arange(4.0), nested={"table": np.ones((32, 32))})
+    settings.upconvert_dicts()
+    settings.enable_array_files(min_bytes=1024)
+    settings.save()
+    assert len(_array_files(filename)) == 2
+
+    loaded = Settings(filename)
+    assert isinstance(loaded.large, np.memmap)
+    assert not loaded.large.flags.writeable
+    assert np.array_equal(loaded.large, np.arange(1024.0))
+    assert np.array_equal(loaded.nested.table, np.ones((32, 32)))
+    assert not isinstance(loaded.small, np.memmap)
+
+
+@pytest.mark.parametrize("suffix", [".pkl", ".json"])
+def test_only_changed_arrays_are_written(tmp_path, suffix):
+    filename = str(tmp_path / f"settings{suffix}")
+    settings = Settings(filename, a=np.zeros(1024), b=np.zeros(1024), value=0)
+    settings.enable_array_files(min_bytes=1024)
+    settings.save()
+    files = _array_files(filename)
+
+    settings.value = 1
+    settings.save()
+    assert _array_files(filename) == files
+
+    settings.a = np.ones(1024)
+    settings.b[0] = 5
+    settings.mark_changed("b")
+    settings.save()
+    if suffix == ".json":
+        # A journal append leaves the old files, which the snapshot still refers to, until the next compaction.
+        settings._ensure_journal().compact(settings, filename, settings._arrays)
+    new_files = _array_files(filename)
+    assert len(new_files) == 2 and not set(new_files) & set(files)
+
+    loaded = Settings(filename)
+    assert (loaded.value, loaded.a[0], loaded.b[0]) == (1, 1, 5)
+
+
+def test_reload_keeps_loaded_arrays(tmp_path):
+    filename = str(tmp_path / "settings.pkl")
+    settings = Settings(filename, table=np.zeros(1024), value=0)
+    settings.enable_array_files(min_bytes=1024)
+    settings.save()
+    loaded = Settings(filename)
+    table = loaded.table
+
+    settings.value = 1
+    settings.save()
+    assert loaded.reload(filename) == {"value"}
+    assert loaded.table is table
+
+
+def test_disable_array_files(tmp_path):
+    filename = str(tmp_path / "settings.pkl")
+    settings = Settings(filename, table=np.zeros(1024))
+    settings.enable_array_files(min_bytes=1024)
+    settings.save()
+    settings.disable_array_files()
+    settings.save()
+
+    loaded = Settings(filename)
+    assert not isinstance(loaded.table, np.memmap)
+    assert np.array_equal(loaded.table, np.zeros(1024))
@@ -0,0 +1,59 @@
+import os
+import pickle
+import subprocess
+import sys
+import textwrap
+
+from epyqtsettings.settings import Settings
+
+
+def _run(tmp_path, body):
+    # Runs body in a new interpreter, with settings autosaving to a file, and returns what the file holds afterwards.
+    filename = str(tmp_path / "settings.pkl")
+    code = textwrap.dedent(f"""
+        from epyqtsettings.settings import Settings
+        settings = Settings({filename!r}, value=0)
+        settings.save()
+        settings.enable_autosave(delay=60)
+        settings.value = 1
+    """) + textwrap.dedent(body)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    subprocess.run([sys.executable, "-c", code], env=env, check=True, timeout=30)
+    with open(filename, "rb") as inFile:
+        return pickle.load(inFile)
+
+
+def test_pending_change_is_written_at_exit(tmp_path):
+    assert _run(tmp_path, "")["value"] == 1
+
+
+def test_pending_change_is_written_when_the_application_quits(tmp_path):
+    # os._exit skips atexit, so only aboutToQuit can have written the change.
+    data = _run(tmp_path, """
+        import os
+        import PyQt5.QtCore as qtc
+        application = qtc.QCoreApplication.instance() or qtc.QCoreApplication([])
+        settings.disable_autosave(flush=False)
+        settings.enable_autosave(delay=60)
+        settings.value = 2
+        qtc.QTimer.singleShot(0, application.quit)
+        application.exec_()
+        os._exit(0)
+    """)
+    assert data["value"] == 2
+
+
+def test_exit_handler_flushes(tmp_path):
+    filename = str(tmp_path / "settings.pkl")
+    settings = Settings(filename, value=0)
+    settings.enable_autosave(delay=60)
+    settings.value = 1
+    autosaver = settings.autosaver
+    autosaver._at_exit()
+
+    with open(filename, "rb") as inFile:
+        assert pickle.load(inFile)["value"] == 1
+    assert autosaver.write_count == 1
+    # Stopped, and no longer registered to be stopped at exit.
+    assert not autosaver._thread.is_alive()
+    assert autosaver._application is None
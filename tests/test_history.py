@@ -0,0 +1,107 @@
+import numpy as np
+
+from epyqtsettings.history import SettingsHistory
+from epyqtsettings.settings import Settings
+
+
+def _settings(**kwargs):
+    settings = Settings(**kwargs)
+    settings.upconvert_dicts()
+    return settings
+
+
+def test_undo_redo():
+    settings = _settings(a=1, nested={"b": 1})
+    history = SettingsHistory(settings)
+    settings.a = 2
+    settings.flush_notifications()
+    with settings.batch():
+        settings.a = 3
+        settings.nested.b = 2
+    settings.flush_notifications()
+
+    assert history.undo()
+    assert (settings.a, settings.nested.b) == (2, 1)
+    assert history.undo()
+    assert (settings.a, settings.nested.b) == (1, 1)
+    assert not history.undo()
+    assert history.redo()
+    assert history.redo()
+    assert (settings.a, settings.nested.b) == (3, 2)
+    assert not history.redo()
+
+
+def test_new_change_truncates_redo():
+    settings = _settings(a=1)
+    history = SettingsHistory(settings)
+    for value in (2, 3):
+        settings.a = value
+        settings.flush_notifications()
+    history.undo()
+    history.undo()
+    settings.a = 4
+    settings.flush_notifications()
+
+    assert not history.can_redo
+    assert len(history._versions) == 2
+    assert history.undo()
+    assert settings.a == 1
+    assert history.redo()
+    assert settings.a == 4
+
+
+def test_versions_share_unchanged_values():
+    settings = _settings(table=np.zeros(1 << 16), **{f"key_{i}": i for i in range(200)})
+    history = SettingsHistory(settings)
+    settings.key_5 = -1
+    settings.flush_notifications()
+
+    first, second = history._versions
+    assert first.get("table") is second.get("table")
+    assert list(second.changed_items(first)) == [("key_5", -1)]
+    # Only the path to the changed key was copied.
+    shared = sum(a is b for a, b in zip(first._root, second._root))
+    assert shared == len(first._root) - 1
+
+
+def test_history_copies_values():
+    settings = _settings(values=[1, 2])
+    history = SettingsHistory(settings)
+    settings.values.append(3)
+    settings.mark_changed("values")
+    settings.flush_notifications()
+
+    assert history.undo()
+    assert settings.values == [1, 2]
+    settings.values.append(4)
+    assert history._versions[0].get("values") == [1, 2]
+
+
+def test_restore():
+    settings = _settings(a=1, b=1)
+    history = SettingsHistory(settings)
+    history.snapshot("start")
+    settings.update({"a": 2, "b": 2})
+    settings.flush_notifications()
+
+    history.restore("start")
+    assert (settings.a, settings.b) == (1, 1)
+    assert len(history._versions) == 3
+    assert history.undo()
+    assert (settings.a, settings.b) == (2, 2)
+
+
+def test_restore_without_changes_adds_no_version():
+    settings = _settings(a=1)
+    history = SettingsHistory(settings)
+    history.snapshot("start")
+    settings.a = 2
+    settings.flush_notifications()
+    settings.a = 1
+    settings.flush_notifications()
+    count = len(history._versions)
+
+    history.restore("start")
+    assert len(history._versions) == count
+    assert history.undo()
+    assert settings.a == 2
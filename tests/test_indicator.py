@@ -0,0 +1,42 @@
+import pytest
+
+import PyQt5.QtGui as qtg
+
+from epyqtwidgets.indicator import Indicator
+from epyqtwidgets.indicator_bank import IndicatorBank
+
+
+def _window_color(indicator):
+    return indicator.palette().color(qtg.QPalette.ColorRole.Window)
+
+
+@pytest.mark.parametrize("color, expected", [
+    ("red", qtg.QColor(255, 0, 0)),
+    ("#00ff00", qtg.QColor(0, 255, 0)),
+    ((0, 0, 255), qtg.QColor(0, 0, 255)),
+    ("rgb(255, 0, 0)", qtg.QColor(255, 0, 0)),
+    ("RGB(100%, 50%, 0%)", qtg.QColor(255, 128, 0)),
+    ("rgba(255, 0, 0, 128)", qtg.QColor(255, 0, 0, 128)),
+    ("rgba(255, 0, 0, 0.5)", qtg.QColor(255, 0, 0, 128)),
+    ("hsv(120, 255, 255)", qtg.QColor.fromHsv(120, 255, 255)),
+    ("hsla(240, 100%, 50%, 100%)", qtg.QColor.fromHsl(240, 255, 128, 255)),
+])
+def test_colors(qapp, color, expected):
+    indicator = Indicator(color)
+    assert _window_color(indicator) == expected
+
+
+@pytest.mark.parametrize("color", ["rgb(255, 0)", "rgb(300, 0, 0)", "rgb(a, b, c)", "not a color", (0, 0, 300)])
+def test_invalid_colors(qapp, color):
+    indicator = Indicator("red")
+    with pytest.raises(ValueError):
+        indicator.set_color(color)
+    assert _window_color(indicator) == qtg.QColor(255, 0, 0)
+
+
+def test_bank_colors(qapp):
+    bank = IndicatorBank(1, 2, colors=("black", "rgb(255, 0, 0)"))
+    bank.set_states([[0, 1]])
+    assert bank.cell_colors[0, 1] == qtg.QColor(255, 0, 0).rgba()
+    with pytest.raises(ValueError):
+        bank.set_state_colors(("black", "rgb(255, 0)"))
@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+import types
+
+import numpy as np
+
+from epyqtsettings.settings import Settings
+from epyqtsettings.settings_widgets import SettingsCheckBox, SettingsComboBox
+from epyqtwidgets import instrument
+
+
+def test_settings_do_not_import_epyqtwidgets():
+    code = "import sys, epyqtsettings.settings; print('epyqtwidgets' in sys.modules)"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "False"
+
+
+def test_settings_io_is_recorded(tmp_path):
+    recorder = instrument.enable(monitor_event_loop=False)
+    try:
+        settings = Settings(a=1)
+        settings.save(str(tmp_path / "settings.pkl"))
+        settings.load(str(tmp_path / "settings.pkl"))
+        stats = recorder.stats("settings_io")
+    finally:
+        instrument.disable()
+    assert stats[("settings_io", "save")]["count"] == 1
+    assert stats[("settings_io", "load")]["count"] == 1
+
+
+def test_each_frame_is_one_draw(qapp):
+    from epyqtwidgets.mpl import MplImshowWidget
+
+    widget = MplImshowWidget(np.zeros((8, 8)))
+    recorder = instrument.enable(monitor_event_loop=False)
+    try:
+        for _ in range(3):
+            widget.set_data(np.random.random((8, 8)), (0, 8, 0, 8))
+        stats = recorder.stats("draw")
+    finally:
+        instrument.disable()
+        widget.deleteLater()
+    assert sum(summary["count"] for summary in stats.values()) == 3
+
+
+def test_combo_and_check_box_callbacks_are_recorded(qapp):
+    settings = Settings(mode="a", flag=False)
+    received = []
+    combo = SettingsComboBox(types.SimpleNamespace(settings=settings), "mode", "mode", ["a", "b"], received.append)
+    check = SettingsCheckBox(settings, "flag", "flag", [received.append, received.append])
+    recorder = instrument.enable(monitor_event_loop=False)
+    try:
+        combo.selector.setCurrentIndex(1)
+        check._check_box.setChecked(True)
+        stats = recorder.stats("callback")
+    finally:
+        instrument.disable()
+    assert received == [1, 2, 2]
+    assert (settings.mode, settings.flag) == ("b", True)
+    assert stats[("callback", "SettingsComboBox.mode")]["count"] == 1
+    assert stats[("callback", "SettingsCheckBox.flag")]["count"] == 1
@@ -0,0 +1,111 @@
+import os
+import pathlib
+import threading
+
+from epyqtsettings.journal import JOURNAL_SUFFIX, Journal
+from epyqtsettings.settings import Settings
+
+
+def test_round_trip(tmp_path):
+    filename = str(tmp_path / "settings.json")
+    settings = Settings(a=1, nested={"b": [1, 2]})
+    settings.upconvert_dicts()
+    settings.save(filename)
+    settings.a = 2
+    settings.nested.b = (3, 4)
+    settings.save(filename)
+
+    loaded = Settings()
+    loaded.load(filename)
+    assert loaded.a == 2
+    assert loaded.nested.b == (3, 4)
+
+
+def test_path_round_trip(tmp_path):
+    filename = tmp_path / "settings.json"
+    settings = Settings(filename, data_directory=tmp_path)
+    settings.save()
+    settings.data_directory = tmp_path / "data"
+    settings.save()
+
+    loaded = Settings(filename)
+    assert pathlib.Path(loaded.settings_path) == filename
+    assert pathlib.Path(loaded.data_directory) == tmp_path / "data"
+
+
+def test_concurrent_saves(tmp_path):
+    # Like the autosave thread and the application saving at the same time, with frequent compactions.
+    filename = str(tmp_path / "settings.json")
+    settings = Settings(**{f"key_{i}": 0 for i in range(4)})
+    settings.save(filename)
+    settings._ensure_journal().compact_bytes = 2000
+    errors = []
+
+    def work(i):
+        try:
+            for value in range(1, 201):
+                settings[f"key_{i}"] = value
+                settings.save(filename)
+        except Exception as exception:
+            errors.append(exception)
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert Journal().read(filename) == {**settings.to_dict()}
+
+
+def _journal_lines(filename):
+    with open(filename + JOURNAL_SUFFIX, "rb") as inFile:
+        return inFile.read().splitlines(keepends=True)
+
+
+def test_torn_journal_line(tmp_path):
+    filename = str(tmp_path / "settings.json")
+    settings = Settings(filename, a=0, b=0)
+    settings.save()
+    settings.a = 1
+    settings.save()
+    settings.b = 2
+    settings.save()
+    # A crash partway through appending the last change.
+    with open(filename + JOURNAL_SUFFIX, "r+b") as outFile:
+        outFile.truncate(os.path.getsize(filename + JOURNAL_SUFFIX) - 4)
+
+    loaded = Settings(filename)
+    assert (loaded.a, loaded.b) == (1, 0)
+
+    # The next save can't append after the torn line, so it compacts into a new snapshot and an empty journal.
+    loaded.b = 3
+    loaded.save()
+    assert len(_journal_lines(filename)) == 1
+    loaded.a = 4
+    loaded.save()
+    assert len(_journal_lines(filename)) == 2
+    assert Journal().read(filename) == {**loaded.to_dict()}
+    again = Settings(filename)
+    assert (again.a, again.b) == (4, 3)
+
+
+def test_journal_of_an_older_snapshot_is_ignored(tmp_path):
+    # A crash while compacting, after the new snapshot was written but before the journal was replaced.
+    filename = str(tmp_path / "settings.json")
+    settings = Settings(filename, a=0)
+    settings.save()
+    settings.a = 1
+    settings.save()
+    stale = _journal_lines(filename)
+    settings.a = 2
+    settings._ensure_journal().compact(settings, filename)
+    with open(filename + JOURNAL_SUFFIX, "wb") as outFile:
+        outFile.writelines(stale)
+
+    loaded = Settings(filename)
+    assert loaded.a == 2
+    loaded.a = 3
+    loaded.save()
+    assert Settings(filename).a == 3
@@ -0,0 +1,46 @@
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+from epyqtwidgets.latest_executor import LatestExecutor
+
+
+def test_close_cancels_and_shuts_down(qapp):
+    release = threading.Event()
+    delivered = []
+
+    def compute(value):
+        release.wait(5)
+        return value
+
+    executor = LatestExecutor(compute, delivered.append, max_workers=1)
+    for value in range(3):
+        executor.submit(value)
+    running = [future for future, _ in executor._running.values()]
+    executor.close()
+    release.set()
+    concurrent.futures.wait(running, timeout=5)
+    qapp.processEvents()
+
+    assert delivered == []
+    assert not executor.busy
+    with pytest.raises(RuntimeError):
+        executor._executor.submit(compute, 0)
+
+
+def test_latest_result_wins(qapp):
+    delivered = []
+    executor = LatestExecutor(lambda value: value, delivered.append, max_workers=1, intermediate=False)
+    try:
+        for value in range(5):
+            executor.submit(value)
+        deadline = time.monotonic() + 5
+        while executor.busy and time.monotonic() < deadline:
+            qapp.processEvents()
+        assert delivered[-1] == 4
+        assert executor.submitted == 5
+        assert executor.delivered + executor.dropped == 5
+    finally:
+        executor.close()
@@ -0,0 +1,165 @@
+import time
+
+import numpy as np
+import pytest
+
+from epyqtwidgets.contrast import AutoContrast, minmax
+
+
+def _settle(qapp, seconds=.1):
+    # Lets pending resizes and idle draws run.
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(.005)
+
+
+def _shown(qapp, widget, width=400, height=400):
+    widget.resize(width, height)
+    widget.show()
+    _settle(qapp)
+    return widget
+
+
+def _count_draws(widget):
+    draws = []
+    widget.fig_canvas.mpl_connect("draw_event", lambda event: draws.append(event))
+    return draws
+
+
+def test_image_grid_panels_copy_the_contrast(qapp):
+    from epyqtwidgets.mpl import MplImageGrid
+
+    contrast = AutoContrast("fixed", clim=(0, 1), interval=3)
+    grid = MplImageGrid(2, 2, contrast=contrast)
+    try:
+        assert grid.panels[0].contrast is contrast
+        contrasts = [panel.contrast for panel in grid.panels[1:]]
+        assert len({id(panel_contrast) for panel_contrast in contrasts + [contrast]}) == 4
+        for panel_contrast in contrasts:
+            assert (panel_contrast.mode, panel_contrast.clim, panel_contrast.interval) == ("fixed", (0, 1), 3)
+        grid.set_data(1, np.full((4, 4), 5.0), (0, 4, 0, 4))
+        assert grid.panels[1].contrast(np.zeros((4, 4))) == (0, 1)
+    finally:
+        grid.deleteLater()
+
+
+def test_blit_skips_full_draws(qapp):
+    from epyqtwidgets.mpl import MplImshowWidget
+
+    widget = _shown(qapp, MplImshowWidget(np.zeros((64, 64)), blit=True))
+    try:
+        widget.set_data(np.random.random((64, 64)), (0, 64, 0, 64))
+        draws = _count_draws(widget)
+        for _ in range(10):
+            widget.set_data(np.random.random((64, 64)), (0, 64, 0, 64))
+        assert not draws
+        # A new extent needs the axes redrawn.
+        widget.set_data(np.random.random((64, 64)), (0, 32, 0, 32))
+        assert len(draws) == 1
+    finally:
+        widget.deleteLater()
+
+
+def test_no_blit_draws_every_frame(qapp):
+    from epyqtwidgets.mpl import MplImshowWidget
+
+    widget = _shown(qapp, MplImshowWidget(np.zeros((64, 64))))
+    try:
+        draws = _count_draws(widget)
+        for _ in range(3):
+            widget.set_data(np.random.random((64, 64)), (0, 64, 0, 64))
+        assert len(draws) == 3
+    finally:
+        widget.deleteLater()
+
+
+def test_resize_captures_a_new_background(qapp):
+    from epyqtwidgets.mpl import MplImshowWidget
+
+    widget = _shown(qapp, MplImshowWidget(np.zeros((64, 64)), blit=True))
+    try:
+        widget.set_data(np.random.random((64, 64)), (0, 64, 0, 64))
+        background = widget._background
+        assert background is not None
+        widget.resize(600, 500)
+        _settle(qapp, .3)
+        assert widget._background is not background
+        assert widget._background.get_extents()[2:] == widget.fig_canvas.get_width_height(physical=True)
+        # The next frame blits over the new background, without a full draw.
+        draws = _count_draws(widget)
+        widget.set_data(np.random.random((64, 64)), (0, 64, 0, 64))
+        assert not draws
+    finally:
+        widget.deleteLater()
+
+
+def test_lod_displays_what_the_canvas_can_show(qapp):
+    from epyqtwidgets.mpl import MplImshowWidget
+
+    data = np.arange(2048 * 2048, dtype=np.float64).reshape(2048, 2048)
+    widget = _shown(qapp, MplImshowWidget(blank=True, lod=True))
+    try:
+        widget.set_data(data, (0, 2048, 0, 2048))
+        shown = widget.plot.get_array()
+        bbox = widget.ax.bbox
+        # A coarse level, with between one and two data pixels per screen pixel.
+        assert bbox.width <= shown.shape[1] < 2 * bbox.width + 2
+        stride = 2048 // shown.shape[1]
+        assert np.array_equal(shown, data[::stride, ::stride])
+        assert widget.plot.get_extent() == [0, 2048, 0, 2048]
+
+        # Zooming in shows only the view, from a finer level.
+        widget.ax.set_xlim(1000, 1100)
+        widget.ax.set_ylim(500, 600)
+        shown = widget.plot.get_array()
+        assert np.array_equal(shown, data[500:600, 1000:1100])
+        assert widget.plot.get_extent() == [1000, 1100, 500, 600]
+    finally:
+        widget.deleteLater()
+
+
+def test_widget_applies_contrast(qapp):
+    from epyqtwidgets.mpl import MplImshowWidget
+
+    widget = MplImshowWidget(np.zeros((4, 4)))
+    try:
+        data = np.array([[np.nan, 2.0], [-3.0, 5.0]])
+        widget.set_data(data, (0, 2, 0, 2))
+        assert widget.plot.get_clim() == (-3.0, 5.0)
+        widget.contrast = AutoContrast("fixed", clim=(0, 1))
+        widget.set_data(data, (0, 2, 0, 2))
+        assert widget.plot.get_clim() == (0, 1)
+    finally:
+        widget.deleteLater()
+
+
+def test_minmax_spans_chunks_and_ignores_nans():
+    # Several chunks of float64, with the extremes in the first and the last.
+    data = np.random.random(3 << 17)
+    data[::7] = np.nan
+    data[5], data[-5] = -1, 2
+    assert minmax(data) == (-1, 2)
+    assert all(np.isnan(value) for value in minmax(np.full(10, np.nan)))
+
+
+@pytest.mark.parametrize("mode", ["minmax", "percentile", "smoothed"])
+def test_contrast_interval_reuses_limits(mode):
+    contrast = AutoContrast(mode, interval=3)
+    first = contrast(np.arange(100.0))
+    assert contrast(np.arange(100.0) * 10) == first
+    assert contrast(np.arange(100.0) * 10) == first
+    assert contrast(np.arange(100.0) * 10) != first
+
+
+def test_contrast_modes():
+    data = np.arange(1001.0)
+    assert AutoContrast("percentile", percentiles=(10, 90))(data) == pytest.approx((100, 900))
+    smoothed = AutoContrast("smoothed", smoothing=.5)
+    smoothed(data)
+    assert smoothed(data + 100) == pytest.approx((50, 1050))
+    assert AutoContrast("fixed", clim=(1, 2))(data) == (1, 2)
+    with pytest.raises(ValueError):
+        AutoContrast("fixed")
+    with pytest.raises(ValueError):
+        AutoContrast("bogus")
@@ -0,0 +1,43 @@
+import threading
+import time
+
+from epyqtsettings.settings import Settings
+
+
+def _wait_for(qapp, condition, timeout=2.0):
+    end = time.monotonic() + timeout
+    while not condition() and time.monotonic() < end:
+        qapp.processEvents()
+        time.sleep(.001)
+    return condition()
+
+
+def test_changes_from_a_worker_are_delivered_in_the_gui_thread(qapp):
+    settings = Settings(value=0)
+    calls = []
+    settings.subscribe(lambda paths: calls.append((threading.current_thread(), set(paths))), "value")
+
+    def work():
+        for i in range(100):
+            settings.value = i + 1
+
+    worker = threading.Thread(target=work)
+    worker.start()
+    worker.join()
+
+    assert _wait_for(qapp, lambda: calls)
+    qapp.processEvents()
+    assert all(thread is threading.main_thread() for thread, _ in calls)
+    assert all(paths == {"value"} for _, paths in calls)
+    assert settings.value == 100
+
+
+def test_changes_in_the_gui_thread_are_coalesced(qapp):
+    settings = Settings(a=0, b=0)
+    calls = []
+    settings.subscribe(calls.append)
+    settings.a = 1
+    settings.b = 2
+    assert calls == []
+    assert _wait_for(qapp, lambda: calls)
+    assert calls == [{"a", "b"}]
@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+from epyqtwidgets.rate_limit import RateLimiter
+
+WAIT = .05
+DURATION = .3
+
+
+def _drive(qapp, limiter, duration=DURATION, every=.002):
+    # Call the limiter every few ms for duration seconds, then let any trailing run happen.
+    end = time.monotonic() + duration
+    i = 0
+    while time.monotonic() < end:
+        i += 1
+        limiter(i)
+        qapp.processEvents()
+        time.sleep(every)
+    end = time.monotonic() + 3 * WAIT
+    while time.monotonic() < end:
+        qapp.processEvents()
+        time.sleep(.001)
+    return i
+
+
+@pytest.mark.parametrize("leading, trailing, expected", [
+    (False, False, 0),
+    (True, False, 1),
+    (False, True, 1),
+    (True, True, 2),
+])
+def test_debounce_edges(qapp, leading, trailing, expected):
+    runs = []
+    limiter = RateLimiter(mode="debounce", wait=WAIT, leading=leading, trailing=trailing, callback=runs.append)
+    last = _drive(qapp, limiter)
+    assert len(runs) == expected
+    if leading:
+        assert runs[0] == 1
+    if trailing:
+        assert runs[-1] == last
+    assert not limiter.pending
+
+
+@pytest.mark.parametrize("leading, trailing", [(False, False), (True, False), (False, True), (True, True)])
+def test_throttle_edges(qapp, leading, trailing):
+    runs = []
+    limiter = RateLimiter(mode="throttle", wait=WAIT, leading=leading, trailing=trailing, callback=runs.append)
+    last = _drive(qapp, limiter)
+    intervals = DURATION / WAIT
+    if not (leading or trailing):
+        assert runs == []
+        return
+    # Once per interval while the calls continue, give or take the edges of the burst.
+    assert intervals - 2 <= len(runs) <= intervals + 2
+    assert runs == sorted(runs)
+    if leading:
+        assert runs[0] == 1
+    if trailing:
+        assert runs[-1] == last
+
+
+def test_max_wait(qapp):
+    runs = []
+    limiter = RateLimiter(mode="debounce", wait=WAIT, max_wait=2 * WAIT, callback=runs.append)
+    _drive(qapp, limiter)
+    assert DURATION / (2 * WAIT) - 1 <= len(runs) <= DURATION / (2 * WAIT) + 2
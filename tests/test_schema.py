@@ -0,0 +1,24 @@
+from epyqtsettings.schema import Field, Group, Schema, SchemaPanel
+from epyqtsettings.settings import Settings
+from epyqtsettings.settings_widgets import SettingsComboBox
+
+
+def test_page_with_non_str_choices(qapp):
+    schema = Schema(Group("Camera", [Field("binning", int, 2, choices=[1, 2, 4])]))
+    settings = Settings()
+    schema.load(settings)
+    panel = SchemaPanel(settings, schema)
+    panel.show()
+    qapp.processEvents()
+
+    box = panel.findChild(SettingsComboBox)
+    assert box is not None
+    assert box.selector.currentText() == "2"
+
+    box.selector.setCurrentIndex(2)
+    assert settings.binning == 4
+
+    settings.binning = 1
+    settings.flush_notifications()
+    assert box.selector.currentIndex() == 0
+    panel.close()
@@ -0,0 +1,34 @@
+import pickle
+
+from epyqtsettings.settings import Settings
+
+
+class _LegacySettings:
+    # Pickles like a Settings did before it was slotted: its instance __dict__ is the state.
+    def __init__(self, data):
+        self.data = data
+
+    def __reduce__(self):
+        return object.__new__, (Settings,), {"dict": self.data}
+
+
+def test_load_legacy_nested_settings(tmp_path):
+    filename = tmp_path / "settings.pkl"
+    filename.write_bytes(pickle.dumps({"top": 1, "sub": _LegacySettings({"x": 2, "inner": {"y": 3}})}))
+
+    settings = Settings()
+    settings.load(str(filename))
+
+    assert settings.top == 1
+    assert isinstance(settings.sub, Settings)
+    assert settings.sub.dict.keys() == {"x", "inner"}
+    assert settings.sub.x == 2
+    assert settings.sub.inner.y == 3
+
+
+def test_pickle_round_trip():
+    settings = Settings(a=1, nested={"b": 2})
+    settings.upconvert_dicts()
+    copy = pickle.loads(pickle.dumps(settings))
+    assert copy.a == 1
+    assert copy.nested.b == 2
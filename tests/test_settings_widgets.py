@@ -0,0 +1,63 @@
+import gc
+import types
+import weakref
+
+from epyqtsettings.settings import Settings, _get_notifier
+from epyqtsettings.settings_widgets import SettingsCheckBox, SettingsComboBox, SettingsEntryBox
+
+
+class _Box(SettingsEntryBox):
+    refreshes = 0
+
+    def refresh(self):
+        type(self).refreshes += 1
+        super().refresh()
+
+
+def test_widget_follows_settings(qapp):
+    settings = Settings(a=1.0)
+    box = SettingsEntryBox(settings, "a", float)
+    settings.a = 2.5
+    settings.flush_notifications()
+    assert box.edit_box.text() == "2.5"
+
+
+def test_dropped_widget_is_released_and_unsubscribed(qapp):
+    settings = Settings(a=1.0)
+    box = _Box(settings, "a", float)
+    reference = weakref.ref(box)
+    del box
+    gc.collect()
+    qapp.processEvents()
+
+    assert reference() is None
+    settings.a = 2.0
+    settings.flush_notifications()
+    assert _Box.refreshes == 0
+    assert not _get_notifier(settings)._callbacks
+
+
+def test_reload_does_not_write_back(qapp, tmp_path):
+    filename = str(tmp_path / "settings.json")
+    Settings(filename, mode="b", flag=True).save()
+    settings = Settings(filename)
+    settings.enable_autosave(delay=60)
+    calls = []
+    combo = SettingsComboBox(
+        types.SimpleNamespace(settings=settings), "mode", "mode", ["a", "b"], lambda *args: calls.append(1)
+    )
+    check = SettingsCheckBox(settings, "flag", "flag", lambda *args: calls.append(2))
+    other = Settings(filename)
+    other.update({"mode": "a", "flag": False})
+    other.save()
+    try:
+        assert settings.reload(filename) == {"mode", "flag"}
+        settings.flush_notifications()
+
+        assert combo.selector.currentText() == "a"
+        assert not check._check_box.isChecked()
+        assert not settings._journal._dirty
+        assert settings.autosaver._deadline is None
+        assert not calls
+    finally:
+        settings.disable_autosave(flush=False)
@@ -0,0 +1,91 @@
+import multiprocessing
+import threading
+import time
+
+import numpy as np
+import pytest
+
+shared_memory = pytest.importorskip("multiprocessing.shared_memory")
+
+from epyqtsettings import shared as shared_module  # noqa: E402
+from epyqtsettings.settings import Settings  # noqa: E402
+from epyqtsettings.shared import SharedSettings, SharedSettingsView  # noqa: E402
+
+
+def _work(view):
+    # Runs in a spawned worker, which attaches to the shared memory through the pickled view.
+    view.refresh()
+    return view.version, view.gain, view.calibration.offset, float(view.table.sum()), view.table.flags.writeable
+
+
+def _segment_names(shared):
+    names = {shared.name, shared._meta.name}
+    names.update(segment.name for _, segment in shared._arrays.values())
+    return names
+
+
+def _exists(name):
+    try:
+        segment = shared_memory.SharedMemory(name)
+    except FileNotFoundError:
+        return False
+    segment.close()
+    return True
+
+
+def test_spawned_worker_round_trip():
+    settings = Settings(gain=2.0, calibration={"offset": 1}, table=np.arange(4096, dtype=np.float64))
+    settings.upconvert_dicts()
+    with SharedSettings(settings) as shared, multiprocessing.get_context("spawn").Pool(1) as pool:
+        version, gain, offset, total, writeable = pool.apply(_work, (shared.view,))
+        assert (version, gain, offset, total, writeable) == (shared.version, 2.0, 1, 4095 * 4096 / 2, False)
+
+        settings.update({"gain": 3.0, "table": np.ones(4096)})
+        settings.calibration.offset = 5
+        settings.flush_notifications()
+        # The same worker, whose cached view only picks up the change through refresh.
+        version, gain, offset, total, _ = pool.apply(_work, (shared.view,))
+        assert (version, gain, offset, total) == (shared.version, 3.0, 5, 4096.0)
+
+
+def test_refresh_waits_for_a_publish_in_progress():
+    settings = Settings(a=1)
+    with SharedSettings(settings) as shared:
+        view = SharedSettingsView(shared.name)
+        settings.a = 2
+        settings.flush_notifications()
+        # An odd sequence number, as left by a publish that is still writing.
+        sequence = shared_module._SEQUENCE.unpack_from(shared._control.buf, 0)[0]
+        shared_module._SEQUENCE.pack_into(shared._control.buf, 0, sequence + 1)
+        finish = threading.Timer(.1, shared_module._SEQUENCE.pack_into, (shared._control.buf, 0, sequence))
+        finish.start()
+        start = time.perf_counter()
+        try:
+            assert view.refresh()
+        finally:
+            finish.join()
+        assert time.perf_counter() - start >= .09
+        assert (view.a, view.version) == (2, shared.version)
+        assert not view.refresh()
+
+
+def test_close_unlinks_segments():
+    settings = Settings(gain=1.0, table=np.zeros(4096))
+    shared = SharedSettings(settings)
+    first = _segment_names(shared)
+    settings.table = np.ones(4096)
+    settings.flush_notifications()
+    second = _segment_names(shared)
+    # The replaced array and the old pickled settings are unlinked as soon as they are replaced.
+    assert not any(_exists(name) for name in first - second)
+    assert all(_exists(name) for name in second)
+
+    shared.close()
+    assert not any(_exists(name) for name in first | second)
+    shared.close()
+
+
+def test_requires_shared_memory(monkeypatch):
+    monkeypatch.setattr(shared_module, "shared_memory", None)
+    with pytest.raises(RuntimeError, match="Python 3.8"):
+        SharedSettings(Settings(a=1))
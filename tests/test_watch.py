@@ -0,0 +1,73 @@
+import os
+import time
+import types
+
+import pytest
+
+from epyqtsettings.settings import Settings
+from epyqtsettings.settings_widgets import SettingsCheckBox, SettingsComboBox, SettingsEntryBox
+
+
+class _Counting:
+    def refresh(self):
+        self.refreshes += 1
+        super().refresh()
+
+
+class _Combo(_Counting, SettingsComboBox):
+    refreshes = 0
+
+
+class _Check(_Counting, SettingsCheckBox):
+    refreshes = 0
+
+
+class _Entry(_Counting, SettingsEntryBox):
+    refreshes = 0
+
+
+def _wait(qapp, condition, seconds):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        qapp.processEvents()
+        if condition():
+            return True
+        time.sleep(.005)
+    return condition()
+
+
+def _contents(filename):
+    return {name: open(name, "rb").read() for name in (filename, filename + ".journal") if os.path.exists(name)}
+
+
+@pytest.mark.parametrize("suffix", [".pkl", ".json"])
+def test_external_write_refreshes_widgets_once(qapp, tmp_path, suffix):
+    filename = str(tmp_path / f"settings{suffix}")
+    Settings(filename, mode="a", flag=False, gain=1.0).save()
+    settings = Settings(filename)
+    settings.enable_autosave(delay=.05)
+    settings.watch(debounce=.01)
+    combo = _Combo(types.SimpleNamespace(settings=settings), "mode", "mode", ["a", "b"])
+    check = _Check(settings, "flag", "flag")
+    entry = _Entry(settings, "gain", float)
+    widgets = (combo, check, entry)
+    try:
+        # Another process, changing every setting.
+        other = Settings(filename)
+        other.update({"mode": "b", "flag": True, "gain": 2.5})
+        other.save()
+        written = _contents(filename)
+
+        assert _wait(qapp, lambda: all(widget.refreshes for widget in widgets), 5)
+        assert combo.selector.currentText() == "b"
+        assert check._check_box.isChecked()
+        assert entry.edit_box.text() == "2.5"
+        # Give any echo, like a write back and the reload it would trigger, time to happen.
+        _wait(qapp, lambda: False, .3)
+        assert [widget.refreshes for widget in widgets] == [1, 1, 1]
+        assert settings.autosaver.write_count == 0
+        assert _contents(filename) == written
+        assert (settings.mode, settings.flag, settings.gain) == ("b", True, 2.5)
+    finally:
+        settings.watch(False)
+        settings.disable_autosave(flush=False)